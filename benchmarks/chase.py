@@ -12,6 +12,7 @@ S_ = expressions.Symbol
 Imp_ = Implication
 Eb_ = expressions.ExpressionBlock
 
+E = S_('E')
 Q = S_('Q')
 T = S_('T')
 v = S_('v')
@@ -51,7 +52,7 @@ class TimeChase:
 
         rstate = random.RandomState(0)
         t = rstate.randint(
-            0, max(n // 100, 2), size=(3, n)
+            0, max(n // 100, 2), size=(n, 3)
         )
 
         dl = Datalog()
@@ -82,6 +83,15 @@ class TimeChase:
         self.chase(self.dl).build_chase_solution()
         self.dl.push_scope()
 
+    def time_triangle(self, n, chase_strategy, cq_compilation):
+        self.dl.push_scope()
+        self.dl.walk(Eb_([
+            Imp_(E(x, y), T(x, y, z)),
+            Imp_(Q(x, y, z), E(x, y) & E(y, z) & E(z, x)),
+        ]))
+        self.chase(self.dl).build_chase_solution()
+        self.dl.push_scope()
+
     def time_project(self, n, chase_strategy, cq_compilation):
         self.dl.push_scope()
         self.dl.walk(Eb_([
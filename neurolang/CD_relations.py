@@ -1,5 +1,4 @@
 from functools import lru_cache
-from itertools import product
 
 import numpy as np
 from scipy.linalg import kron
@@ -8,7 +7,10 @@ from .interval_algebra import (v_before, v_during, v_equals, v_finishes,
                                v_meets, v_overlaps, v_starts)
 from .regions import ExplicitVBR, ImplicitVBR, Region
 
-__all__ = ['cardinal_relation']
+__all__ = [
+    'cardinal_relation', 'cardinal_relation_matrix',
+    'cardinal_relation_pairs'
+]
 
 directions_dim_space = {
     'L': [0],
@@ -115,59 +117,90 @@ def overlap_resolution(
     if stop_at == 0:
         raise ValueError("stop_at must be larger than 0")
 
-    region_stack = [
-        (region.aabb_tree.root, reference_region.aabb_tree.root, 0)
-    ]
+    tree = region.aabb_tree
+    reference_tree = reference_region.aabb_tree
 
     directions = directions.replace('O', '')
     if len(directions) == 0:
         directions = None
 
-    total_mat = direction_matrix(
-        region_stack[0][0].box, region_stack[0][1].box
-    ) * 0
-    overlap_indices = is_in_direction_indices(total_mat.ndim, 'O')
-    while region_stack:
-        region, reference_region, level = region_stack.pop()
+    nodes = np.array([tree.root])
+    reference_nodes = np.array([reference_tree.root])
+    total_mat = np.zeros((3,) * tree.lb.shape[1])
+    overlap_indices = (slice(None),) + is_in_direction_indices(
+        total_mat.ndim, 'O'
+    )
+    level = 0
+    while len(nodes) > 0:
+        mats = _direction_tensors(
+            tree.lb[nodes], tree.ub[nodes],
+            reference_tree.lb[reference_nodes],
+            reference_tree.ub[reference_nodes]
+        )
+        overlap = _are_in_direction(mats, 'O')
+        if stop_at is None or level < stop_at - 1:
+            to_refine = overlap
+        else:
+            to_refine = np.zeros_like(overlap)
+        leaves = tree.is_leaf[nodes]
+        reference_leaves = reference_tree.is_leaf[reference_nodes]
+        refined = to_refine & ~(leaves & reference_leaves)
 
-        mat = direction_matrix(region.box, reference_region.box)
-        total_mat += mat
+        mats[overlap_indices] *= ~refined.reshape(mats[overlap_indices].shape)
+        total_mat += mats.sum(axis=0)
 
-        if (
-            is_in_direction(mat, 'O') and
-            (stop_at is None or level < stop_at - 1)
-        ):
-            region_nl = region.children
-            ref_region_nl = reference_region.children
-            if len(region_nl) == 0 and len(ref_region_nl) > 0:
-                region_nl = (region,)
-            elif len(region_nl) > 0 and len(ref_region_nl) == 0:
-                ref_region_nl = (reference_region,)
-
-            stack_update = [
-                (r, ref, level + 1)
-                for r, ref in product(region_nl, ref_region_nl)
-            ]
-
-            if len(stack_update) > 0:
-                total_mat[overlap_indices] = 0
-                region_stack += stack_update
-            elif directions is None:
+        if directions is None:
+            if (to_refine & ~refined).any():
                 break
-
-        elif directions is not None and is_in_direction(mat, directions):
+        elif _are_in_direction(mats[~to_refine], directions).any():
             break
 
+        nodes, reference_nodes = _children_pairs(
+            tree, nodes[refined], reference_tree, reference_nodes[refined]
+        )
+        level += 1
+
     return total_mat.clip(0, 1)
 
 
+def _children_pairs(tree, nodes, reference_tree, reference_nodes):
+    """
+    Pairs of the children of each pair of nodes, a leaf taking the
+    place of its children when the other node is not a leaf.
+    """
+    children = np.stack((tree.left[nodes], tree.right[nodes]), axis=1)
+    leaves = children[:, 0] == -1
+    children[leaves] = np.stack(
+        (nodes[leaves], -np.ones_like(nodes[leaves])), axis=1
+    )
+    reference_children = np.stack(
+        (reference_tree.left[reference_nodes],
+         reference_tree.right[reference_nodes]),
+        axis=1
+    )
+    leaves = reference_children[:, 0] == -1
+    reference_children[leaves] = np.stack(
+        (reference_nodes[leaves], -np.ones_like(reference_nodes[leaves])),
+        axis=1
+    )
+    children = np.repeat(children, 2, axis=1).ravel()
+    reference_children = np.tile(reference_children, 2).ravel()
+    valid = (children > -1) & (reference_children > -1)
+    return children[valid], reference_children[valid]
+
+
 @lru_cache(maxsize=128)
 def is_in_direction_indices(n, direction):
-    indices = [[0, 1, 2]] * n
+    return np.ix_(*_direction_positions(n, direction))
+
+
+@lru_cache(maxsize=128)
+def _direction_positions(n, direction):
+    positions = [(0, 1, 2)] * n
     for i in direction:
         for dim in directions_dim_space[i]:
-            indices[n - 1 - dim] = matrix_positions_per_directions[i]
-    return np.ix_(*indices)
+            positions[n - 1 - dim] = tuple(matrix_positions_per_directions[i])
+    return tuple(positions)
 
 
 def is_in_direction(matrix, direction):
@@ -201,3 +234,188 @@ def direction_matrix(region_bb, another_region_bb):
             tensor
         ).squeeze()
     return tensor.clip(0, 1)
+
+
+def _direction_vectors(lb, ub, other_lb, other_ub):
+    """
+    Indicators, along the last axis, of each box extending before, over
+    and after the other one in each dimension. The boxes must not be
+    degenerate.
+    """
+    return np.stack(
+        (lb < other_lb, (lb < other_ub) & (other_lb < ub), ub > other_ub),
+        axis=-1
+    )
+
+
+def _direction_tensors(lb, ub, other_lb, other_ub):
+    """
+    Direction matrices between pairs of boxes, whose bounds are the
+    rows of the arrays, stacked along the first axis. The boxes must
+    not be degenerate.
+    """
+    vectors = _direction_vectors(lb, ub, other_lb, other_ub).astype(float)
+    tensor = vectors[:, 0]
+    for i in range(1, vectors.shape[1]):
+        tensor = (
+            vectors[:, i].reshape((len(vectors), 3) + (1,) * i) *
+            tensor[:, np.newaxis]
+        )
+    return tensor
+
+
+def _are_in_direction(matrices, direction):
+    indices = (slice(None),) + is_in_direction_indices(
+        matrices.ndim - 1, direction
+    )
+    selected = matrices[indices] == 1
+    return selected.any(axis=tuple(range(1, selected.ndim)))
+
+
+def cardinal_relation_matrix(lb, ub, reference_lb, reference_ub, directions):
+    """
+    Boolean matrix whose entry ``(i, j)`` is whether the box bounded by
+    ``lb[i]`` and ``ub[i]`` is in the ``directions`` of the reference box
+    bounded by ``reference_lb[j]`` and ``reference_ub[j]``. It agrees
+    with `is_in_direction` on the `direction_matrix` of each pair of
+    boxes, which must not be degenerate.
+
+    As each cell of a direction matrix is the product of the relations
+    of the boxes along each axis, the matrix is never built: the pair is
+    in the directions if, along every axis, the boxes are related in one
+    of the positions the directions admit.
+    """
+    lb, ub = np.atleast_2d(lb), np.atleast_2d(ub)
+    reference_lb = np.atleast_2d(reference_lb)
+    reference_ub = np.atleast_2d(reference_ub)
+    vectors = _direction_vectors(
+        lb[:, np.newaxis], ub[:, np.newaxis],
+        reference_lb[np.newaxis], reference_ub[np.newaxis]
+    )
+    return _vectors_in_direction(vectors, directions)
+
+
+def _vectors_in_direction(vectors, directions):
+    dim = vectors.shape[-2]
+    positions = _direction_positions(dim, directions)
+    result = np.ones(vectors.shape[:-2], dtype=bool)
+    for axis in range(dim):
+        result &= (
+            vectors[..., axis, list(positions[dim - 1 - axis])]
+            .any(axis=-1)
+        )
+    return result
+
+
+def cardinal_relation_pairs(
+    regions,
+    reference_regions,
+    directions,
+    refine_overlapping=False,
+    stop_at=None
+):
+    """
+    Boolean array whose element ``i`` is the `cardinal_relation` between
+    ``regions[i]`` and ``reference_regions[i]``.
+
+    The relation is evaluated on the bounding boxes of all the pairs at
+    once, as `cardinal_relation_matrix` does, computing it between every
+    distinct region and reference region when there are fewer of those
+    combinations than pairs. Only the pairs whose result depends on more
+    than their bounding boxes are evaluated one by one.
+    """
+    region_codes, unique_regions = _unique_by_identity(regions)
+    reference_codes, unique_reference_regions = _unique_by_identity(
+        reference_regions
+    )
+
+    dims = set(
+        len(r.bounding_box.lb)
+        for r in unique_regions + unique_reference_regions
+        if not isinstance(r, ImplicitVBR)
+    )
+    dim = dims.pop() if len(dims) == 1 else 0
+    lb, ub, valid = _bounding_boxes(unique_regions, dim)
+    reference_lb, reference_ub, reference_valid = _bounding_boxes(
+        unique_reference_regions, dim
+    )
+    result = np.zeros(len(region_codes), dtype=bool)
+    if len(result) == 0:
+        return result
+
+    if len(unique_regions) * len(unique_reference_regions) <= len(result):
+        vectors = _direction_vectors(
+            lb[:, np.newaxis], ub[:, np.newaxis],
+            reference_lb[np.newaxis], reference_ub[np.newaxis]
+        )[region_codes, reference_codes]
+    else:
+        vectors = _direction_vectors(
+            lb[region_codes], ub[region_codes],
+            reference_lb[reference_codes], reference_ub[reference_codes]
+        )
+    relation = _vectors_in_direction(vectors, directions)
+    result[:] = relation
+
+    one_by_one = (
+        ~valid[region_codes] |
+        ~reference_valid[reference_codes] |
+        (
+            (lb[region_codes] == reference_lb[reference_codes]) &
+            (ub[region_codes] == reference_ub[reference_codes])
+        ).all(axis=1)
+    )
+    if refine_overlapping:
+        refinable = np.array(
+            [isinstance(r, ExplicitVBR) for r in unique_regions],
+            dtype=bool
+        )
+        to_refine = (
+            refinable[region_codes] & _vectors_in_direction(vectors, 'O')
+        )
+        if 'O' not in directions:
+            to_refine &= ~relation
+        one_by_one |= to_refine
+
+    for i in np.flatnonzero(one_by_one):
+        result[i] = cardinal_relation(
+            unique_regions[region_codes[i]],
+            unique_reference_regions[reference_codes[i]],
+            directions,
+            refine_overlapping=refine_overlapping,
+            stop_at=stop_at
+        )
+    return result
+
+
+def _unique_by_identity(regions):
+    unique_regions = []
+    positions = dict()
+    codes = np.empty(len(regions), dtype=int)
+    for i, region in enumerate(regions):
+        key = id(region)
+        if key not in positions:
+            positions[key] = len(unique_regions)
+            unique_regions.append(region)
+        codes[i] = positions[key]
+    return codes, unique_regions
+
+
+def _bounding_boxes(regions, dim):
+    """
+    Bounds of the bounding boxes of the regions, along with whether their
+    relations can be read from those boxes.
+    """
+    lb = np.zeros((len(regions), dim))
+    ub = np.ones((len(regions), dim))
+    valid = np.zeros(len(regions), dtype=bool)
+    for i, region in enumerate(regions):
+        if isinstance(region, ImplicitVBR) or dim == 0:
+            continue
+        box = region.bounding_box
+        if len(box.lb) != dim:
+            continue
+        lb[i] = box.lb
+        ub[i] = box.ub
+        valid[i] = True
+    valid &= (lb < ub).all(axis=1)
+    return lb, ub, valid
@@ -323,3 +323,141 @@ class Tree(object):
         matching = self._query_overlapping_regions_rec(self.root, region_box)
         matching = matching.difference({region})
         return matching
+
+
+class ArrayTree(object):
+    """
+    Bounding volume hierarchy stored in flat arrays. Node ``i`` has
+    bounds ``lb[i]`` and ``ub[i]`` and children ``left[i]`` and
+    ``right[i]``, -1 marking the leaves. The root is node 0.
+    """
+    root = 0
+
+    def __init__(self, lb, ub, left, right, height=0):
+        self.lb = lb
+        self.ub = ub
+        self.left = left
+        self.right = right
+        self.height = height
+        for ar in (self.lb, self.ub, self.left, self.right):
+            ar.setflags(write=False)
+
+    def __len__(self):
+        return len(self.left)
+
+    @property
+    def is_leaf(self):
+        return self.left == -1
+
+    def box(self, node):
+        return AABB(self.lb[node], self.ub[node])
+
+    def children(self, node):
+        if self.left[node] == -1:
+            return ()
+        return (self.left[node], self.right[node])
+
+    @classmethod
+    def from_elements(
+        cls, element_lb, element_ub, coordinates=None, to_coordinates=None
+    ):
+        """
+        Build the hierarchy over elements bounded by the rows of
+        ``element_lb`` and ``element_ub``, one level at a time. Each node
+        is split in two at the middle of its box, trying its axes from
+        the narrowest to the widest until both halves are non-empty.
+        The split is performed on ``coordinates`` of the elements, into
+        which the middle points are mapped by ``to_coordinates``.
+        """
+        element_lb = np.atleast_2d(element_lb)
+        element_ub = np.atleast_2d(element_ub)
+        if coordinates is None:
+            coordinates = (element_lb + element_ub) / 2
+        if to_coordinates is None:
+            def to_coordinates(points):
+                return points
+        dim = element_lb.shape[1]
+
+        lbs, ubs, lefts, rights = [], [], [], []
+        elements = np.arange(len(element_lb))
+        counts = np.array([len(element_lb)])
+        number_of_nodes = 1
+        height = -1
+        while len(counts) > 0:
+            height += 1
+            starts = np.cumsum(counts) - counts
+            segments = np.repeat(np.arange(len(counts)), counts)
+            lb = np.minimum.reduceat(element_lb[elements], starts)
+            ub = np.maximum.reduceat(element_ub[elements], starts)
+
+            middle = to_coordinates((lb + ub) / 2)
+            axes = np.argsort(ub - lb, axis=1)
+            element_coordinates = coordinates[elements]
+            rows = np.arange(len(elements))
+            split = np.zeros(len(counts), dtype=bool)
+            go_left = np.zeros(len(elements), dtype=bool)
+            for i in range(dim):
+                ax = axes[segments, i]
+                left_mask = (
+                    element_coordinates[rows, ax] <= middle[segments, ax]
+                )
+                left_counts = np.add.reduceat(left_mask, starts)
+                valid = ~split & (left_counts > 0) & (left_counts < counts)
+                go_left = np.where(valid[segments], left_mask, go_left)
+                split |= valid
+            left_counts = np.add.reduceat(go_left, starts)
+
+            children = (
+                number_of_nodes - 2 +
+                2 * np.cumsum(split).reshape(-1, 1) +
+                np.arange(2)
+            )
+            children[~split] = -1
+            number_of_nodes += 2 * split.sum()
+            lbs.append(lb)
+            ubs.append(ub)
+            lefts.append(children[:, 0])
+            rights.append(children[:, 1])
+
+            order = np.argsort(2 * segments + ~go_left, kind='stable')
+            elements = elements[order[split[segments[order]]]]
+            counts = np.stack(
+                (left_counts[split], counts[split] - left_counts[split]),
+                axis=1
+            ).ravel()
+
+        # nodes are numbered level by level, hence concatenating the
+        # levels leaves each node at the position of its index
+        return cls(
+            np.concatenate(lbs), np.concatenate(ubs),
+            np.concatenate(lefts), np.concatenate(rights),
+            height=height
+        )
+
+    def query_overlapping(self, lb, ub):
+        """
+        Leaves overlapping each of the boxes bounded by the rows of
+        ``lb`` and ``ub``, as a pair of arrays with the index of the
+        box and that of the leaf.
+        """
+        lb = np.atleast_2d(lb)
+        ub = np.atleast_2d(ub)
+        boxes = np.arange(len(lb))
+        nodes = np.full(len(lb), self.root)
+        matching_boxes, matching_leaves = [], []
+        while len(nodes) > 0:
+            overlapping = (
+                (self.ub[nodes] > lb[boxes]) &
+                (self.lb[nodes] < ub[boxes])
+            ).all(axis=1)
+            boxes = boxes[overlapping]
+            nodes = nodes[overlapping]
+            leaves = self.left[nodes] == -1
+            matching_boxes.append(boxes[leaves])
+            matching_leaves.append(nodes[leaves])
+            boxes = np.repeat(boxes[~leaves], 2)
+            nodes = np.stack(
+                (self.left[nodes[~leaves]], self.right[nodes[~leaves]]),
+                axis=1
+            ).ravel()
+        return np.concatenate(matching_boxes), np.concatenate(matching_leaves)
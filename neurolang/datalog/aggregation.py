@@ -30,7 +30,7 @@ from . import (
 )
 from .basic_representation import UnionOfConjunctiveQueries
 from .expression_processing import extract_logic_predicates, stratify
-from .expressions import TranslateToLogic
+from .expressions import Negation, TranslateToLogic
 from .instance import MapInstance
 
 FA2L = FunctionApplicationToPythonLambda()
@@ -152,6 +152,8 @@ class Chase(chase.Chase):
     def check_constraints(self, instance_update):
         code = Union(tuple(self.rules))
         stratified_code, stratifiable = stratify(code, self.datalog_program)
+        if self.goal is not None:
+            stratified_code = self._evaluate_goal_in_strata(stratified_code)
         self.stratified_code = stratified_code
 
         for stratum in self.stratified_code:
@@ -178,8 +180,45 @@ class Chase(chase.Chase):
             instance = self.execute_chase(stratum, instance_update, instance)
             instance_update = instance
             instance = MapInstance()
+            if self.goal_reached(instance_update):
+                break
         return instance_update
 
+    def _evaluate_goal_in_strata(self, stratified_code):
+        """
+        Adds the rules of the goal to the strata deriving predicates
+        they read, if they are positive and not aggregations, such that
+        the chase can stop as soon as the facts in a stratum entail the
+        goal, instead of after computing the whole stratum.
+        """
+        goal_rules = [
+            rule for stratum in stratified_code for rule in stratum
+            if rule.consequent.functor == self.goal
+        ]
+        goal_functors = set()
+        for rule in goal_rules:
+            predicates = extract_logic_predicates(rule.antecedent)
+            if is_aggregation_rule(rule) or any(
+                isinstance(predicate, Negation) for predicate in predicates
+            ):
+                return stratified_code
+            goal_functors |= set(
+                predicate.functor for predicate in predicates
+            )
+
+        new_stratified_code = []
+        for stratum in stratified_code:
+            if (
+                not any(rule in goal_rules for rule in stratum) and
+                any(
+                    rule.consequent.functor in goal_functors
+                    for rule in stratum
+                )
+            ):
+                stratum = list(stratum) + goal_rules
+            new_stratified_code.append(stratum)
+        return new_stratified_code
+
     def _stratum_is_aggregation_viable(self, seen_in_stratum, aggregate_rules):
         for rule in aggregate_rules:
             if any(
@@ -1,5 +1,6 @@
 from .general import (ChaseGeneral, ChaseNaive, ChaseNode, ChaseNonRecursive,
-                      ChaseSemiNaive, NeuroLangNonLinearProgramException,
+                      ChaseParallelSemiNaive, ChaseSemiNaive,
+                      NeuroLangNonLinearProgramException,
                       NeuroLangProgramHasLoopsException)
 from .mgu import ChaseMGUMixin
 from .relational_algebra import (ChaseNamedRelationalAlgebraMixin,
@@ -7,6 +8,7 @@ from .relational_algebra import (ChaseNamedRelationalAlgebraMixin,
 
 __all__ = [
     "ChaseGeneral", "ChaseNode", "ChaseNaive", "ChaseSemiNaive",
+    "ChaseParallelSemiNaive",
     "NeuroLangNonLinearProgramException", "ChaseMGUMixin", "ChaseNonRecursive",
     "ChaseRelationalAlgebraPlusCeriMixin", "ChaseNamedRelationalAlgebraMixin",
     "NeuroLangProgramHasLoopsException"
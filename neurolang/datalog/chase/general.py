@@ -1,21 +1,30 @@
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from itertools import chain, tee
 import logging
 from operator import contains, eq
-from typing import Iterable, Tuple
+from typing import AbstractSet, Iterable, Tuple
+
+import numpy as np
 
 from ...exceptions import NeuroLangException
+from ...expression_walker import ReplaceSymbolWalker
 from ...expressions import Constant, FunctionApplication, Symbol
 from ...logic.unification import (apply_substitution,
                                   apply_substitution_arguments,
                                   compose_substitutions)
 from ...type_system import (NeuroLangTypeException, Unknown, get_args,
                             is_leq_informative, unify_types)
-from ...utils import OrderedSet, log_performance
+from ...relational_algebra import RelationalAlgebraSolver
+from ...utils import OrderedSet, RelationalAlgebraSet, log_performance
 from ..expression_processing import (extract_logic_free_variables,
-                                     extract_logic_predicates, is_linear_rule,
+                                     extract_logic_predicates,
                                      dependency_matrix, program_has_loops)
+from ..expressions import Conjunction, Implication
 from ..instance import MapInstance
+from ..translate_to_named_ra import TranslateToNamedRA
+from .plan_cache import PLAN_CACHE
 
 
 LOG = logging.getLogger(__name__)
@@ -32,12 +41,26 @@ class NeuroLangProgramHasLoopsException(NeuroLangException):
     pass
 
 
+SUBSTITUTIONS = Symbol('__substitutions__')
+SUBSTITUTION_ROW = Symbol('__substitution_row__')
+
+
 class ChaseGeneral():
     """Chase implementation using the naive resolution algorithm.
 
+    Builtins are evaluated on the columns of the substitutions when
+    there are at least ``builtins_on_columns_threshold`` of them.
+
+    If a ``goal`` predicate symbol is given, the chase stops as soon as
+    a fact of the goal is derived, and the goal rules only compute the
+    columns of their consequent. The resulting instance then only
+    decides whether the goal holds.
     """
-    def __init__(self, datalog_program, rules=None):
+    builtins_on_columns_threshold = 16
+
+    def __init__(self, datalog_program, rules=None, goal=None):
         self.datalog_program = datalog_program
+        self.goal = goal
         self._set_rules(rules)
 
         self.builtins = datalog_program.builtins()
@@ -63,6 +86,9 @@ class ChaseGeneral():
     def check_constraints(self, instance_update):
         pass
 
+    def goal_reached(self, instance):
+        return self.goal is not None and self.goal in instance
+
     def chase_step(self, instance, rule, restriction_instance=None):
         if restriction_instance is None:
             restriction_instance = MapInstance()
@@ -80,13 +106,13 @@ class ChaseGeneral():
         builtin_predicates, builtin_predicates_ = tee(builtin_predicates)
         args_to_project = self.get_args_to_project(rule, builtin_predicates_)
 
-        rule_predicates_iterator = chain(
-            restricted_predicates, nonrestricted_predicates
-        )
-
-        substitutions = self.obtain_substitutions(
-            args_to_project, rule_predicates_iterator
-        )
+        substitutions = []
+        for rule_predicates_iterator in self.delta_predicate_variants(
+            restricted_predicates, nonrestricted_predicates, instance
+        ):
+            substitutions += self.obtain_substitutions(
+                args_to_project, rule_predicates_iterator
+            )
 
         substitutions = self.eliminate_already_computed(
             rule.consequent, instance, substitutions
@@ -100,6 +126,42 @@ class ChaseGeneral():
             rule, substitutions, instance, restriction_instance
         )
 
+    @staticmethod
+    def delta_predicate_variants(
+        restricted_predicates, nonrestricted_predicates, instance
+    ):
+        """
+        Semi-naive decomposition of a rule whose restricted predicates
+        read the new facts of the restriction instance. Each variant
+        reads the new facts for one of the restricted predicates, the
+        previous facts in ``instance`` for those preceding it and all
+        the facts for those following it, such that every derivation
+        using at least one new fact is obtained in exactly one variant.
+        """
+        if len(restricted_predicates) < 2:
+            yield chain(restricted_predicates, nonrestricted_predicates)
+            return
+
+        previous = []
+        complete = []
+        for predicate, new_facts in restricted_predicates:
+            functor = predicate.functor
+            if functor in instance:
+                facts = instance[functor].value
+                previous.append((predicate, facts - new_facts))
+                complete.append((predicate, facts | new_facts))
+            else:
+                previous.append((predicate, None))
+                complete.append((predicate, new_facts))
+
+        for i, restricted_predicate in enumerate(restricted_predicates):
+            if any(facts is None for _, facts in previous[:i]):
+                continue
+            yield chain(
+                previous[:i], (restricted_predicate,), complete[i + 1:],
+                nonrestricted_predicates
+            )
+
     def get_args_to_project(self, rule, builtin_predicates_):
         args_to_project = self.extract_variable_arguments(rule.consequent)
         for predicate, _ in builtin_predicates_:
@@ -119,6 +181,13 @@ class ChaseGeneral():
         predicates = [p for p, _ in builtin_predicates]
         if len(predicates) == 0:
             return substitutions
+        if len(substitutions) >= self.builtins_on_columns_threshold:
+            new_substitutions = self.evaluate_builtins_on_columns(
+                predicates, substitutions
+            )
+            if new_substitutions is not None:
+                return new_substitutions
+            new_substitutions = []
         for substitution in substitutions:
             updated_substitutions = self.evaluate_builtins_predicates(
                 predicates, substitution
@@ -126,6 +195,97 @@ class ChaseGeneral():
             new_substitutions += updated_substitutions
         return new_substitutions
 
+    def evaluate_builtins_on_columns(self, predicates, substitutions):
+        """
+        Evaluate the builtin predicates on all the substitutions at once,
+        compiling them into selections and extended projections of the
+        relational algebra set of the substitutions. Returns ``None`` if
+        the substitutions or the predicates can not be represented as
+        such.
+        """
+        variables = tuple(substitutions[0])
+        if len(variables) == 0:
+            return None
+        try:
+            rows = [
+                (i,) + tuple(substitution[v].value for v in variables)
+                for i, substitution in enumerate(substitutions)
+            ]
+        except (AttributeError, KeyError):
+            return None
+
+        plan = self.builtins_on_columns_plan(variables, tuple(predicates))
+        if plan is None:
+            return None
+        solver = RelationalAlgebraSolver({
+            SUBSTITUTIONS: Constant[AbstractSet](RelationalAlgebraSet(rows))
+        })
+        try:
+            result = solver.walk(plan).value
+        except (NeuroLangException, TypeError, ValueError):
+            return None
+
+        predicate_variables = {
+            variable.name: variable
+            for predicate in predicates
+            for variable in extract_logic_free_variables(predicate)
+        }
+        known_columns = set(v.name for v in variables + (SUBSTITUTION_ROW,))
+        new_variables = tuple(
+            predicate_variables[column] for column in result.columns
+            if column not in known_columns
+        )
+        if len(new_variables) == 0:
+            return [
+                substitutions[row[0]]
+                for row in result.projection(SUBSTITUTION_ROW.name)
+            ]
+        new_substitutions = []
+        for row in result.projection(
+            SUBSTITUTION_ROW.name, *(v.name for v in new_variables)
+        ):
+            substitution = dict(substitutions[row[0]])
+            for variable, value in zip(new_variables, row[1:]):
+                substitution[variable] = Constant(value)
+            new_substitutions.append(substitution)
+        return new_substitutions
+
+    def builtins_on_columns_plan(self, variables, predicates):
+        """
+        Named relational algebra plan evaluating the builtin predicates
+        on the set of substitutions ``SUBSTITUTIONS``, or ``None`` if the
+        predicates can not be translated. Plans are cached keyed by the
+        predicates where builtins are replaced by their values, such that
+        programs binding the same symbol to different functions do not
+        share them.
+        """
+        builtin_symbols = dict()
+        for predicate in predicates:
+            for symbol in predicate._symbols:
+                if symbol in self.builtins:
+                    builtin_symbols[symbol] = self.builtins[symbol]
+        if len(builtin_symbols) > 0:
+            predicates = ReplaceSymbolWalker(builtin_symbols).walk(
+                Conjunction(predicates)
+            ).formulas
+        return PLAN_CACHE.get(
+            ('builtins_on_columns_plan', variables, predicates),
+            lambda: (
+                self._builtins_on_columns_plan(variables, predicates),
+                builtin_symbols
+            )
+        )
+
+    @staticmethod
+    def _builtins_on_columns_plan(variables, predicates):
+        conjunction = Conjunction(
+            (SUBSTITUTIONS(SUBSTITUTION_ROW, *variables),) + predicates
+        )
+        try:
+            return TranslateToNamedRA().walk(conjunction)
+        except NeuroLangException:
+            return None
+
     def evaluate_builtins_predicates(
         self, predicates_to_evaluate, substitution
     ):
@@ -444,6 +604,8 @@ class ChaseNonRecursive:
                 instance_update |= self.chase_step(
                     instance, rule, restriction_instance=instance_update
                 )
+            if self.goal_reached(instance_update):
+                break
         return instance_update
 
     def check_constraints(self, instance_update):
@@ -471,42 +633,250 @@ class ChaseNaive:
                         instance | instance_update, rule,
                     )
                 new_update |= upd
+                if self.goal_reached(upd):
+                    return instance | new_update
             instance_update = new_update
         return instance
 
 
 class ChaseSemiNaive:
     """Chase implementation using the semi-naive algorithm.
-    This algorithm will not work if there are non-linear rules.
-       """
+    At each iteration, rules are only evaluated on the derivations using
+    at least one of the facts obtained in the previous iteration. Facts
+    obtained by a rule are visible to the rules evaluated after it.
+    """
 
     def execute_chase(self, rules, instance_update, instance):
-        continue_chase = len(instance_update) > 0
-        while continue_chase:
-            instance |= instance_update
-            instance_update = MapInstance()
-            continue_chase = False
+        instance = instance | instance_update
+        return self.propagate_instance_update(
+            rules, instance_update, instance, evaluate_all_rules=True
+        )
+
+    def propagate_instance_update(
+        self, rules, instance_update, instance, evaluate_all_rules=False
+    ):
+        """
+        Semi-naive iterations from ``instance``, which already contains
+        the new facts in ``instance_update``. Unless
+        ``evaluate_all_rules`` is set, the rules that do not read any
+        new fact are not evaluated in the first iteration.
+        """
+        first_iteration = evaluate_all_rules
+        while len(instance_update) > 0:
+            new_instance_update = MapInstance()
             for rule in rules:
+                if not (
+                    first_iteration or
+                    self.rule_reads_instance(rule, instance_update)
+                ):
+                    continue
                 with log_performance(LOG, 'Evaluating rule %s', (rule,)):
-                    instance_update = self.per_rule_update(
-                        rule, instance, instance_update
+                    rule_update = self.chase_step(
+                        instance, rule, restriction_instance=instance_update
                     )
-                continue_chase |= len(instance_update) > 0
+                if len(rule_update) > 0:
+                    instance |= rule_update
+                    new_instance_update = new_instance_update | rule_update
+                if self.goal_reached(rule_update):
+                    return instance
+            instance_update = new_instance_update
+            first_iteration = False
         return instance
 
-    def per_rule_update(self, rule, instance, instance_update):
-        new_instance_update = self.chase_step(
-            instance, rule, restriction_instance=instance_update
+    def update_chase_solution(
+        self, instance, inserted=None, deleted=None,
+        new_rules=tuple(), removed_rules=tuple()
+    ):
+        """
+        Updates ``instance``, the chase solution of the program before
+        the facts in ``inserted`` and ``deleted`` were added to and
+        removed from its extensional database, and the rules in
+        ``new_rules`` and ``removed_rules`` were added to and removed
+        from it. The rules of the chase are those of the updated
+        program, which must be monotonic.
+
+        Deletions are maintained with the DRed algorithm [1]_: the
+        facts with a derivation using a deleted fact or rule are
+        removed, those which are still derivable are rederived, and
+        the insertions are propagated with semi-naive iterations.
+
+        .. [1] A. Gupta, I. S. Mumick, V. S. Subrahmanian, "Maintaining
+           views incrementally", SIGMOD '93, pp. 157–166.
+        """
+        if inserted is None:
+            inserted = MapInstance()
+        if deleted is None:
+            deleted = MapInstance()
+        previous_rules = [
+            rule for rule in self.rules if rule not in new_rules
+        ] + list(removed_rules)
+
+        instance, instance_update = self.delete_and_rederive(
+            instance, deleted, previous_rules, removed_rules
+        )
+        instance_update = instance_update | (inserted - instance)
+        instance = instance | instance_update
+        for rule in new_rules:
+            with log_performance(LOG, 'Evaluating rule %s', (rule,)):
+                rule_update = self.chase_step(instance, rule)
+            if len(rule_update) > 0:
+                instance |= rule_update
+                instance_update = instance_update | rule_update
+        return self.propagate_instance_update(
+            self.rules, instance_update, instance
         )
-        if len(new_instance_update) > 0:
-            instance_update |= new_instance_update
-        return instance_update
 
-    def check_constraints(self, instance_update):
-        super().check_constraints(instance_update)
-        for rule in self.rules:
-            if not is_linear_rule(rule):
-                raise NeuroLangNonLinearProgramException(
-                    f"Rule {rule} is non-linear. "
-                    "Use a different resolution algorithm"
-                )
+    def delete_and_rederive(self, instance, deleted, rules, removed_rules):
+        """
+        Removes from ``instance``, the chase solution for ``rules``, the
+        facts in ``deleted`` and those derived by ``removed_rules``.
+        Returns the remaining instance and the removed facts which are
+        still derivable from it.
+        """
+        over_deleted = MapInstance() | deleted
+        for rule in removed_rules:
+            over_deleted = over_deleted | self.rule_derivations(instance, rule)
+        deletion_update = over_deleted
+        while len(deletion_update) > 0:
+            new_deletion_update = MapInstance()
+            for rule in rules:
+                if self.rule_reads_instance(rule, deletion_update):
+                    new_deletion_update = (
+                        new_deletion_update |
+                        self.rule_derivations(
+                            instance, rule, deletion_update
+                        )
+                    )
+            deletion_update = new_deletion_update - over_deleted
+            over_deleted = over_deleted | deletion_update
+
+        instance = instance - over_deleted
+        rederived = MapInstance()
+        for rule in rules:
+            if (
+                rule in removed_rules or
+                rule.consequent.functor not in over_deleted
+            ):
+                continue
+            rederived = rederived | (
+                self.rule_derivations(instance, rule) & over_deleted
+            )
+        return instance, rederived
+
+    def rule_derivations(self, instance, rule, restriction_instance=None):
+        """
+        Facts derived by ``rule`` from ``instance``, including those
+        already in it. If ``restriction_instance`` is given, only those
+        with a derivation using some of its facts are returned.
+        """
+        functor = rule.consequent.functor
+        fresh_functor = Symbol[functor.type].fresh()
+        derivation_rule = Implication(
+            fresh_functor(*rule.consequent.args), rule.antecedent
+        )
+        derivations = self.chase_step(
+            instance, derivation_rule,
+            restriction_instance=restriction_instance
+        )
+        if fresh_functor not in derivations:
+            return MapInstance()
+        return MapInstance({functor: derivations[fresh_functor]})
+
+    @staticmethod
+    def rule_reads_instance(rule, instance):
+        return any(
+            predicate.functor in instance
+            for predicate in extract_logic_predicates(rule.antecedent)
+            if isinstance(predicate, FunctionApplication)
+        )
+
+
+class ChaseParallelSemiNaive(ChaseSemiNaive):
+    """Chase implementation using the semi-naive algorithm, where the
+    rules of an iteration are evaluated concurrently.
+
+    Rules are grouped according to the dependency matrix of the program:
+    rules deriving mutually recursive predicates share a group and each
+    group only reads predicates derived in it or in the preceding
+    groups. The rules of a group are evaluated on a pool of
+    ``max_workers`` workers, and their updates are merged into the
+    instance once the whole group has been evaluated.
+    """
+    executor_class = ThreadPoolExecutor
+
+    def __init__(
+        self, datalog_program, rules=None, goal=None, max_workers=None
+    ):
+        super().__init__(datalog_program, rules=rules, goal=goal)
+        self.max_workers = max_workers
+
+    def propagate_instance_update(
+        self, rules, instance_update, instance, evaluate_all_rules=False
+    ):
+        rule_groups = self.rule_groups(rules)
+        first_iteration = evaluate_all_rules
+        with self.executor_class(max_workers=self.max_workers) as executor:
+            while len(instance_update) > 0:
+                new_instance_update = MapInstance()
+                for rule_group in rule_groups:
+                    rule_group = [
+                        rule for rule in rule_group
+                        if (
+                            first_iteration or
+                            self.rule_reads_instance(rule, instance_update)
+                        )
+                    ]
+                    rule_updates = list(executor.map(
+                        partial(
+                            self.evaluate_rule, instance, instance_update
+                        ),
+                        rule_group
+                    ))
+                    for rule_update in rule_updates:
+                        if len(rule_update) > 0:
+                            instance |= rule_update
+                            new_instance_update = (
+                                new_instance_update | rule_update
+                            )
+                    if self.goal_reached(new_instance_update):
+                        return instance
+                instance_update = new_instance_update
+                first_iteration = False
+        return instance
+
+    def evaluate_rule(self, instance, instance_update, rule):
+        with log_performance(LOG, 'Evaluating rule %s', (rule,)):
+            return self.chase_step(
+                instance, rule, restriction_instance=instance_update
+            )
+
+    def rule_groups(self, rules):
+        symbols, dependencies = dependency_matrix(
+            self.datalog_program, rules=rules
+        )
+        dependencies = dependencies > 0
+        reachable = dependencies
+        for _ in range(len(symbols)):
+            new_reachable = reachable | (
+                reachable.astype(int) @ dependencies.astype(int) > 0
+            )
+            if (new_reachable == reachable).all():
+                break
+            reachable = new_reachable
+        dependencies &= ~(reachable & reachable.T)
+
+        levels = np.zeros(len(symbols), dtype=int)
+        for _ in range(len(symbols)):
+            new_levels = np.maximum(
+                levels,
+                np.where(dependencies, levels + 1, 0).max(axis=1, initial=0)
+            )
+            if (new_levels == levels).all():
+                break
+            levels = new_levels
+
+        rule_groups = defaultdict(list)
+        for rule in rules:
+            level = levels[symbols.index(rule.consequent.functor)]
+            rule_groups[level].append(rule)
+        return [rule_groups[level] for level in sorted(rule_groups)]
@@ -1,11 +1,12 @@
-from itertools import chain, tee
+from collections import OrderedDict
+from itertools import tee
 
 from ...exceptions import NeuroLangException
-from ...expressions import Constant
+from ...expressions import Constant, Symbol
 from ...logic.unification import (apply_substitution_arguments,
                                   compose_substitutions,
                                   most_general_unifier_arguments)
-from ...utils import OrderedSet
+from ...utils import NamedRelationalAlgebraFrozenSet, OrderedSet
 from .. import Negation
 from ..expression_processing import extract_logic_predicates
 from . import (ChaseGeneral, ChaseMGUMixin,
@@ -45,13 +46,13 @@ class DatalogChaseNegationGeneral(
         builtin_predicates, builtin_predicates_ = tee(builtin_predicates)
         args_to_project = self.get_args_to_project(rule, builtin_predicates_)
 
-        rule_predicates_iterator = chain(
-            restricted_predicates, nonrestricted_predicates
-        )
-
-        substitutions = self.obtain_substitutions(
-            args_to_project, rule_predicates_iterator
-        )
+        substitutions = []
+        for rule_predicates_iterator in self.delta_predicate_variants(
+            restricted_predicates, nonrestricted_predicates, instance
+        ):
+            substitutions += self.obtain_substitutions(
+                args_to_project, rule_predicates_iterator
+            )
 
         substitutions = self.obtain_negative_substitutions(
             args_to_project, negative_predicates, substitutions
@@ -191,10 +192,66 @@ class DatalogChaseNegationGeneral(
 class DatalogChaseNegationRelationalAlgebraMixin(
     ChaseRelationalAlgebraPlusCeriMixin
 ):
+    """
+    Negated predicates are solved by anti-joining the set of all the
+    substitutions with the tuples of each negated predicate, instead of
+    unifying them one substitution at a time.
+    """
     def obtain_negative_substitutions(
-        self, args_to_project, rule_predicates_iterator, substitutions
+        self, args_to_project, negative_predicates, substitutions
     ):
-        raise NotImplementedError()
+        if len(negative_predicates) > 0 and len(substitutions) > 0:
+            variables = tuple(substitutions[0])
+            row_column = Symbol.fresh().name
+            substitution_set = NamedRelationalAlgebraFrozenSet(
+                (row_column,) + tuple(v.name for v in variables),
+                (
+                    (i,) + tuple(
+                        substitution[v].value for v in variables
+                    )
+                    for i, substitution in enumerate(substitutions)
+                )
+            )
+            for predicate, representation in negative_predicates:
+                substitution_set = substitution_set.antijoin(
+                    self.negated_predicate_relation(predicate, representation)
+                )
+            substitutions = [
+                substitutions[i]
+                for i in sorted(
+                    row[0] for row in substitution_set.projection(row_column)
+                )
+            ]
+        return [
+            {
+                k: v
+                for k, v in substitution.items()
+                if k in args_to_project
+            }
+            for substitution in substitutions
+        ]
+
+    @staticmethod
+    def negated_predicate_relation(predicate, representation):
+        relation = representation.unwrap()
+        selections = dict()
+        column_selections = dict()
+        variable_columns = OrderedDict()
+        for i, arg in enumerate(predicate.args):
+            if isinstance(arg, Constant):
+                selections[i] = arg.value
+            elif arg in variable_columns:
+                column_selections[i] = variable_columns[arg]
+            else:
+                variable_columns[arg] = i
+        if len(selections) > 0:
+            relation = relation.selection(selections)
+        if len(column_selections) > 0:
+            relation = relation.selection_columns(column_selections)
+        return NamedRelationalAlgebraFrozenSet(
+            tuple(v.name for v in variable_columns),
+            relation.projection(*variable_columns.values())
+        )
 
 
 class DatalogChaseNegationMGUMixin(ChaseMGUMixin):
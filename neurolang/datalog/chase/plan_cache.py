@@ -0,0 +1,86 @@
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from threading import RLock
+
+from ...expressions import Symbol
+
+
+PlanCacheInfo = namedtuple('PlanCacheInfo', 'hits misses maxsize currsize')
+
+
+class PlanCache:
+    """
+    Size-bounded, least recently used, cache of query plans shared by
+    all the chase instances of the process. Each plan is stored along
+    with the symbols its computation depended on, such that it can be
+    invalidated when their definition changes.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._plans = OrderedDict()
+        self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute_plan):
+        """
+        Obtain the plan for ``key``, calling ``compute_plan`` to produce
+        it if it is not in the cache. ``compute_plan`` returns the plan
+        and the symbols it depends on.
+        """
+        with self._lock:
+            if key in self._plans:
+                self.hits += 1
+                self._plans.move_to_end(key)
+                return self._plans[key][0]
+            self.misses += 1
+        plan, dependencies = compute_plan()
+        with self._lock:
+            self._plans[key] = (plan, frozenset(dependencies))
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def invalidate(self, symbols):
+        """
+        Remove the plans depending on any of the symbols.
+        """
+        names = set(
+            symbol.name if isinstance(symbol, Symbol) else symbol
+            for symbol in symbols
+        )
+        with self._lock:
+            for key, (_, dependencies) in list(self._plans.items()):
+                if any(
+                    dependency.name in names for dependency in dependencies
+                ):
+                    del self._plans[key]
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return PlanCacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._plans)
+            )
+
+
+PLAN_CACHE = PlanCache()
+
+
+def cache_plan(method):
+    """
+    Decorator caching, in the plan cache of the process, the result of
+    a method which only depends on its arguments.
+    """
+    @wraps(method)
+    def cached_method(self, *args):
+        return PLAN_CACHE.get(
+            (method.__qualname__,) + args,
+            lambda: (method(self, *args), ())
+        )
+    return cached_method
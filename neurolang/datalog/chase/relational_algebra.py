@@ -1,24 +1,30 @@
 import logging
 import operator
+import threading
 from collections import defaultdict
-from functools import lru_cache
+from types import SimpleNamespace
 from typing import AbstractSet, Callable
 
 from ...expressions import Constant, FunctionApplication, Symbol
-from ...expression_walker import ExpressionWalker, ReplaceSymbolWalker
+from ...expression_walker import FixpointRewriteWalker, ReplaceSymbolWalker
 from ...logic.unification import apply_substitution_arguments
 from ...relational_algebra import (ColumnInt, Product, Projection,
+                                   RelationalAlgebraMultiwayJoins,
                                    RelationalAlgebraOptimiser,
                                    RelationalAlgebraPushInSelections,
-                                   RelationalAlgebraSolver, Selection, eq_)
+                                   RelationalAlgebraSemiJoinProjections,
+                                   RelationalAlgebraSolver, Selection, Union,
+                                   eq_, str2columnstr_constant)
 from ...type_system import Unknown, is_leq_informative
-from ...utils import NamedRelationalAlgebraFrozenSet
+from ...utils import NamedRelationalAlgebraFrozenSet, OrderedSet
+from ...utils.relational_algebra_set import deferred_evaluation
 from ..expression_processing import extract_logic_free_variables
 from ..expressions import Conjunction, Implication
 from ..instance import MapInstance
 from ..translate_to_named_ra import TranslateToNamedRA
 from ..wrapped_collections import (WrappedNamedRelationalAlgebraFrozenSet,
                                    WrappedRelationalAlgebraSet)
+from .plan_cache import PLAN_CACHE, cache_plan
 
 
 LOG = logging.getLogger(__name__)
@@ -60,17 +66,19 @@ class ChaseRelationalAlgebraPlusCeriMixin:
         args_to_project,
         rule_predicates_iterator
     ):
-        self.seen_vars = dict()
-        self.selections = []
-        self.projections = tuple()
-        self.projected_var_names = dict()
+        state = SimpleNamespace(
+            seen_vars=dict(),
+            selections=[],
+            projections=tuple(),
+            projected_var_names=dict()
+        )
         column = 0
         new_ra_expressions = tuple()
         rule_predicates_iterator = list(rule_predicates_iterator)
         for pred_ra in rule_predicates_iterator:
             ra_expression_arity = pred_ra[1].arity
             new_ra_expression = self.translate_predicate(
-                pred_ra, column, args_to_project
+                state, pred_ra, column, args_to_project
             )
             new_ra_expressions += (new_ra_expression,)
             column += ra_expression_arity
@@ -79,26 +87,22 @@ class ChaseRelationalAlgebraPlusCeriMixin:
                 relation = new_ra_expressions[0]
             else:
                 relation = Product(new_ra_expressions)
-            for s1, s2 in self.selections:
+            for s1, s2 in state.selections:
                 relation = Selection(relation, eq_(s1, s2))
-            relation = Projection(relation, self.projections)
+            relation = Projection(relation, state.projections)
         else:
             relation = Constant[AbstractSet](self.datalog_program.new_set())
-        projected_var_names = self.projected_var_names
-        del self.seen_vars
-        del self.selections
-        del self.projections
-        del self.projected_var_names
-        return relation, projected_var_names
-
-    def translate_predicate(self, pred_ra, column, args_to_project):
+        return relation, state.projected_var_names
+
+    def translate_predicate(self, state, pred_ra, column, args_to_project):
         predicate, ra_expression = pred_ra
         local_selections = []
         for i, arg in enumerate(predicate.args):
             c = Constant[ColumnInt](ColumnInt(column + i))
             local_column = Constant[ColumnInt](ColumnInt(i))
             self.translate_predicate_process_argument(
-                arg, local_selections, local_column, c, args_to_project
+                state, arg, local_selections, local_column, c,
+                args_to_project
             )
         new_ra_expression = Constant[AbstractSet](ra_expression)
         for s1, s2 in local_selections:
@@ -106,26 +110,26 @@ class ChaseRelationalAlgebraPlusCeriMixin:
         return new_ra_expression
 
     def translate_predicate_process_argument(
-        self, arg, local_selections, local_column,
+        self, state, arg, local_selections, local_column,
         global_column, args_to_project
     ):
         if isinstance(arg, Constant):
             local_selections.append((local_column, arg))
         elif isinstance(arg, Symbol):
             self.translate_predicate_process_argument_symbol(
-                arg, global_column, args_to_project
+                state, arg, global_column, args_to_project
             )
 
     def translate_predicate_process_argument_symbol(
-        self, arg, global_column, args_to_project
+        self, state, arg, global_column, args_to_project
     ):
-        if arg in self.seen_vars:
-            self.selections.append((self.seen_vars[arg], global_column))
+        if arg in state.seen_vars:
+            state.selections.append((state.seen_vars[arg], global_column))
         else:
             if arg in args_to_project:
-                self.projected_var_names[arg] = len(self.projections)
-                self.projections += (global_column,)
-            self.seen_vars[arg] = global_column
+                state.projected_var_names[arg] = len(state.projections)
+                state.projections += (global_column,)
+            state.seen_vars[arg] = global_column
 
     def compute_substitutions(self, result, projected_var_names):
         substitutions = []
@@ -140,7 +144,7 @@ class ChaseRelationalAlgebraPlusCeriMixin:
 
 class NamedRelationalAlgebraOptimiser(
     RelationalAlgebraPushInSelections,
-    ExpressionWalker
+    FixpointRewriteWalker
 ):
     pass
 
@@ -153,7 +157,15 @@ class ChaseNamedRelationalAlgebraMixin:
     ..[1] S. Abiteboul, R. Hull, V. Vianu, Foundations of databases
       (Addison Wesley, 1995), Addison-Wesley.
 
+    The delta symbols and the plans of the conjunctions are cached in the
+    chase, and are shared by the rules evaluated concurrently.
     """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._delta_symbols = dict()
+        self._delta_symbols_lock = threading.Lock()
+        self._named_ra_plans = dict()
+
     def chase_step(self, instance, rule, restriction_instance=None):
         if restriction_instance is None:
             restriction_instance = MapInstance()
@@ -168,8 +180,19 @@ class ChaseNamedRelationalAlgebraMixin:
         else:
             predicates = (rule.antecedent,)
 
+        columns = None
+        if (
+            self.goal is not None and
+            consequent.functor == self.goal and
+            all(isinstance(arg, Symbol) for arg in consequent.args)
+        ):
+            columns = tuple(
+                str2columnstr_constant(arg.name)
+                for arg in OrderedSet(consequent.args)
+            )
+
         substitutions = self.obtain_substitutions(
-            predicates, instance, restriction_instance
+            predicates, instance, restriction_instance, columns=columns
         )
 
         if consequent.functor in instance:
@@ -185,7 +208,7 @@ class ChaseNamedRelationalAlgebraMixin:
             rule, substitutions, instance, restriction_instance
         )
 
-    @lru_cache(1024)
+    @cache_plan
     def rewrite_constants_in_consequent(self, rule):
         new_equalities = []
         new_args = tuple()
@@ -201,7 +224,7 @@ class ChaseNamedRelationalAlgebraMixin:
             )
         return rule
 
-    @lru_cache(1024)
+    @cache_plan
     def rewrite_antecedent_equalities(self, rule):
         if not isinstance(rule.antecedent, Conjunction):
             return rule
@@ -269,14 +292,9 @@ class ChaseNamedRelationalAlgebraMixin:
                 .projection(*args_to_project)
             )
         )
-        if substitutions_columns.symmetric_difference(args):
-            already_computed = (
-                already_computed
-                .naturaljoin(substitutions)
-                .projection(*substitutions.columns)
-            )
-        substitutions_unwrapped = substitutions.unwrap()
-        substitutions_unwrapped = substitutions_unwrapped - already_computed
+        substitutions_unwrapped = (
+            substitutions.unwrap().antijoin(already_computed)
+        )
 
         res = WrappedNamedRelationalAlgebraFrozenSet(
             substitutions_unwrapped.columns,
@@ -288,8 +306,15 @@ class ChaseNamedRelationalAlgebraMixin:
         return res
 
     def obtain_substitutions(
-        self, rule_predicates_iterator, instance, restriction_instance
+        self, rule_predicates_iterator, instance, restriction_instance,
+        columns=None
     ):
+        """
+        Named relational algebra set of the substitutions satisfying
+        the predicates. If ``columns`` are given, only those are
+        computed, and joins whose other columns are projected out are
+        evaluated as semijoins.
+        """
         symbol_table = defaultdict(
             lambda: Constant[AbstractSet](WrappedRelationalAlgebraSet())
         )
@@ -304,12 +329,26 @@ class ChaseNamedRelationalAlgebraMixin:
         if len(predicates) == 0:
             return [{}]
 
-        ra_code = self.translate_conjunction_to_named_ra(
-            Conjunction(predicates)
-        )
+        ra_code = None
+        for conjunction in self.delta_conjunctions(
+            predicates, instance, restriction_instance, symbol_table
+        ):
+            variant_code = self.translate_conjunction_to_named_ra(conjunction)
+            variant_code = RelationalAlgebraMultiwayJoins(symbol_table).walk(
+                variant_code
+            )
+            if columns is not None:
+                variant_code = RelationalAlgebraSemiJoinProjections(
+                    symbol_table
+                ).walk(Projection(variant_code, columns))
+            if ra_code is None:
+                ra_code = variant_code
+            else:
+                ra_code = Union(ra_code, variant_code)
 
         LOG.info('About to execute RA query %s', ra_code)
-        result = RelationalAlgebraSolver(symbol_table).walk(ra_code)
+        with deferred_evaluation():
+            result = RelationalAlgebraSolver(symbol_table).walk(ra_code)
 
         result_value = result.value
         substitutions = WrappedNamedRelationalAlgebraFrozenSet(
@@ -319,18 +358,128 @@ class ChaseNamedRelationalAlgebraMixin:
 
         return substitutions
 
-    @lru_cache(1024)
+    def delta_conjunctions(
+        self, predicates, instance, restriction_instance, symbol_table
+    ):
+        """
+        Semi-naive decomposition of the conjunction of predicates, where
+        the facts in the restriction instance are new. Each conjunction
+        reads the new facts for one of the predicates in the restriction
+        instance, the previous facts for those preceding it and all the
+        facts for those following it, such that every derivation using
+        new facts is obtained once. The symbols standing for new and
+        previous facts are added to ``symbol_table``.
+        """
+        restricted = [
+            i for i, predicate in enumerate(predicates)
+            if (
+                isinstance(predicate, FunctionApplication) and
+                predicate.functor in restriction_instance
+            )
+        ]
+        if len(restricted) == 0:
+            yield Conjunction(predicates)
+            return
+
+        for position, i in enumerate(restricted):
+            preceding = restricted[:position]
+            if any(
+                predicates[j].functor not in instance for j in preceding
+            ):
+                continue
+            new_predicates = list(predicates)
+            for j in preceding:
+                new_predicates[j] = self._delta_predicate(
+                    predicates[j], instance, restriction_instance,
+                    symbol_table, previous=True
+                )
+            new_predicates[i] = self._delta_predicate(
+                predicates[i], instance, restriction_instance, symbol_table
+            )
+            yield Conjunction(tuple(new_predicates))
+
+    def _delta_predicate(
+        self, predicate, instance, restriction_instance, symbol_table,
+        previous=False
+    ):
+        functor = predicate.functor
+        with self._delta_symbols_lock:
+            if functor not in self._delta_symbols:
+                self._delta_symbols[functor] = (
+                    Symbol[functor.type].fresh(), Symbol[functor.type].fresh()
+                )
+            new_symbol, previous_symbol = self._delta_symbols[functor]
+        new_facts = restriction_instance[functor]
+        if previous:
+            facts = instance[functor]
+            symbol_table[previous_symbol] = facts.apply(
+                facts.value - new_facts.value
+            )
+            return previous_symbol(*predicate.args)
+        else:
+            symbol_table[new_symbol] = new_facts
+            return new_symbol(*predicate.args)
+
     def translate_conjunction_to_named_ra(self, conjunction):
-        builtin_symbols = {
-            k: v
-            for k, v in self.datalog_program.symbol_table.items()
+        """
+        Optimised named relational algebra plan for the conjunction.
+        Plans are kept in the plan cache of the process, keyed by the
+        conjunction where builtins are replaced by their values and
+        predicate symbols by placeholders, such that conjunctions which
+        only differ in the relations they read share the plan.
+        """
+        if conjunction in self._named_ra_plans:
+            return self._named_ra_plans[conjunction]
+
+        original_conjunction = conjunction
+        symbol_table = self.datalog_program.symbol_table
+        builtin_symbols = dict()
+        for symbol in conjunction._symbols:
+            if symbol not in symbol_table:
+                continue
+            value = symbol_table[symbol]
             if (
-                v.type is not Unknown and
-                is_leq_informative(v.type, Callable)
+                value.type is not Unknown and
+                is_leq_informative(value.type, Callable)
+            ):
+                builtin_symbols[symbol] = value
+        if len(builtin_symbols) > 0:
+            conjunction = ReplaceSymbolWalker(builtin_symbols).walk(
+                conjunction
             )
-        }
-        rsw = ReplaceSymbolWalker(builtin_symbols)
-        conjunction = rsw.walk(conjunction)
+
+        placeholders = dict()
+        formulas = tuple()
+        for formula in conjunction.formulas:
+            if (
+                isinstance(formula, FunctionApplication) and
+                isinstance(formula.functor, Symbol)
+            ):
+                functor = formula.functor
+                if functor not in placeholders:
+                    placeholders[functor] = Symbol[functor.type](
+                        f'__relation_{len(placeholders)}__'
+                    )
+                formula = formula.apply(placeholders[functor], formula.args)
+            formulas += (formula,)
+        conjunction = conjunction.apply(formulas)
+
+        ra_code = PLAN_CACHE.get(
+            ('translate_conjunction_to_named_ra', conjunction),
+            lambda: (
+                self._translate_conjunction_to_named_ra(conjunction),
+                builtin_symbols
+            )
+        )
+        if len(placeholders) > 0:
+            ra_code = ReplaceSymbolWalker({
+                placeholder: functor
+                for functor, placeholder in placeholders.items()
+            }).walk(ra_code)
+        return self._named_ra_plans.setdefault(original_conjunction, ra_code)
+
+    @staticmethod
+    def _translate_conjunction_to_named_ra(conjunction):
         traslator_to_named_ra = TranslateToNamedRA()
         LOG.info(f"Translating and optimising CQ {conjunction} to RA")
         ra_code = traslator_to_named_ra.walk(conjunction)
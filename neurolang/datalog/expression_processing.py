@@ -250,7 +250,7 @@ def stratify(union, datalog_instance):
             to_process, seen
         )
         to_process = new_to_process
-        if len(new_seen) > 0:
+        if len(stratum) > 0:
             strata.append(stratum)
             seen |= new_seen
         else:
@@ -284,6 +284,8 @@ def stratify_obtain_new_stratum(to_process, seen):
             new_seen.add(r.consequent.functor)
         else:
             new_to_process.append(r)
+    # predicates with rules left to process are not complete yet
+    new_seen -= set(r.consequent.functor for r in new_to_process)
     return new_seen, new_to_process, stratum
 
 
@@ -4,6 +4,7 @@ Magic Sets [1] rewriting implementation for Datalog.
 [1] F. Bancilhon, D. Maier, Y. Sagiv, J. D. Ullman, in ACM PODS ’86, pp. 1–15.
 '''
 
+from ..expression_walker import ExpressionWalker, add_match
 from ..expressions import Constant, Symbol
 from ..type_system import Unknown
 from . import expression_processing, extract_logic_predicates
@@ -57,6 +58,26 @@ class AdornedExpression(Symbol):
         )
 
 
+class ReplaceAdornedExpressions(ExpressionWalker):
+    """
+    Replace every adorned symbol by a fresh plain symbol, such that
+    the rewritten code can be added to programs which look up
+    predicates by name. Replacements can be given for some of them.
+    """
+    def __init__(self, symbol_replacements=None):
+        if symbol_replacements is None:
+            symbol_replacements = dict()
+        self.symbol_replacements = dict(symbol_replacements)
+
+    @add_match(AdornedExpression)
+    def adorned_expression(self, expression):
+        if expression not in self.symbol_replacements:
+            self.symbol_replacements[expression] = (
+                Symbol[expression.type].fresh()
+            )
+        return self.symbol_replacements[expression]
+
+
 def magic_rewrite(query, datalog):
     adorned_code = reachable_adorned_code(query, datalog)
     # assume that the query rule is the last
@@ -109,11 +130,19 @@ def create_magic_rules(adorned_code, idb, edb):
         edb_antecedent = create_magic_rules_create_edb_antecedent(
             predicates, edb
         )
-        new_antecedent = (new_consequent,)
+        if isinstance(new_consequent, Constant):
+            new_antecedent = tuple()
+        else:
+            new_antecedent = (new_consequent,)
+        edb_antecedent = remove_unsafe_builtins(
+            new_antecedent, edb_antecedent
+        )
         for predicate in edb_antecedent:
             new_antecedent += (predicate,)
 
-        if len(new_antecedent) == 1:
+        if len(new_antecedent) == 0:
+            new_antecedent = new_consequent
+        elif len(new_antecedent) == 1:
             new_antecedent = new_antecedent[0]
         else:
             new_antecedent = Conjunction(new_antecedent)
@@ -136,11 +165,35 @@ def create_magic_rules_create_edb_antecedent(predicates, edb):
             isinstance(functor, AdornedExpression) and
             'b' in functor.adornment
         ):
-            predicate = Symbol(predicate.functor.name)(*predicate.args)
+            if isinstance(functor.expression, Constant):
+                predicate = functor.expression(*predicate.args)
+            else:
+                predicate = Symbol(functor.name)(*predicate.args)
             edb_antecedent.append(predicate)
     return edb_antecedent
 
 
+def remove_unsafe_builtins(magic_antecedent, edb_antecedent):
+    """
+    Builtins are only kept in the body of a magic rule when all their
+    variables are bound by the rest of the body, dropping them only
+    makes the magic predicate larger.
+    """
+    bound_variables = set()
+    for predicate in tuple(magic_antecedent) + tuple(edb_antecedent):
+        if not isinstance(predicate.functor, Constant):
+            bound_variables.update(
+                arg for arg in predicate.args if isinstance(arg, Symbol)
+            )
+    return [
+        predicate for predicate in edb_antecedent
+        if not isinstance(predicate.functor, Constant) or all(
+            arg in bound_variables for arg in predicate.args
+            if isinstance(arg, Symbol)
+        )
+    ]
+
+
 def create_magic_rules_create_rules(new_antecedent, predicates, idb, i):
     magic_rules = []
     for predicate in predicates:
@@ -193,6 +246,8 @@ def obtain_new_antecedent(rule, edb, rule_number):
             new_antecedent.append(
                 Symbol(functor.name)(*predicate.args)
             )
+        elif 'b' not in functor.adornment:
+            new_antecedent.append(predicate)
         else:
             m_p = magic_predicate(predicate, rule_number)
             update = [m_p, predicate]
@@ -309,10 +364,8 @@ def adorn_antecedent(
 
     for predicate in predicates:
         if (
-            (
-                isinstance(predicate.functor, Constant) or
-                predicate.functor.name in edb
-            ) and
+            not isinstance(predicate.functor, Constant) and
+            predicate.functor.name in edb and
             len(bound_variables.intersection(predicate.args)) > 0
         ):
             bound_variables.update(
@@ -59,10 +59,11 @@ class DatalogProgramNegationMixin(PatternWalker):
                 "All variables on the consequent need to be on the antecedent"
             )
 
-        if consequent.functor.name in self.symbol_table:
-            value = self.symbol_table[consequent.functor.name]
+        symbol = consequent.functor.cast(UnionOfConjunctiveQueries)
+        if symbol in self.symbol_table:
+            value = self.symbol_table[symbol]
             self._is_previously_defined(value)
-            disj = self.symbol_table[consequent.functor.name].formulas
+            disj = value.formulas
             self._is_in_idb(expression, disj)
 
         else:
@@ -71,7 +72,6 @@ class DatalogProgramNegationMixin(PatternWalker):
         if expression not in disj:
             disj += (expression,)
 
-        symbol = consequent.functor.cast(UnionOfConjunctiveQueries)
         self.symbol_table[symbol] = Union(disj)
 
         return expression
@@ -9,8 +9,8 @@ from ... import expressions
 from ..basic_representation import DatalogProgram
 from ..chase import (ChaseGeneral, ChaseMGUMixin, ChaseNaive,
                      ChaseNamedRelationalAlgebraMixin, ChaseNode,
-                     ChaseNonRecursive, ChaseRelationalAlgebraPlusCeriMixin,
-                     ChaseSemiNaive, NeuroLangNonLinearProgramException,
+                     ChaseNonRecursive, ChaseParallelSemiNaive,
+                     ChaseRelationalAlgebraPlusCeriMixin, ChaseSemiNaive,
                      NeuroLangProgramHasLoopsException)
 from ..expressions import (Conjunction, Fact, Implication, TranslateToLogic,
                            Union)
@@ -68,7 +68,8 @@ chase_configurations = [
         (
             ChaseNonRecursive,
             ChaseNaive,
-            ChaseSemiNaive
+            ChaseSemiNaive,
+            ChaseParallelSemiNaive
         ),
         (
             ChaseMGUMixin,
@@ -566,6 +567,65 @@ def test_python_multiple_builtins(chase_class):
     assert instance_update == res
 
 
+def test_builtins_evaluated_on_columns():
+    class C(ChaseNaive, ChaseMGUMixin, ChaseGeneral):
+        def evaluate_builtins_on_columns(self, predicates, substitutions):
+            res = super().evaluate_builtins_on_columns(
+                predicates, substitutions
+            )
+            self.evaluated_on_columns = res is not None
+            return res
+
+    function_gt = S_('gt')
+    datalog_program = DT.walk(Eb_(
+        tuple(F_(Q(C_(i), C_(i % 7))) for i in range(40)) +
+        (
+            Imp_(S(x, w),
+                 Q(x, z) & function_gt(x, z * C_(5)) & eq(w, z + C_(1))),
+        )
+    ))
+
+    dl = Datalog()
+    dl.walk(datalog_program)
+
+    instance_0 = MapInstance(dl.extensional_database())
+    rule = datalog_program.formulas[-1]
+    dc = C(dl)
+    instance_update = dc.chase_step(instance_0, rule)
+    assert dc.evaluated_on_columns
+
+    dc = C(dl)
+    dc.builtins_on_columns_threshold = float('inf')
+    assert instance_update == dc.chase_step(instance_0, rule)
+    assert not hasattr(dc, 'evaluated_on_columns')
+    assert instance_update == MapInstance({
+        S: C_({
+            C_((i, i % 7 + 1))
+            for i in range(40) if i > 5 * (i % 7)
+        })
+    })
+
+
+def test_builtins_evaluated_on_columns_large_integers():
+    class C(ChaseNaive, ChaseMGUMixin, ChaseGeneral):
+        pass
+
+    datalog_program = DT.walk(Eb_(
+        tuple(F_(Q(C_(i), C_(2 ** 40 + i))) for i in range(20)) +
+        (Imp_(S(x, w), Q(x, z) & eq(w, z * z)),)
+    ))
+
+    dl = Datalog()
+    dl.walk(datalog_program)
+
+    instance_0 = MapInstance(dl.extensional_database())
+    rule = datalog_program.formulas[-1]
+    instance_update = C(dl).chase_step(instance_0, rule)
+    assert instance_update == MapInstance({
+        S: C_({C_((i, (2 ** 40 + i) ** 2)) for i in range(20)})
+    })
+
+
 def test_non_recursive_predicate_chase_tree(chase_class):
     datalog_program = DT.walk(Eb_((
         F_(Q(C_(1), C_(2))), F_(Q(C_(2),
@@ -652,6 +712,26 @@ def test_nonrecursive_predicate_chase_solution(chase_class, n=10):
     assert solution_instance == final_instance
 
 
+def test_cyclic_predicate_chase_solution(chase_class, n=6):
+    edges = [(i, (i + 1) % n) for i in range(n)] + [(0, 2), (2, 4), (4, 0)]
+    datalog_program = DT.walk(Eb_(
+        tuple(F_(Q(C_(i), C_(j))) for i, j in edges) +
+        (Imp_(T(x, y, z), Q(x, y) & Q(y, z) & Q(z, x)),)
+    ))
+
+    dl = Datalog()
+    dl.walk(datalog_program)
+
+    dc = chase_class(dl)
+    solution_instance = dc.build_chase_solution()
+
+    assert solution_instance[T] == C_({
+        C_((C_(0), C_(2), C_(4))),
+        C_((C_(2), C_(4), C_(0))),
+        C_((C_(4), C_(0), C_(2))),
+    })
+
+
 def test_nonrecursive_predicate_chase_solution_constant(chase_class, n=10):
     datalog_program = Eb_(
         tuple(F_(Q(C_(i), C_(i + 1)))
@@ -772,8 +852,6 @@ def test_transitive_closure(chase_class):
 
     if issubclass(chase_class, ChaseNonRecursive):
         context = raises(NeuroLangProgramHasLoopsException)
-    elif issubclass(chase_class, ChaseSemiNaive):
-        context = raises(NeuroLangNonLinearProgramException)
     else:
         context = nullcontext()
 
@@ -787,6 +865,41 @@ def test_transitive_closure(chase_class):
         }
 
 
+def test_goal_stops_chase(chase_class):
+    x = S_('X')
+    y = S_('Y')
+    z = S_('Z')
+    edge = S_('edge')
+    reaches = S_('reaches')
+    goal = S_('goal')
+
+    dl = Datalog()
+    dl.add_extensional_predicate_from_tuples(
+        edge, {(i, i + 1) for i in range(10)}
+    )
+
+    code = Eb_([
+        Imp_(reaches(x, y), edge(x, y)),
+        Imp_(reaches(x, y), reaches(x, z) & edge(z, y)),
+        Imp_(goal(), reaches(x, y) & edge(y, z)),
+    ])
+
+    dl.walk(code)
+
+    if issubclass(chase_class, ChaseNonRecursive):
+        skip("Recursive program")
+
+    dc = chase_class(dl, goal=goal)
+    solution = dc.build_chase_solution()
+    assert len(solution[goal].value) > 0
+    assert dc.goal_reached(solution)
+
+    dc = chase_class(dl, goal=S_('undefined'))
+    solution = dc.build_chase_solution()
+    assert len(solution[goal].value) > 0
+    assert len(solution[reaches].value) == 55
+
+
 def test_nested_function_application(chase_class):
     x = S_("x")
     y = S_("y")
@@ -807,3 +920,35 @@ def test_nested_function_application(chase_class):
         C_(((2 ** 2 + 1 ** 2) // 2,)),
         C_(((2 ** 2 + 2 ** 2) // 2,)),
     }
+
+
+def test_parallel_chase_rule_groups():
+    R = S_("R")
+    code = Eb_((
+        F_(Q(a, b)),
+        F_(Q(b, c)),
+        Imp_(T(x, y), Q(x, y)),
+        Imp_(T(x, y), Q(x, z) & T(z, y)),
+        Imp_(S(x), Q(x, y)),
+        Imp_(R(x), T(x, y) & S(y)),
+    ))
+    dl = Datalog()
+    dl.walk(code)
+
+    class C(
+        ChaseParallelSemiNaive, ChaseNamedRelationalAlgebraMixin,
+        ChaseGeneral
+    ):
+        pass
+
+    dc = C(dl, max_workers=2)
+    rule_groups = dc.rule_groups(dc.rules)
+    assert [
+        set(rule.consequent.functor for rule in rule_group)
+        for rule_group in rule_groups
+    ] == [{T, S}, {R}]
+    assert len(rule_groups[0]) == 3
+
+    solution = dc.build_chase_solution()
+    assert solution[T].value == {C_((a, b)), C_((b, c)), C_((a, c))}
+    assert solution[R].value == {C_((a,))}
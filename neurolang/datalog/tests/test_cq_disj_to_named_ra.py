@@ -7,10 +7,10 @@ from ...exceptions import NeuroLangException
 from ...expressions import Constant, FunctionApplication, Symbol
 from ...logic import Disjunction
 from ...relational_algebra import (
+    AntiJoin,
     ColumnInt,
     ColumnStr,
     Destroy,
-    Difference,
     ExtendedProjection,
     ExtendedProjectionListMember,
     NameColumns,
@@ -194,7 +194,7 @@ def test_joins():
 
     tr = TranslateToNamedRA()
     res = tr.walk(exp)
-    assert res == Difference(fa_trans, fb_trans)
+    assert res == AntiJoin(fa_trans, fb_trans)
 
     fa = R1(x, y)
     fb = R2(y, C_(0))
@@ -210,7 +210,7 @@ def test_joins():
     tr = TranslateToNamedRA()
     res = tr.walk(exp)
 
-    assert res == Difference(fa_trans, NaturalJoin(fa_trans, fb_trans))
+    assert res == AntiJoin(fa_trans, fb_trans)
 
 
 def test_selection():
@@ -232,6 +232,35 @@ def test_stratification():
     ]
 
 
+def test_stratification_predicate_in_several_strata():
+    Q = S_('Q')  # noqa: N806
+    R = S_('R')  # noqa: N806
+    S = S_('S')  # noqa: N806
+    T = S_('T')  # noqa: N806
+    x = S_('x')
+    y = S_('y')
+
+    code = DT.walk(B_([
+        T_(Q(C_(1), C_(2))),
+        Imp_(R(x, y), Q(x, y)),
+        Imp_(S(x), R(x, y)),
+        Imp_(R(x, y), S(x) & Q(y, x)),
+        Imp_(T(x), R(x, y)),
+    ]))
+
+    datalog = Datalog()
+    datalog.walk(code)
+
+    strata, stratifyiable = stratify(code, datalog)
+
+    assert not stratifyiable
+    assert strata == [
+        list(code.formulas[:1]),
+        list(code.formulas[1: 2]),
+        list(code.formulas[2:])
+    ]
+
+
 def test_reachable():
     Q = S_('Q')  # noqa: N806
     R = S_('R')  # noqa: N806
@@ -162,3 +162,43 @@ def test_resolution_works_builtin():
 
     solution = Chase(dl).build_chase_solution()
     assert solution[goal].value == {C_((e,)) for e in (b, c, d)}
+
+
+def test_resolution_works_free_predicate_and_builtin():
+    x = S_('X')
+    y = S_('Y')
+    z = S_('Z')
+    anc = S_('anc')
+    par = S_('par')
+    sib = S_('sib')
+    q = S_('q')
+    a = C_('a')
+    b = C_('b')
+    c = C_('c')
+    d = C_('d')
+    ne = C_(operator.ne)
+
+    edb = Eb_([
+        F_(par(a, b)),
+        F_(par(a, c)),
+        F_(par(c, d)),
+    ])
+
+    code = Eb_([
+        Imp_(q(x), sib(b, x)),
+        Imp_(anc(x, y), par(x, y)),
+        Imp_(anc(x, y), anc(x, z) & par(z, y)),
+        Imp_(sib(x, y), anc(z, x) & anc(z, y) & ne(x, y))
+    ])
+
+    dl = Datalog()
+    dl.walk(code)
+    dl.walk(edb)
+    goal, mr = magic_sets.magic_rewrite(q(x), dl)
+
+    dl = Datalog()
+    dl.walk(mr)
+    dl.walk(edb)
+
+    solution = Chase(dl).build_chase_solution()
+    assert solution[goal].value == {C_((e,)) for e in (c, d)}
@@ -10,7 +10,12 @@ from .. import Fact, Implication
 from .. import negation as sdn
 from ..expressions import TranslateToLogic
 from ..chase import Chase as Chase_
-from ..chase.negation import NegativeFactConstraints, DatalogChaseNegation
+from ..chase.negation import (
+    DatalogChaseNegation,
+    DatalogChaseNegationGeneral,
+    DatalogChaseNegationRelationalAlgebraMixin,
+    NegativeFactConstraints
+)
 
 
 C_ = expressions.Constant
@@ -263,3 +268,39 @@ def test_negative_predicates_race_in_chase():
     solution_instance = dc.build_chase_solution()
 
     assert solution_instance["S"].value == {(4,), (5,)}
+
+
+def test_negative_predicates_relational_algebra():
+    x = S_("x")
+    y = S_("y")
+    F = S_("F")
+    G = S_("G")
+    R = S_("R")
+    S = S_("S")
+    T = S_("T")
+
+    class DatalogChaseNegationRelationalAlgebra(
+        DatalogChaseNegationGeneral,
+        DatalogChaseNegationRelationalAlgebraMixin
+    ):
+        pass
+
+    dl = Datalog()
+    dl.add_extensional_predicate_from_tuples(
+        F, {(1,), (2,), (3,)}
+    )
+    dl.add_extensional_predicate_from_tuples(
+        G, {(1, 2), (2, 2), (3, 4), (4, 4), (5, 6)}
+    )
+    program = Eb_((
+        Implication(R(x), F(x)),
+        Implication(S(x, y), G(x, y) & ~R(x)),
+        Implication(T(x), G(x, x) & ~R(x)),
+    ))
+    dl.walk(program)
+
+    dc = DatalogChaseNegationRelationalAlgebra(dl)
+    solution_instance = dc.build_chase_solution()
+
+    assert solution_instance["S"].value == {(4, 4), (5, 6)}
+    assert solution_instance["T"].value == {(4,)}
@@ -0,0 +1,96 @@
+import operator as op
+from typing import Callable
+
+from ... import expression_walker as ew
+from ...expressions import Constant, ExpressionBlock, Symbol, Unknown
+from ..basic_representation import DatalogProgram
+from ..chase import (ChaseGeneral, ChaseMGUMixin, ChaseNaive,
+                     ChaseNamedRelationalAlgebraMixin)
+from ..chase.plan_cache import PLAN_CACHE, PlanCache
+from ..expressions import Conjunction, Fact, Implication, TranslateToLogic
+from ..instance import MapInstance
+
+C_ = Constant
+S_ = Symbol
+
+P = S_('P')
+Q = S_('Q')
+R = S_('R')
+f = S_('f')
+x = S_('x')
+y = S_('y')
+eq = C_[Callable[[Unknown, Unknown], bool]](op.eq)
+
+
+class Datalog(TranslateToLogic, DatalogProgram, ew.ExpressionBasicEvaluator):
+    pass
+
+
+class Chase(ChaseNamedRelationalAlgebraMixin, ChaseGeneral):
+    pass
+
+
+def test_plan_cache_least_recently_used():
+    cache = PlanCache(maxsize=2)
+    assert cache.get('a', lambda: (1, ())) == 1
+    assert cache.get('b', lambda: (2, ())) == 2
+    assert cache.get('a', lambda: (3, ())) == 1
+    assert cache.get('c', lambda: (4, ())) == 4
+    assert cache.get('b', lambda: (5, ())) == 5
+    assert cache.info() == (1, 4, 2, 2)
+
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
+
+
+def test_plan_cache_invalidation():
+    cache = PlanCache()
+    cache.get('a', lambda: (1, (f,)))
+    cache.get('b', lambda: (2, ()))
+    cache.invalidate(('f',))
+    assert cache.get('a', lambda: (3, ())) == 3
+    assert cache.get('b', lambda: (4, ())) == 2
+
+
+def test_plans_shared_between_chases():
+    PLAN_CACHE.clear()
+    dl = Datalog()
+    dl.symbol_table[f] = C_[Callable[[int], int]](lambda v: v + 1)
+    conjunction = Conjunction((P(x), Q(x, y), f(x)))
+    conjunction_r = Conjunction((P(x), R(x, y), f(x)))
+
+    plan = Chase(dl).translate_conjunction_to_named_ra(conjunction)
+    plan_r = Chase(dl).translate_conjunction_to_named_ra(conjunction_r)
+    assert PLAN_CACHE.info().hits == 1
+    assert PLAN_CACHE.info().misses == 1
+    assert repr(Q) in repr(plan) and repr(R) not in repr(plan)
+    assert repr(R) in repr(plan_r) and repr(Q) not in repr(plan_r)
+
+    dl.symbol_table[f] = C_[Callable[[int], int]](lambda v: v - 1)
+    PLAN_CACHE.invalidate((f,))
+    assert PLAN_CACHE.info().currsize == 0
+    Chase(dl).translate_conjunction_to_named_ra(conjunction)
+    assert PLAN_CACHE.info().misses == 2
+
+
+def test_builtins_on_columns_plans_not_shared_between_functions():
+    class ChaseOnColumns(ChaseNaive, ChaseMGUMixin, ChaseGeneral):
+        pass
+
+    PLAN_CACHE.clear()
+    rule = Implication(Q(x, y), Conjunction((P(x), eq(y, f(x)))))
+    facts = tuple(Fact(P(C_(i))) for i in range(20))
+    results = []
+    for function in (lambda v: v + 1, lambda v: v * 100):
+        dl = Datalog()
+        dl.walk(ExpressionBlock(facts + (rule,)))
+        dl.symbol_table[f] = C_[Callable[[int], int]](function)
+        instance = MapInstance(dl.extensional_database())
+        results.append(ChaseOnColumns(dl).chase_step(instance, rule))
+
+    assert results[0] == MapInstance({
+        Q: C_({C_((i, i + 1)) for i in range(20)})
+    })
+    assert results[1] == MapInstance({
+        Q: C_({C_((i, i * 100)) for i in range(20)})
+    })
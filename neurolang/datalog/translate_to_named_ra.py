@@ -11,10 +11,10 @@ from ..expression_walker import (
 from ..expressions import Constant, FunctionApplication, Symbol
 from ..logic import Disjunction
 from ..relational_algebra import (
+    AntiJoin,
     ColumnInt,
     ColumnStr,
     Destroy,
-    Difference,
     ExtendedProjection,
     ExtendedProjectionListMember,
     NameColumns,
@@ -357,11 +357,9 @@ class TranslateToNamedRA(ExpressionBasicEvaluator):
         named_columns = classified_formulas["named_columns"]
         for neg_formula in classified_formulas["neg_formulas"]:
             neg_cols = TranslateToNamedRA.obtain_negative_columns(neg_formula)
-            if named_columns > neg_cols:
-                neg_formula = NaturalJoin(output, neg_formula)
-            elif named_columns != neg_cols:
+            if not named_columns >= neg_cols:
                 raise NegativeFormulaNotSafeRangeException(neg_formula)
-            output = Difference(output, neg_formula)
+            output = AntiJoin(output, neg_formula)
         return output
 
     @staticmethod
@@ -1,12 +1,15 @@
 """Module implementing expression pattern matching."""
 
-from collections import OrderedDict, namedtuple
+from collections import Counter, OrderedDict, namedtuple
+from contextlib import contextmanager
 import copy
 from itertools import chain
 import inspect
 from inspect import isclass
 from functools import lru_cache
 import logging
+import os
+from time import perf_counter
 from typing import Any, Tuple, TypeVar
 import types
 from warnings import warn
@@ -20,13 +23,31 @@ logging.addLevelName(logging.DEBUG - 1, 'FINEDEBUG')
 FINEDEBUG = logging.DEBUG - 1
 
 
-__all__ = ['add_match', 'PatternMatcher']
+# Import-time switch for the logging call sites of the pattern matching
+# hot path. They are skipped when python runs with optimisations (``-O``)
+# or when the environment variable ``NEUROLANG_PATTERN_MATCHING_LOGGING``
+# is set to ``0``, ``false``, ``no`` or ``off``.
+PATTERN_MATCHING_LOGGING = __debug__ and os.environ.get(
+    'NEUROLANG_PATTERN_MATCHING_LOGGING', '1'
+).lower() not in ('0', 'false', 'no', 'off')
+
+
+__all__ = [
+    'add_match', 'PatternMatcher', 'PatternMatchingTracer',
+    'trace_pattern_matching'
+]
 
 
 UndeterminedType = TypeVar('UndeterminedType')
 
 Pattern = namedtuple('Pattern', ['pattern', 'guard', 'action'])
 
+PatternMatchTrace = namedtuple(
+    'PatternMatchTrace', ['pattern', 'action', 'elapsed']
+)
+
+_tracer = None
+
 
 class NeuroLangPatternMatchingNoMatch(expressions.NeuroLangException):
     pass
@@ -41,7 +62,8 @@ class PatternMatchingMetaClass(expressions.ParametricTypeClassMeta):
         overwriteable_properties = (
             '__module__', '__patterns__', '__doc__',
             'type', 'plural_type_name', '__no_explicit_type__',
-            '__generic_class__', '__parameterized__', '__entry_point__'
+            '__generic_class__', '__parameterized__', '__entry_point__',
+            '__dispatch_table__'
         )
 
         cls.__check_bases__(name, bases, classdict, overwriteable_properties)
@@ -58,6 +80,11 @@ class PatternMatchingMetaClass(expressions.ParametricTypeClassMeta):
         if needs_replacement:
             cls.__replace_type_in_patterns__(new_cls, src_type, dst_type)
 
+        new_cls.__dispatch_table__ = PatternDispatchTable(chain(*(
+            pm.__patterns__ for pm in new_cls.mro()
+            if hasattr(pm, '__patterns__')
+        )))
+
         return new_cls
 
     @staticmethod
@@ -218,6 +245,137 @@ def _pattern_replace_type(pattern, src_type, dst_type):
     return pattern
 
 
+class PatternDispatchTable:
+    """Compiled dispatch structure for the patterns of a class.
+
+    The ``(pattern, guard, action)`` triplets are indexed by the class of
+    the expression to match, keeping only those patterns whose root can
+    possibly match an instance of that class. Additionally, when a pattern
+    fixes the length of a tuple parameter, e.g.
+    ``FunctionApplication(..., (..., ...))``, expressions whose parameter
+    has a different length are discarded without further matching.
+
+    Candidates keep the order of the original patterns, hence the first
+    match semantics of :py:meth:`PatternMatcher.match` are preserved.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        self._root_classes = tuple(
+            _pattern_root_classes(pattern.pattern)
+            for pattern in self.patterns
+        )
+        self._arities = tuple(
+            _pattern_parameter_arities(pattern.pattern)
+            for pattern in self.patterns
+        )
+        self._index = dict()
+
+    def candidates(self, expression):
+        """Return the ``(pattern, arities)`` candidates for ``expression``.
+
+        ``arities`` is a tuple of ``(parameter_name, length)`` pairs which
+        must hold for the expression's tuple parameters.
+        """
+        expression_class = type(expression)
+        candidates = self._index.get(expression_class, None)
+        if candidates is None:
+            candidates = tuple(
+                (pattern, arities)
+                for pattern, root_classes, arities in zip(
+                    self.patterns, self._root_classes, self._arities
+                )
+                if (
+                    root_classes is None or
+                    any(isinstance(expression, c) for c in root_classes)
+                )
+            )
+            self._index[expression_class] = candidates
+        return candidates
+
+    def __len__(self):
+        return len(self.patterns)
+
+
+def _pattern_root_classes(pattern):
+    """Classes of which an expression must be instance to match
+    ``pattern`` or ``None`` if no such restriction can be established.
+    """
+    if isclass(pattern) and issubclass(pattern, expressions.Expression):
+        return (pattern,)
+    elif isinstance(pattern, expressions.Expression):
+        pattern_class = type(pattern)
+        if hasattr(pattern_class, '__generic_class__'):
+            return (pattern_class.__generic_class__, pattern_class)
+        return (pattern_class,)
+    return None
+
+
+def _pattern_parameter_arities(pattern):
+    """Lengths of the tuple parameters fixed by an expression ``pattern``."""
+    if not isinstance(pattern, expressions.Expression) or (
+        isclass(pattern.type) and issubclass(pattern.type, Tuple)
+    ):
+        return tuple()
+    arities = []
+    for argname, arg in signature(pattern.__class__).items():
+        if arg.default is not inspect.Parameter.empty:
+            continue
+        parameter_pattern = getattr(pattern, argname, None)
+        if isinstance(parameter_pattern, tuple):
+            arities.append((argname, len(parameter_pattern)))
+    return tuple(arities)
+
+
+class PatternMatchingTracer:
+    """Tracer recording a :class:`PatternMatchTrace` for every action
+    executed by a :class:`PatternMatcher`.
+
+    The ``elapsed`` time of an action, in seconds, includes the time
+    spent on the matches it triggers.
+    """
+
+    def __init__(self):
+        self.traces = []
+
+    def __call__(self, pattern, action, elapsed):
+        self.traces.append(PatternMatchTrace(pattern, action, elapsed))
+
+    def summary(self):
+        """Return a dictionary mapping each action's qualified name to
+        the number of times it was executed and the total elapsed time.
+        """
+        counts = Counter()
+        elapsed = Counter()
+        for trace in self.traces:
+            counts[trace.action.__qualname__] += 1
+            elapsed[trace.action.__qualname__] += trace.elapsed
+        return {
+            name: (count, elapsed[name])
+            for name, count in counts.most_common()
+        }
+
+
+@contextmanager
+def trace_pattern_matching(tracer=None):
+    """Context in which every action executed by a :class:`PatternMatcher`
+    is reported to ``tracer``.
+
+    ``tracer`` is a callable receiving the matched pattern, the action
+    and the time elapsed executing it. It defaults to a new
+    :class:`PatternMatchingTracer`, which is returned by the context.
+    """
+    global _tracer
+    if tracer is None:
+        tracer = PatternMatchingTracer()
+    previous_tracer = _tracer
+    _tracer = tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous_tracer
+
+
 def add_match(pattern, guard=None):
     """Decorate by adding patterns to a :class:`PatternMatcher` class.
 
@@ -268,23 +426,65 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
         - ``action``: is the method receiving the matching ``expression``
           instance to be executed upon pattern and match being ``True``.
         """
-        return chain(*(
-            pm.__patterns__ for pm in self.__class__.mro()
-            if hasattr(pm, '__patterns__')
-        ))
+        return iter(self.__dispatch_table__.patterns)
 
     def match(self, expression):
         """Find the action for a given expression by going through the ``patterns``.
 
         Goes through the triplets in in ``patterns`` and calls the action
-        specified by the first satisfied triplet.
+        specified by the first satisfied triplet. Only the candidates
+        selected by the class' :class:`PatternDispatchTable` are tried.
+        """
+        pattern, _, action = self.matching_pattern(expression)
+        return self.execute_action(pattern, action, expression)
+
+    def execute_action(self, pattern, action, expression):
+        """Execute the ``action`` of a matched ``pattern`` on ``expression``,
+        reporting it to the pattern matching tracer if there is one.
         """
+        tracer = _tracer
+        if tracer is None:
+            result_expression = action(self, expression)
+        else:
+            start = perf_counter()
+            result_expression = action(self, expression)
+            tracer(pattern, action, perf_counter() - start)
+        if PATTERN_MATCHING_LOGGING:
+            LOG.info(
+                '\t\tresult: %(result_expression)s',
+                {'result_expression': result_expression}
+            )
+        return result_expression
+
+    def matching_pattern(self, expression):
+        """Return the first triplet ``(pattern, guard, action)`` in
+        ``patterns`` satisfied by ``expression``.
+        """
+        if PATTERN_MATCHING_LOGGING and LOG.isEnabledFor(logging.INFO):
+            return self._matching_pattern_logged(expression)
 
+        candidates = self.__dispatch_table__.candidates(expression)
+        for triplet, arities in candidates:
+            if arities and not _parameter_arities_match(expression, arities):
+                continue
+            pattern, guard, _ = triplet
+            if (
+                self.pattern_match(pattern, expression) and
+                (guard is None or guard(expression))
+            ):
+                return triplet
+        raise NeuroLangPatternMatchingNoMatch(f'No match for {expression}')
+
+    def _matching_pattern_logged(self, expression):
         LOG.info(
             '\033[1m\033[91mExpression\033[0m: %(expression)s',
             {'expression': expression}
         )
-        for pattern, guard, action in self.patterns:
+        candidates = self.__dispatch_table__.candidates(expression)
+        for triplet, arities in candidates:
+            if arities and not _parameter_arities_match(expression, arities):
+                continue
+            pattern, guard, action = triplet
             name = '\033[1m\033[91m' + action.__qualname__ + '\033[0m'
             pattern_match = self.pattern_match(pattern, expression)
             guard_match = pattern_match and (
@@ -294,12 +494,7 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
                 LOG.info('\tMATCH %(name)s', {'name': name})
                 LOG.info('\t\tpattern: %(pattern)s', {'pattern': pattern})
                 LOG.info('\t\tguard: %(guard)s', {'guard': guard})
-                result_expression = action(self, expression)
-                LOG.info(
-                    '\t\tresult: %(result_expression)s',
-                    {'result_expression': result_expression}
-                )
-                break
+                return triplet
             else:
                 LOG.debug('\tNOMATCH %(name)s', {'name': name})
                 LOG.debug(
@@ -310,10 +505,7 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
                     '\t\tguard: %(guard)s %(guard_match)s',
                     {'guard': guard, 'guard_match': guard_match}
                 )
-        else:
-            raise NeuroLangPatternMatchingNoMatch(f'No match for {expression}')
-
-        return result_expression
+        raise NeuroLangPatternMatchingNoMatch(f'No match for {expression}')
 
     def pattern_match(self, pattern, expression):
         """Return ``True`` if ``pattern`` matches ``expression``.
@@ -357,14 +549,15 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
         elif isinstance(pattern, tuple) and isinstance(expression, tuple):
             result = self.pattern_match_tuple(pattern, expression)
         else:
-            log_message = "\t\t\t\tMatch other %(pattern)s vs %(expression)s",
+            log_message = "\t\t\t\tMatch other %(pattern)s vs %(expression)s"
             result = pattern == expression
 
-        LOG.log(
-            FINEDEBUG,
-            log_message,
-            {'expression': expression, 'pattern': pattern}
-        )
+        if PATTERN_MATCHING_LOGGING and log_message is not None:
+            LOG.log(
+                FINEDEBUG,
+                log_message,
+                {'expression': expression, 'pattern': pattern}
+            )
 
         return result
 
@@ -379,15 +572,17 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
             ) or
             isinstance(expression, type(pattern))
         ):
-            LOG.log(
-                FINEDEBUG,
-                "\t\t\t\t%(expression)s is not instance of pattern "
-                "class %(class)s",
-                {'expression': expression, 'class': pattern.__class__}
-            )
+            if PATTERN_MATCHING_LOGGING:
+                LOG.log(
+                    FINEDEBUG,
+                    "\t\t\t\t%(expression)s is not instance of pattern "
+                    "class %(class)s",
+                    {'expression': expression, 'class': pattern.__class__}
+                )
             result = False
         elif isclass(pattern.type) and issubclass(pattern.type, Tuple):
-            LOG.log(FINEDEBUG, "\t\t\t\tMatch tuple")
+            if PATTERN_MATCHING_LOGGING:
+                LOG.log(FINEDEBUG, "\t\t\t\tMatch tuple")
             if (
                 isclass(expression.type) and
                 issubclass(expression.type, Tuple)
@@ -405,12 +600,13 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
 
     def pattern_match_expression_parameters(self, pattern, expression):
         parameters = signature(pattern.__class__)
-        LOG.log(
-            FINEDEBUG,
-            "\t\t\t\tTrying to match parameters "
-            "%(expression)s with %(pattern)s",
-            {'expression': expression, 'pattern': pattern}
-        )
+        if PATTERN_MATCHING_LOGGING:
+            LOG.log(
+                FINEDEBUG,
+                "\t\t\t\tTrying to match parameters "
+                "%(expression)s with %(pattern)s",
+                {'expression': expression, 'pattern': pattern}
+            )
 
         result = False
         for argname, arg in parameters.items():
@@ -421,7 +617,7 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
             match = self.pattern_match(p, e)
             if not match:
                 break
-            else:
+            elif PATTERN_MATCHING_LOGGING:
                 LOG.log(
                     FINEDEBUG,
                     "\t\t\t\t\tmatch %(p)s vs %(e)s",
@@ -451,12 +647,13 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
                     result = False
                     break
             else:
-                LOG.log(
-                    FINEDEBUG,
-                    "\t\t\t\t\tMatched tuple's expression instance "
-                    "%(expression)s with %(pattern)s",
-                    {'expression': expression, 'pattern': pattern}
-                )
+                if PATTERN_MATCHING_LOGGING:
+                    LOG.log(
+                        FINEDEBUG,
+                        "\t\t\t\t\tMatched tuple's expression instance "
+                        "%(expression)s with %(pattern)s",
+                        {'expression': expression, 'pattern': pattern}
+                    )
                 result = True
         return result
 
@@ -469,15 +666,25 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
                     result = False
                     break
             else:
-                LOG.log(
-                    FINEDEBUG,
-                    "\t\t\t\tMatch tuples %(expression)s with %(pattern)s",
-                    {'expression': expression, 'pattern': pattern}
-                )
+                if PATTERN_MATCHING_LOGGING:
+                    LOG.log(
+                        FINEDEBUG,
+                        "\t\t\t\tMatch tuples %(expression)s with "
+                        "%(pattern)s",
+                        {'expression': expression, 'pattern': pattern}
+                    )
                 result = True
         return result
 
 
+def _parameter_arities_match(expression, arities):
+    for argname, length in arities:
+        parameter = getattr(expression, argname, None)
+        if isinstance(parameter, tuple) and len(parameter) != length:
+            return False
+    return True
+
+
 @lru_cache(maxsize=128)
 def signature(cls):
     return inspect.signature(cls).parameters
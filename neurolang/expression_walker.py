@@ -1,9 +1,10 @@
 import logging
 import typing
-from collections import deque
+from collections import Counter, OrderedDict, deque, namedtuple
 from itertools import product, tee
 
 from .expression_pattern_matching import (
+    PATTERN_MATCHING_LOGGING,
     PatternMatcher,
     add_entry_point_match,
     add_match,
@@ -28,9 +29,11 @@ from .utils import OrderedSet
 __all__ = [
     "expression_iterator",
     "PatternWalker",
+    "WalkCacheInfo",
     "EntryPointPatternWalker",
     "IdentityWalker",
     "ExpressionWalker",
+    "FixpointRewriteWalker",
     "ReplaceSymbolWalker",
     "ReplaceSymbolsByConstants",
     "ReplaceExpressionsByValues",
@@ -120,15 +123,83 @@ def expression_iterator_constant(current_element):
     return children
 
 
+WalkCacheInfo = namedtuple(
+    "WalkCacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+
 class PatternWalker(PatternMatcher):
+    """Walker applying the first matching pattern to each expression.
+
+    Setting the class attribute ``memoize`` to ``True`` makes the walker
+    remember the result of walking each expression in a least recently
+    used cache of at most ``memoize_maxsize`` entries, keyed on the
+    structure of the expression. It should only be used on pure walkers,
+    where the result of walking an expression only depends on the
+    expression itself. Statistics of the cache are available through
+    :py:meth:`walk_cache_info`.
+    """
+
+    memoize = False
+    memoize_maxsize = 1024
+
     def walk(self, expression):
-        logging.debug("walking %(expression)s", {"expression": expression})
+        if PATTERN_MATCHING_LOGGING:
+            logging.debug(
+                "walking %(expression)s", {"expression": expression}
+            )
         if isinstance(expression, tuple):
             result = [self.walk(e) for e in expression]
             result = tuple(result)
             return result
+        if self.memoize:
+            return self._memoized_match(expression)
         return self.match(expression)
 
+    def _memoized_match(self, expression):
+        cache = getattr(self, "_walk_cache", None)
+        if cache is None:
+            self.walk_cache_clear()
+            cache = self._walk_cache
+        key = (type(expression), getattr(expression, "type", None), expression)
+        try:
+            entry = cache.get(key, None)
+        except TypeError:
+            return self.match(expression)
+
+        if entry is not None:
+            self._walk_cache_hits += 1
+            cache.move_to_end(key)
+            original_expression, result = entry
+            if result is original_expression:
+                result = expression
+            return result
+
+        self._walk_cache_misses += 1
+        result = self.match(expression)
+        cache[key] = (expression, result)
+        if len(cache) > self.memoize_maxsize:
+            cache.popitem(last=False)
+        return result
+
+    def walk_cache_info(self):
+        """Report the statistics of the walk memoization cache."""
+        cache = getattr(self, "_walk_cache", None)
+        if cache is None:
+            return WalkCacheInfo(0, 0, self.memoize_maxsize, 0)
+        return WalkCacheInfo(
+            self._walk_cache_hits,
+            self._walk_cache_misses,
+            self.memoize_maxsize,
+            len(cache),
+        )
+
+    def walk_cache_clear(self):
+        """Clear the walk memoization cache and its statistics."""
+        self._walk_cache = OrderedDict()
+        self._walk_cache_hits = 0
+        self._walk_cache_misses = 0
+
 
 class EntryPointPatternWalker(PatternWalker):
     """Pattern walker with an entrypoint. All walks must start from the
@@ -232,6 +303,94 @@ class ExpressionWalker(PatternWalker):
         return new_arg, changed
 
 
+class FixpointRewriteWalker(PatternWalker):
+    """Rewrites an expression bottom-up until no pattern changes it.
+
+    Patterns are taken as rewrite rules, a rule is applied when its action
+    returns an expression which is not the matched one. Arguments are
+    rewritten before the expression containing them and every expression
+    reaching its normal form is flagged as such. After a rewrite, only
+    the parts of the new expression which are not flagged are visited
+    again, instead of walking the whole result as
+    :class:`ExpressionWalker` does.
+
+    The number of rewrites applied by each rule during the last walk is
+    kept in ``rewrite_counts`` and a walk applying more than
+    ``max_rewrites`` rewrites is aborted.
+    """
+
+    max_rewrites = 100000
+
+    @add_match(...)
+    def normal_form(self, expression):
+        return expression
+
+    def walk(self, expression):
+        if isinstance(expression, tuple):
+            return tuple(self.walk(e) for e in expression)
+        if getattr(self, "_normal_forms", None) is not None:
+            return self._rewrite(expression)
+
+        self._normal_forms = dict()
+        self._rewrites = 0
+        self.rewrite_counts = Counter()
+        try:
+            return self._rewrite(expression)
+        finally:
+            self._normal_forms = None
+
+    def _rewrite(self, expression):
+        normal_forms = self._normal_forms
+        while id(expression) not in normal_forms:
+            expression = self._rewrite_arguments(expression)
+            pattern, _, action = self.matching_pattern(expression)
+            new_expression = self.execute_action(pattern, action, expression)
+            if new_expression is expression:
+                normal_forms[id(expression)] = expression
+            else:
+                self._count_rewrite(action)
+                expression = new_expression
+        return expression
+
+    def _rewrite_arguments(self, expression):
+        if not isinstance(expression, Expression):
+            return expression
+        args = expression.unapply()
+        new_args = tuple()
+        changed = False
+        for arg in args:
+            if isinstance(arg, Expression):
+                new_arg = self._rewrite(arg)
+                changed |= new_arg is not arg
+            elif (
+                isinstance(arg, tuple)
+                and len(arg) > 0
+                and isinstance(arg[0], Expression)
+            ):
+                new_arg = type(arg)(self._rewrite(a) for a in arg)
+                changed |= any(n is not a for n, a in zip(new_arg, arg))
+            elif arg is Ellipsis:
+                raise NeuroLangException(
+                    "... is not a valid Expression argument"
+                )
+            else:
+                new_arg = arg
+            new_args += (new_arg,)
+
+        if changed:
+            expression = expression.apply(*new_args)
+        return expression
+
+    def _count_rewrite(self, action):
+        self._rewrites += 1
+        self.rewrite_counts[action.__qualname__] += 1
+        if self._rewrites > self.max_rewrites:
+            raise NeuroLangException(
+                f"Rewriting exceeded {self.max_rewrites} rewrites, "
+                "the rules might not reach a fixpoint"
+            )
+
+
 class ChainedWalker:
     def __init__(self, *walkers):
         self.walkers = [w() if isinstance(w, type) else w for w in walkers]
@@ -246,6 +405,8 @@ class ChainedWalker:
 
 
 class ReplaceSymbolWalker(ExpressionWalker):
+    memoize = True
+
     def __init__(self, symbol_replacements):
         self.symbol_replacements = symbol_replacements
 
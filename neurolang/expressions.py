@@ -5,6 +5,7 @@ import operator as op
 import threading
 import types
 import typing
+import weakref
 from contextlib import contextmanager
 from functools import WRAPPER_ASSIGNMENTS, lru_cache, wraps
 from itertools import chain
@@ -20,7 +21,8 @@ from .typed_symbol_table import TypedSymbolTable
 __all__ = [
     'Symbol', 'FunctionApplication', 'Statement',
     'Projection', 'Unknown', 'get_type_args',
-    'TypedSymbolTable', 'TypedSymbolTableMixin'
+    'TypedSymbolTable', 'TypedSymbolTableMixin',
+    'intern_expressions'
 ]
 
 
@@ -28,6 +30,8 @@ _lock = threading.RLock()
 
 _expressions_behave_as_python_objects = dict()
 _sure_is_not_pattern = dict()
+_intern_expressions = dict()
+_interned_expressions = weakref.WeakValueDictionary()
 
 
 @contextmanager
@@ -72,6 +76,79 @@ def sure_is_not_pattern_():
         del _sure_is_not_pattern[thread_id]
 
 
+@contextmanager
+def intern_expressions():
+    """
+    Context in which structurally identical expressions are built as a
+    single shared instance.
+
+    Expressions are looked up, before construction, in a process-wide
+    weak-value table keyed on their class and construction arguments.
+    Hence, repeated constructions skip type inference and validation,
+    equality between interned expressions is an identity check, and
+    their hash is computed only once. Only expressions whose arguments
+    are expressions, python scalars or tuples and frozensets of those
+    are interned, the rest are built as usual.
+
+    Interned expressions are shared, they must not be mutated, e.g.
+    through :py:meth:`Expression.change_type`.
+    """
+    thread_id = threading.get_ident()
+
+    with _lock:
+        n = _intern_expressions.get(thread_id, 0)
+        _intern_expressions[thread_id] = n + 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _intern_expressions[thread_id] -= 1
+            if _intern_expressions[thread_id] == 0:
+                del _intern_expressions[thread_id]
+
+
+class _IdentityKey:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return id(self.value)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, _IdentityKey) and
+            self.value is other.value
+        )
+
+
+_INTERNABLE_ATOMS = (
+    bool, int, float, complex, str, bytes,
+    type(None), type(Ellipsis)
+)
+
+_INTERNABLE_BY_IDENTITY = (
+    types.FunctionType, types.BuiltinFunctionType, types.MethodType
+)
+
+
+def _intern_key(value):
+    value_type = type(value)
+    if value_type in _INTERNABLE_ATOMS:
+        return (value_type, value)
+    elif (
+        isinstance(value_type, ExpressionMeta) or
+        value_type in _INTERNABLE_BY_IDENTITY
+    ):
+        return _IdentityKey(value)
+    elif value_type is tuple:
+        return (value_type, tuple(_intern_key(v) for v in value))
+    elif value_type is frozenset:
+        return (value_type, frozenset(_intern_key(v) for v in value))
+    raise TypeError(f'{value_type} values can not be interned')
+
+
 def type_validation_value(value, type_):
     if type_ is typing.Any or type_ is Unknown:
         return True
@@ -182,11 +259,15 @@ class ExpressionMeta(ParametricTypeClassMeta):
         if obj.__no_explicit_type__:
             obj.type = typing.Any
         orig_init = obj.__init__
+        init_signature = inspect.signature(orig_init)
         obj.__children__ = [
             name for name, parameter
-            in inspect.signature(orig_init).parameters.items()
+            in init_signature.parameters.items()
             if parameter.default is inspect.Parameter.empty
         ][1:]
+        obj.__construction_signature__ = init_signature.replace(
+            parameters=tuple(init_signature.parameters.values())[1:]
+        )
 
         def init_process_pattern(self, args):
             parameters = inspect.signature(self.__class__).parameters
@@ -244,6 +325,39 @@ class ExpressionMeta(ParametricTypeClassMeta):
         obj.__init__ = new_init
         return obj
 
+    @property
+    def __signature__(cls):
+        # Given explicitly as __call__ is overridden to support interning
+        return cls.__construction_signature__
+
+    def __call__(cls, *args, **kwargs):
+        if not (
+            _intern_expressions and
+            threading.get_ident() in _intern_expressions
+        ):
+            return super().__call__(*args, **kwargs)
+
+        try:
+            key = (
+                cls, _intern_key(args),
+                tuple((k, _intern_key(v)) for k, v in sorted(kwargs.items()))
+            )
+            expression = _interned_expressions.get(key, None)
+        except TypeError:
+            return super().__call__(*args, **kwargs)
+
+        if expression is None:
+            expression = super().__call__(*args, **kwargs)
+            if not expression.__is_pattern__:
+                try:
+                    expression.__interned_hash__ = hash(expression)
+                except TypeError:
+                    return expression
+                expression = _interned_expressions.setdefault(
+                    key, expression
+                )
+        return expression
+
 
 class Expression(metaclass=ExpressionMeta):
     __super_attributes__ = WRAPPER_ASSIGNMENTS + (
@@ -348,6 +462,8 @@ class Expression(metaclass=ExpressionMeta):
             return repr(self.type)
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if self.__is_pattern__ or not isinstance(other, Expression):
             return super().__eq__(other)
 
@@ -371,6 +487,9 @@ class Expression(metaclass=ExpressionMeta):
         return False
 
     def __hash__(self):
+        interned_hash = self.__dict__.get('__interned_hash__', None)
+        if interned_hash is not None:
+            return interned_hash
         return hash(tuple(getattr(self, c) for c in self.__children__))
 
 
@@ -432,9 +551,11 @@ class Symbol(NonConstant):
 
     @classmethod
     def fresh(cls):
-        if not hasattr(Symbol, '_fresh_generator_'):
-            Symbol._fresh_generator_ = Symbol._fresh_generator()
-        new_symbol = cls(next(Symbol._fresh_generator_))
+        with _lock:
+            if not hasattr(Symbol, '_fresh_generator_'):
+                Symbol._fresh_generator_ = Symbol._fresh_generator()
+            name = next(Symbol._fresh_generator_)
+        new_symbol = cls(name)
         if cls.type is not typing.Any:
             new_symbol = new_symbol.cast(cls.type)
         new_symbol.is_fresh = True
@@ -523,6 +644,8 @@ class Constant(Expression):
         )
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if self.type is Unknown:
             warn('Making a comparison with types needed to be inferred')
 
@@ -543,6 +666,9 @@ class Constant(Expression):
             )
 
     def __hash__(self):
+        interned_hash = self.__dict__.get('__interned_hash__', None)
+        if interned_hash is not None:
+            return interned_hash
         return hash(self.value)
 
     def __repr__(self):
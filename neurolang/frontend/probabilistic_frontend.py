@@ -326,9 +326,9 @@ class NeurolangPDL(QueryBuilderDatalog):
         if "__constraints__" in self.symbol_table:
             eB = self._rewrite_program_with_ontology(det_idb)
             det_idb = Union(det_idb.formulas + eB.formulas)
-        chase = self.chase_class(self.program_ir, rules=det_idb)
-        solution = chase.build_chase_solution()
-        return solution
+        return self._build_chase_solution(
+            rules=det_idb, cache_key="deterministic"
+        )
 
     def _solve_probabilistic_stratum(self, solution, prob_idb):
         pfact_edb = self.program_ir.probabilistic_facts()
@@ -26,6 +26,8 @@ import numpy as np
 from nibabel.dataobj_images import DataobjImage
 
 from .. import expressions as ir
+from ..datalog.chase.plan_cache import PLAN_CACHE
+from ..region_cache import get_region_cache
 from ..region_solver import Region
 from ..regions import ExplicitVBR, ImplicitVBR, SphericalVolume
 from ..type_system import Unknown, is_leq_informative
@@ -410,6 +412,8 @@ class QueryBuilderBase:
             value = ir.Constant(value)
 
         symbol = ir.Symbol[value.type](name)
+        if symbol in self.symbol_table:
+            PLAN_CACHE.invalidate((symbol,))
         self.symbol_table[symbol] = value
 
         return fe.Symbol(self, name)
@@ -457,6 +461,7 @@ class QueryBuilderBase:
         ValueError: Symbol x not defined
         """
         del self.symbol_table[name]
+        PLAN_CACHE.invalidate((name,))
 
     def add_tuple_set(
         self,
@@ -669,7 +674,16 @@ class RegionMixin:
         -------
         ExplicitVBR
             see description
+
+        Notes
+        -----
+        If a region cache is configured, see
+        `neurolang.region_cache.get_region_cache`, the regions of the
+        image are read from it, or stored in it on the first request.
         """
+        region_cache = get_region_cache()
+        if region_cache is not None and label != 0:
+            return region_cache.region(spatial_image, label)
         voxels = np.transpose(
             (np.asanyarray(spatial_image.dataobj) == label).nonzero()
         )
@@ -713,8 +727,14 @@ class RegionMixin:
             see description
         """
         atlas_set = list()
+        region_cache = get_region_cache()
+        if region_cache is not None:
+            atlas = region_cache.atlas(spatial_image)
         for label_number, label_name in atlas_labels.items():
-            region = self.create_region(spatial_image, label=label_number)
+            if region_cache is not None and label_number != 0:
+                region = atlas.region(label_number)
+            else:
+                region = self.create_region(spatial_image, label=label_number)
             if region is None:
                 continue
             atlas_set.append((label_name, region))
@@ -4,7 +4,7 @@ Query Builder Datalog
 Complements QueryBuilderBase with query capabilities,
 as well as Region and Neurosynth capabilities
 """
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from typing import (
     AbstractSet,
     Dict,
@@ -19,12 +19,15 @@ from uuid import uuid1
 
 from .. import datalog
 from .. import expressions as ir
-from ..datalog import aggregation
+from ..datalog import Fact, Negation, aggregation, magic_sets
+from ..datalog.chase import ChaseSemiNaive
 from ..datalog.constraints_representation import RightImplication
 from ..datalog.expression_processing import (
     TranslateToDatalogSemantics,
+    extract_logic_predicates,
     reachable_code,
 )
+from ..datalog.instance import MapInstance
 from ..type_system import Unknown
 from ..utils import NamedRelationalAlgebraFrozenSet, RelationalAlgebraFrozenSet
 from .datalog.standard_syntax import parser as datalog_parser
@@ -36,12 +39,22 @@ from . import query_resolution_expressions as fe
 __all__ = ["QueryBuilderDatalog"]
 
 
+ChaseSolution = namedtuple(
+    "ChaseSolution", "instance rules extensional_symbols builtins"
+)
+
+
 class QueryBuilderDatalog(RegionMixin, NeuroSynthMixin, QueryBuilderBase):
     """
     Complements QueryBuilderBase with query capabilities,
     as well as Region and Neurosynth capabilities
     """
 
+    # queries with constant arguments in intensional predicates are
+    # rewritten with magic sets, such that only the facts relevant to
+    # the constants are derived
+    magic_sets = True
+
     def __init__(
         self,
         program_ir: DatalogProgram,
@@ -72,6 +85,7 @@ class QueryBuilderDatalog(RegionMixin, NeuroSynthMixin, QueryBuilderBase):
         self.translate_expression_to_datalog = TranslateToDatalogSemantics()
         self.datalog_parser = datalog_parser
         self.nat_datalog_parser = nat_datalog_parser
+        self._chase_solutions = dict()
 
     @property
     def current_program(self) -> List[fe.Expression]:
@@ -357,14 +371,111 @@ class QueryBuilderDatalog(RegionMixin, NeuroSynthMixin, QueryBuilderBase):
         query_expression = self._declare_implication(new_head, predicate)
 
         reachable_rules = reachable_code(query_expression, self.program_ir)
+        if (
+            self.magic_sets and
+            self._magic_sets_applicable(query_expression, reachable_rules)
+        ):
+            functor, reachable_rules = self._magic_sets_rewrite(
+                query_expression
+            )
+        if isinstance(head, tuple) and len(head) == 0:
+            # only whether the query holds is needed
+            goal = functor
+        else:
+            goal = None
         solution = self.chase_class(
-            self.program_ir, rules=reachable_rules
+            self.program_ir, rules=reachable_rules, goal=goal
         ).build_chase_solution()
 
         solution_set = solution.get(functor.name, ir.Constant(set()))
         self.program_ir.symbol_table = self.symbol_table.enclosing_scope
         return solution_set, functor_orig
 
+    def _magic_sets_applicable(
+        self, query_expression: ir.Expression, rules: ir.Expression
+    ) -> bool:
+        """
+        [Internal usage - documentation for developpers]
+
+        Whether the query has constant arguments in intensional
+        predicates and the rules it reaches are conjunctive, without
+        negation, aggregation nor existential quantification, such
+        that the magic sets rewrite applies.
+        """
+        idb = self.program_ir.intensional_database()
+        edb = self.program_ir.extensional_database()
+        if not all(
+            isinstance(arg, ir.Symbol)
+            for arg in query_expression.consequent.args
+        ):
+            return False
+
+        for rule in rules.formulas:
+            if not all(
+                isinstance(arg, (ir.Symbol, ir.Constant))
+                for arg in rule.consequent.args
+            ):
+                return False
+            predicates = extract_logic_predicates(rule.antecedent)
+            if isinstance(rule.antecedent, datalog.Conjunction):
+                formulas = rule.antecedent.formulas
+            else:
+                formulas = (rule.antecedent,)
+            if len(formulas) != len(predicates):
+                return False
+            for predicate in formulas:
+                if not (
+                    isinstance(predicate, ir.FunctionApplication) and
+                    (
+                        isinstance(predicate.functor, ir.Constant) or
+                        predicate.functor in idb or
+                        predicate.functor in edb
+                    ) and
+                    all(
+                        isinstance(arg, (ir.Symbol, ir.Constant))
+                        for arg in predicate.args
+                    )
+                ):
+                    return False
+
+        return any(
+            predicate.functor in idb and
+            any(isinstance(arg, ir.Constant) for arg in predicate.args)
+            for predicate in extract_logic_predicates(
+                query_expression.antecedent
+            )
+        )
+
+    def _magic_sets_rewrite(
+        self, query_expression: ir.Expression
+    ) -> Tuple[ir.Symbol, ir.Expression]:
+        """
+        [Internal usage - documentation for developpers]
+
+        Rewrites the rules reached by the query with magic sets,
+        adding them to the current scope of the program. Returns
+        the symbol of the rewritten query and the rules to solve it.
+        """
+        goal, rewritten_rules = magic_sets.magic_rewrite(
+            query_expression.consequent, self.program_ir
+        )
+        replace = magic_sets.ReplaceAdornedExpressions()
+        rewritten_rules = replace.walk(rewritten_rules)
+        rules = []
+        for rule in rewritten_rules.formulas:
+            if (
+                isinstance(rule.antecedent, ir.Constant) and
+                rule.antecedent.value is True
+            ):
+                self.program_ir.walk(Fact(rule.consequent))
+            else:
+                self.program_ir.walk(rule)
+                rules.append(rule)
+        return (
+            replace.symbol_replacements[goal],
+            datalog.Union(tuple(rules))
+        )
+
     def solve_all(self) -> Dict[str, NamedRelationalAlgebraFrozenSet]:
         """
         Returns a dictionary of "predicate_name": "Content"
@@ -397,7 +508,7 @@ class QueryBuilderDatalog(RegionMixin, NeuroSynthMixin, QueryBuilderBase):
             0   2
         }
         """
-        solution_ir = self.chase_class(self.program_ir).build_chase_solution()
+        solution_ir = self._build_chase_solution(cache_key="solve_all")
 
         solution = {}
         for k, v in solution_ir.items():
@@ -407,9 +518,130 @@ class QueryBuilderDatalog(RegionMixin, NeuroSynthMixin, QueryBuilderBase):
             solution[k.name].row_type = v.value.row_type
         return solution
 
+    def _build_chase_solution(
+        self, rules: Optional[ir.Expression] = None, cache_key: str = None
+    ) -> MapInstance:
+        """
+        [Internal usage - documentation for developpers]
+
+        Builds the chase solution of the program, restricted to `rules`
+        if given. The solution last built for `cache_key` is kept and,
+        if the program is monotonic, maintained incrementally when
+        extensional facts or rules are added to or removed from the
+        program, instead of computing the whole fixpoint again.
+
+        Parameters
+        ----------
+        rules : Optional[ir.Expression]
+            union of rules to solve, by default all the rules of the
+            program
+        cache_key : str, optional
+            key under which the solution is kept, by default None
+
+        Returns
+        -------
+        MapInstance
+            the chase solution
+        """
+        chase = self.chase_class(self.program_ir, rules=rules)
+        extensional_database = self.program_ir.extensional_database()
+        builtins = self.program_ir.builtins()
+        previous = self._chase_solutions.pop(cache_key, None)
+        if not self._chase_solution_is_maintainable(
+            chase, extensional_database
+        ):
+            return chase.build_chase_solution()
+
+        if previous is None or not self._chase_solution_is_updatable(
+            previous, chase, extensional_database, builtins
+        ):
+            instance = chase.build_chase_solution()
+        else:
+            instance = self._update_chase_solution(
+                previous, chase, extensional_database
+            )
+
+        for symbol, facts in extensional_database.items():
+            if symbol in instance:
+                instance[symbol] = facts.apply(facts.value.copy())
+        self._chase_solutions[cache_key] = ChaseSolution(
+            instance, tuple(chase.rules),
+            frozenset(extensional_database), builtins
+        )
+        return MapInstance(instance)
+
+    @staticmethod
+    def _chase_solution_is_maintainable(chase, extensional_database):
+        if not isinstance(chase, ChaseSemiNaive):
+            return False
+        for rule in chase.rules:
+            if (
+                rule.consequent.functor in extensional_database or
+                aggregation.is_aggregation_rule(rule) or
+                any(
+                    isinstance(predicate, Negation)
+                    for predicate in extract_logic_predicates(rule.antecedent)
+                )
+            ):
+                return False
+        return True
+
+    @staticmethod
+    def _chase_solution_is_updatable(
+        previous, chase, extensional_database, builtins
+    ):
+        return (
+            builtins.keys() == previous.builtins.keys() and
+            all(
+                builtin is previous.builtins[symbol]
+                for symbol, builtin in builtins.items()
+            ) and
+            all(
+                rule.consequent.functor not in extensional_database
+                for rule in previous.rules
+            ) and
+            all(
+                rule.consequent.functor not in previous.extensional_symbols
+                for rule in chase.rules
+            )
+        )
+
+    @staticmethod
+    def _update_chase_solution(previous, chase, extensional_database):
+        inserted = dict()
+        deleted = dict()
+        for symbol, facts in extensional_database.items():
+            if symbol in previous.instance:
+                previous_facts = previous.instance[symbol].value
+                inserted[symbol] = facts.apply(facts.value - previous_facts)
+                deleted[symbol] = facts.apply(previous_facts - facts.value)
+            else:
+                inserted[symbol] = facts
+        for symbol in previous.extensional_symbols:
+            if (
+                symbol not in extensional_database and
+                symbol in previous.instance
+            ):
+                deleted[symbol] = previous.instance[symbol]
+
+        previous_rules = set(previous.rules)
+        rules = set(chase.rules)
+        return chase.update_chase_solution(
+            previous.instance,
+            inserted=MapInstance(inserted),
+            deleted=MapInstance(deleted),
+            new_rules=[
+                rule for rule in chase.rules if rule not in previous_rules
+            ],
+            removed_rules=[
+                rule for rule in previous.rules if rule not in rules
+            ]
+        )
+
     def reset_program(self) -> None:
         """Clears current symbol table"""
         self.symbol_table.clear()
+        self._chase_solutions.clear()
 
     def add_tuple_set(
         self, iterable: Iterable, type_: Type = Unknown, name: str = None
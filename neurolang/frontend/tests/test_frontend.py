@@ -309,6 +309,37 @@ def test_neurolang_dl_query():
     assert sol == set((x,) for x in (2, 4, 8, 16))
 
 
+def test_neurolang_dl_query_magic_sets():
+    dataset = {(i, i + 1) for i in range(10)} | {(3, 20)}
+    solutions = []
+    for magic_sets in (True, False):
+        neurolang = frontend.NeurolangDL()
+        neurolang.magic_sets = magic_sets
+        neurolang.add_tuple_set(dataset, name="par")
+        with neurolang.scope as e:
+            e.anc[e.x, e.y] = e.par[e.x, e.y]
+            e.anc[e.x, e.y] = e.anc[e.x, e.z] & e.par[e.z, e.y]
+            e.sib[e.x, e.y] = e.par[e.z, e.x] & e.par[e.z, e.y] & (e.x != e.y)
+            e.cousin[e.x, e.y] = (
+                e.anc[e.z, e.x] & e.anc[e.z, e.y] & ~e.anc[e.x, e.y]
+            )
+            solutions.append((
+                neurolang.query((e.y,), e.anc[5, e.y]),
+                neurolang.query((e.x,), e.anc[e.x, 5]),
+                neurolang.query((e.y,), e.sib[4, e.y]),
+                neurolang.query((e.y,), e.cousin[9, e.y]),
+                neurolang.query(tuple(), e.anc[2, 20]),
+            ))
+
+    assert solutions[0] == solutions[1]
+    anc, anc_inverse, sib, cousin, boolean = solutions[0]
+    assert anc == {(i,) for i in range(6, 11)}
+    assert anc_inverse == {(i,) for i in range(5)}
+    assert sib == {(20,)}
+    assert cousin == {(i,) for i in range(1, 10)} | {(20,)}
+    assert boolean
+
+
 def test_neurolang_dl_solve_all():
     neurolang = frontend.NeurolangDL()
     r = neurolang.new_symbol(name="r")
@@ -324,6 +355,43 @@ def test_neurolang_dl_solve_all():
     assert neurolang.predicate_parameter_names(r) == ("x",)
 
 
+def test_neurolang_dl_solve_all_incremental():
+    neurolang = frontend.NeurolangDL()
+    r = neurolang.new_symbol(name="r")
+    s = neurolang.new_symbol(name="s")
+    x = neurolang.new_symbol(name="x")
+    y = neurolang.new_symbol(name="y")
+    z = neurolang.new_symbol(name="z")
+
+    neurolang.add_tuple_set({(i, i + 1) for i in range(5)}, name="q")
+    q = neurolang.symbols.q
+    r[x, y] = q(x, y)
+    r[x, z] = r[x, y] & q(y, z)
+    sol = neurolang.solve_all()
+    assert sol["r"].to_unnamed() == {
+        (i, j) for i in range(5) for j in range(i + 1, 6)
+    }
+
+    with patch.object(
+        neurolang.chase_class, "build_chase_solution",
+        side_effect=AssertionError("The solution should not be rebuilt")
+    ):
+        neurolang.add_tuple_set({(i, i + 1) for i in range(1, 7)}, name="q")
+        s[x] = r(x, x)
+        sol = neurolang.solve_all()
+        assert sol["r"].to_unnamed() == {
+            (i, j) for i in range(1, 7) for j in range(i + 1, 8)
+        }
+        assert "s" not in sol
+
+        neurolang.execute_datalog_program("q(7, 1)")
+        sol = neurolang.solve_all()
+        assert sol["r"].to_unnamed() == {
+            (i, j) for i in range(1, 8) for j in range(1, 8)
+        }
+        assert sol["s"].to_unnamed() == {(i,) for i in range(1, 8)}
+
+
 def test_neurolange_dl_get_param_names():
     neurolang = frontend.NeurolangDL()
     r = neurolang.new_symbol(name="r")
@@ -231,6 +231,8 @@ class DesambiguateQuantifiedVariables(LogicExpressionWalker):
 
 
 class ReplaceFreeSymbolWalker(ReplaceSymbolWalker):
+    memoize = False
+
     @add_match(Quantifier)
     def stop_if_bound(self, expression):
         s = expression.head
@@ -4,6 +4,7 @@ from ...relational_algebra_provenance import (
     ProvenanceAlgebraSet,
     RelationalAlgebraProvenanceCountingSolver,
 )
+from ...utils.relational_algebra_set import noisy_or
 
 
 class NoisyORProbabilityProvenanceSolver(
@@ -14,7 +15,7 @@ class NoisyORProbabilityProvenanceSolver(
         prov_set = self.walk(projection_op.relation)
         prov_col = prov_set.provenance_column
         group_cols = list(col.value for col in projection_op.attributes)
-        aggregations = {prov_col: lambda s: 1 - (1 - s).prod()}
+        aggregations = {prov_col: noisy_or}
         new_relation = prov_set.value
         new_relation = new_relation.aggregate(group_cols, aggregations)
         proj_cols = [prov_col] + group_cols
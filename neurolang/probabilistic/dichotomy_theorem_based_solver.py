@@ -27,7 +27,7 @@ from ..datalog.expression_processing import (
     enforce_conjunction, flatten_query, EQ
 )
 from ..datalog.translate_to_named_ra import TranslateToNamedRA
-from ..expression_walker import ExpressionWalker, add_match
+from ..expression_walker import FixpointRewriteWalker, add_match
 from ..expressions import Constant, Symbol
 from ..logic import FALSE, Conjunction, Implication
 from ..logic.expression_processing import (
@@ -260,7 +260,7 @@ class ProbSemiringSolver(RelationalAlgebraProvenanceExpressionSemringSolver):
 class RAQueryOptimiser(
     EliminateTrivialProjections,
     RelationalAlgebraPushInSelections,
-    ExpressionWalker,
+    FixpointRewriteWalker,
 ):
     pass
 
@@ -589,6 +589,56 @@ def test_fake_neurosynth(solver):
     assert testing.eq_prov_relations(result, expected)
 
 
+def test_sdd_model_counting_strategies(monkeypatch):
+    code = Union(
+        (
+            Implication(P(x), Conjunction((Q(x, y), R(y)))),
+        )
+    )
+    cpl_program = CPLogicProgram()
+    cpl_program.add_probabilistic_facts_from_tuples(
+        Q, {(0.1 * (i % 7 + 1), f"x{i % 5}", f"y{i % 3}") for i in range(10)}
+    )
+    cpl_program.add_probabilistic_choice_from_tuples(
+        R, {(0.5, "y0"), (0.3, "y1"), (0.2, "y2")}
+    )
+    cpl_program.walk(code)
+    query = Implication(ans(x), P(x))
+
+    expected = weighted_model_counting.solve_succ_query_sdd_direct(
+        query, cpl_program, per_row_model=True
+    )
+    result = weighted_model_counting.solve_succ_query_sdd_direct(
+        query, cpl_program, per_row_model=False
+    )
+    assert testing.eq_prov_relations(result, expected)
+
+    monkeypatch.setattr(
+        weighted_model_counting, "PER_ROW_PARALLEL_MIN_SIZE", 0
+    )
+    monkeypatch.setattr(weighted_model_counting, "PER_ROW_MAX_WORKERS", 2)
+    monkeypatch.setattr(weighted_model_counting, "PER_ROW_CHUNK_SIZE", 2)
+    chosen = []
+    parallel_solver = (
+        weighted_model_counting.sdd_solver_per_individual_row_parallel
+    )
+
+    def recording_solver(*args, **kwargs):
+        chosen.append(True)
+        return parallel_solver(*args, **kwargs)
+
+    monkeypatch.setattr(
+        weighted_model_counting,
+        "sdd_solver_per_individual_row_parallel",
+        recording_solver
+    )
+    result = weighted_model_counting.solve_succ_query_sdd_direct(
+        query, cpl_program, per_row_model=True
+    )
+    assert chosen == [True]
+    assert testing.eq_prov_relations(result, expected)
+
+
 def test_conjunct_pfact_equantified_pchoice(solver):
     pfact_sets = {P: {(0.8, "a", "s1"), (0.5, "a", "s2"), (0.1, "b", "s2")}}
     pchoice_as_sets = {Z: {(0.6, "s1"), (0.4, "s2")}}
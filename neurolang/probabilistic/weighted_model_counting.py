@@ -4,6 +4,9 @@
 """
 import logging
 import operator as op
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
@@ -15,7 +18,7 @@ from ..datalog.expression_processing import (
 )
 from ..datalog.translate_to_named_ra import TranslateToNamedRA
 from ..expression_walker import (
-    ExpressionWalker,
+    FixpointRewriteWalker,
     PatternWalker,
     add_match
 )
@@ -49,9 +52,7 @@ from ..relational_algebra_provenance import (
     RelationalAlgebraProvenanceCountingSolver,
     RelationalAlgebraProvenanceExpressionSemringSolver
 )
-from ..utils.relational_algebra_set.pandas import (
-    NamedRelationalAlgebraFrozenSet
-)
+from ..utils.relational_algebra_set import NamedRelationalAlgebraFrozenSet
 from ..utils import log_performance
 
 from .expression_processing import lift_optimization_for_choice_predicates
@@ -65,6 +66,17 @@ from .probabilistic_ra_utils import (
 
 LOG = logging.getLogger(__name__)
 
+# Rows of a query handed at once to each process counting their models
+PER_ROW_CHUNK_SIZE = 256
+# Processes counting the models of the rows, all the CPUs if None
+PER_ROW_MAX_WORKERS = None
+# Total size of the SDDs of the rows from which counting their models
+# in parallel pays off serialising them for the worker processes
+PER_ROW_PARALLEL_MIN_SIZE = 2 ** 20
+# Relative cost, per row and node of the manager, of compiling the
+# global model with respect to counting the models of each row
+GLOBAL_MODEL_COST_FACTOR = 1.
+
 ADD = Constant(op.add)
 MUL = Constant(op.mul)
 NEG = Constant(op.neg)
@@ -661,7 +673,7 @@ def generate_weights(symbol_probs, literals_to_symbols, extras=0):
 
 class RAQueryOptimiser(
     RelationalAlgebraPushInSelections,
-    ExpressionWalker
+    FixpointRewriteWalker
 ):
     pass
 
@@ -730,6 +742,11 @@ def solve_succ_query_sdd_direct(
     The SUCC query must take the form
 
         SUCC[ P(x) ]
+
+    The models of each row of the result are counted separately if
+    ``per_row_model`` is True, serially or in parallel, and through a
+    global model if it is False. If it is None, `choose_sdd_solver`
+    decides among these.
     """
     with log_performance(LOG, 'Preparing query'):
         conjunctive_query, variables_to_project = prepare_initial_query(
@@ -756,14 +773,16 @@ def solve_succ_query_sdd_direct(
         prob_set_result = solver.walk(ra_query)
 
     df = prob_set_result.relations.as_pandas_dataframe()
-    if per_row_model:
-        probabilities = sdd_solver_per_individual_row(
-            solver, df[prob_set_result.provenance_column]
+    set_probabilities = df[prob_set_result.provenance_column]
+    if per_row_model is None:
+        sdd_solver = choose_sdd_solver(solver, set_probabilities)
+    elif per_row_model:
+        sdd_solver = choose_sdd_solver(
+            solver, set_probabilities, global_model=False
         )
     else:
-        probabilities = sdd_solver_global_model(
-            solver, df[prob_set_result.provenance_column]
-        )
+        sdd_solver = sdd_solver_global_model
+    probabilities = sdd_solver(solver, set_probabilities)
 
     df[prob_set_result.provenance_column] = probabilities
     return ProvenanceAlgebraSet(
@@ -811,23 +830,101 @@ def sdd_solver_global_model(solver, set_probabilities):
 
 def sdd_solver_per_individual_row(solver, set_probabilities):
     probabilities = np.empty(set_probabilities.shape[0])
-    new_rows = []
     with log_performance(LOG, "Minimize manager"):
-        new_rows = set_probabilities
         solver.manager.minimize()
     with log_performance(LOG, "Model Count"):
         weights = solver.wmc_weights()
-        for i, row in enumerate(new_rows):
-            tt = [row]
-            nm = solver.manager.copy(tt)
-            tt[0].ref()
-            nm.minimize()
-            wmc = row.wmc(log_mode=False)
-            wmc.set_literal_weights_from_array(weights)
-            probabilities[i] = wmc.propagate()
+        for i, row in enumerate(set_probabilities):
+            probabilities[i] = _row_probability(row, weights)
     return probabilities
 
 
+def sdd_solver_per_individual_row_parallel(
+    solver, set_probabilities, max_workers=None, chunk_size=None
+):
+    """
+    Count the models of each row in a pool of ``max_workers`` processes,
+    each receiving chunks of ``chunk_size`` rows. The vtree of the
+    manager and the SDD of each row are serialised to files, from which
+    the workers rebuild them.
+    """
+    if max_workers is None:
+        max_workers = PER_ROW_MAX_WORKERS
+    if chunk_size is None:
+        chunk_size = PER_ROW_CHUNK_SIZE
+    with log_performance(LOG, "Minimize manager"):
+        solver.manager.minimize()
+    weights = solver.wmc_weights()
+    with tempfile.TemporaryDirectory() as directory:
+        with log_performance(LOG, "Serialise SDDs"):
+            vtree_file = os.path.join(directory, 'vtree').encode()
+            solver.manager.vtree().save(vtree_file)
+            row_files = []
+            for i, row in enumerate(set_probabilities):
+                row_file = os.path.join(directory, f'{i}.sdd').encode()
+                row.save(row_file)
+                row_files.append(row_file)
+        with log_performance(LOG, "Model Count"):
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                chunks = executor.map(
+                    _rows_probabilities_from_files,
+                    *zip(*(
+                        (vtree_file, row_files[i:i + chunk_size], weights)
+                        for i in range(0, len(row_files), chunk_size)
+                    ))
+                )
+                probabilities = np.concatenate(
+                    [np.empty(0)] + list(chunks)
+                )
+    return probabilities
+
+
+def _rows_probabilities_from_files(vtree_file, row_files, weights):
+    manager = sdd.SddManager.from_vtree(sdd.Vtree.from_file(vtree_file))
+    return np.array([
+        _row_probability(manager.read_sdd_file(row_file), weights)
+        for row_file in row_files
+    ])
+
+
+def _row_probability(row, weights):
+    wmc = row.wmc(log_mode=False)
+    wmc.set_literal_weights_from_array(weights)
+    return wmc.propagate()
+
+
+def choose_sdd_solver(solver, set_probabilities, global_model=True):
+    """
+    Choose how to count the models of the rows of a query from their
+    number and the size of their SDDs.
+
+    Counting the models of each row traverses its SDD, while compiling
+    the global model conjoins an equivalence for each row over the
+    whole manager, whose relative cost is `GLOBAL_MODEL_COST_FACTOR`.
+    The rows are counted in parallel when their SDDs add up to
+    `PER_ROW_PARALLEL_MIN_SIZE` nodes and there are enough of them to
+    give a chunk to more than one process.
+    """
+    rows_size = sum(row.size() for row in set_probabilities)
+    global_model_cost = (
+        GLOBAL_MODEL_COST_FACTOR *
+        len(set_probabilities) * solver.manager.live_size()
+    )
+    if global_model and global_model_cost < rows_size:
+        return sdd_solver_global_model
+
+    max_workers = PER_ROW_MAX_WORKERS
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if (
+        max_workers > 1 and
+        len(set_probabilities) > PER_ROW_CHUNK_SIZE and
+        rows_size >= PER_ROW_PARALLEL_MIN_SIZE
+    ):
+        return sdd_solver_per_individual_row_parallel
+    return sdd_solver_per_individual_row
+
+
 def prepare_initial_query(query_predicate):
     if isinstance(query_predicate, Implication):
         conjunctive_query = query_predicate.antecedent
@@ -863,6 +960,7 @@ def model_count_and_per_row_probability(model, solver, initial_var_count, n):
         extra_ones
     ]
     wmc.set_literal_weights_from_array(weights)
+    wmc.propagate()
     for i in range(len(probabilities)):
         lit = solver.manager.literal(
             initial_var_count + i + 1
@@ -0,0 +1,221 @@
+"""
+Persistent cache of the regions of atlas images.
+
+The regions of an image are stored in a directory named after the
+digest of its labels, shape and affine, or of those and a single label
+when only the region of that label was requested, as ``.npy`` arrays:
+the voxels of all the regions sorted by label and the `ArrayTree` of
+each region, concatenated. The arrays are memory-mapped when loaded,
+such that processes reading the same atlas share the pages holding it.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .aabb_tree import ArrayTree
+from .regions import ExplicitVBR
+
+__all__ = ['RegionCache', 'get_region_cache', 'set_region_cache']
+
+
+CACHE_DIRECTORY_VARIABLE = 'NEUROLANG_REGION_CACHE'
+ARRAY_NAMES = (
+    'labels', 'voxel_offsets', 'voxels',
+    'node_offsets', 'heights', 'lb', 'ub', 'left', 'right'
+)
+
+
+class CachedAtlas:
+    """
+    Regions of an atlas image, indexed by label, built on the arrays
+    of its cache entry.
+    """
+    def __init__(self, arrays, affine, image_dim):
+        self.arrays = arrays
+        self.affine = affine
+        self.image_dim = image_dim
+        self._positions = {
+            label: i for i, label in enumerate(arrays['labels'].tolist())
+        }
+
+    @property
+    def labels(self):
+        return tuple(self._positions)
+
+    def __contains__(self, label):
+        return label in self._positions
+
+    def region(self, label):
+        """
+        Region of the voxels with the given label, ``None`` if there
+        are none.
+        """
+        if label not in self._positions:
+            return None
+        i = self._positions[label]
+        arrays = self.arrays
+        voxel_slice = slice(*arrays['voxel_offsets'][i:i + 2])
+        node_slice = slice(*arrays['node_offsets'][i:i + 2])
+        tree = ArrayTree(
+            arrays['lb'][node_slice], arrays['ub'][node_slice],
+            arrays['left'][node_slice], arrays['right'][node_slice],
+            height=int(arrays['heights'][i])
+        )
+        return ExplicitVBR(
+            arrays['voxels'][voxel_slice], self.affine,
+            image_dim=self.image_dim, aabb_tree=tree
+        )
+
+
+class RegionCache:
+    """
+    Content-addressed cache, in ``directory``, of the voxels, bounding
+    boxes and AABB trees of the regions of atlas images.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self._atlases = dict()
+
+    @staticmethod
+    def image_key(data, affine):
+        digest = hashlib.sha1()
+        data = np.ascontiguousarray(data)
+        affine = np.ascontiguousarray(affine, dtype=float)
+        digest.update(repr((data.dtype.str, data.shape)).encode())
+        digest.update(affine.tobytes())
+        digest.update(data.data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def label_key(image_key, label):
+        digest = hashlib.sha1(repr(label).encode())
+        return f'{image_key}-{digest.hexdigest()}'
+
+    def atlas(self, spatial_image):
+        """
+        Regions of every non-zero label of the image, computed and
+        stored on the first request.
+        """
+        data = np.asanyarray(spatial_image.dataobj)
+        affine = spatial_image.affine
+        key = self.image_key(data, affine)
+        return self._cached_atlas(key, data, affine, spatial_image.shape)
+
+    def region(self, spatial_image, label):
+        """
+        Region of the voxels of the image with the given label. Unless
+        the regions of every label of the image are cached, only this
+        region is computed and stored on the first request, as images
+        which are not atlases can have as many labels as voxels.
+        """
+        data = np.asanyarray(spatial_image.dataobj)
+        affine = spatial_image.affine
+        key = self.image_key(data, affine)
+        if (
+            key in self._atlases or
+            os.path.isdir(os.path.join(self.directory, key))
+        ):
+            atlas = self._cached_atlas(
+                key, data, affine, spatial_image.shape
+            )
+        else:
+            atlas = self._cached_atlas(
+                self.label_key(key, label), data, affine,
+                spatial_image.shape, label=label
+            )
+        return atlas.region(label)
+
+    def _cached_atlas(self, key, data, affine, image_dim, label=None):
+        if key not in self._atlases:
+            path = os.path.join(self.directory, key)
+            if not os.path.isdir(path):
+                self._store(path, data, affine, label)
+            self._atlases[key] = CachedAtlas(
+                self._load(path), affine, image_dim
+            )
+        return self._atlases[key]
+
+    @staticmethod
+    def _load(path):
+        return {
+            name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+            for name in ARRAY_NAMES
+        }
+
+    def _store(self, path, data, affine, label=None):
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=self.directory)
+        try:
+            for name, array in self._compute(data, affine, label).items():
+                np.save(os.path.join(temporary_path, name + '.npy'), array)
+            os.rename(temporary_path, path)
+        except OSError:
+            # another process stored the same image first
+            if not os.path.isdir(path):
+                raise
+        finally:
+            if os.path.isdir(temporary_path):
+                shutil.rmtree(temporary_path)
+
+    @staticmethod
+    def _compute(data, affine, label=None):
+        flat_data = data.ravel()
+        if label is None:
+            indices = np.flatnonzero(flat_data)
+        else:
+            indices = np.flatnonzero(flat_data == label)
+        indices = indices[np.argsort(flat_data[indices], kind='stable')]
+        labels, counts = np.unique(flat_data[indices], return_counts=True)
+        voxels = np.transpose(np.unravel_index(indices, data.shape))
+        voxel_offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        trees = [
+            ExplicitVBR(voxels[start:end], affine).build_tree()
+            for start, end in zip(voxel_offsets[:-1], voxel_offsets[1:])
+        ]
+        node_offsets = np.concatenate(
+            ([0], np.cumsum([len(tree) for tree in trees], dtype=int))
+        )
+
+        def concatenate(name, shape):
+            if len(trees) == 0:
+                return np.empty(shape)
+            return np.concatenate([getattr(tree, name) for tree in trees])
+
+        dim = data.ndim
+        return {
+            'labels': labels,
+            'voxel_offsets': voxel_offsets,
+            'voxels': voxels.astype(int),
+            'node_offsets': node_offsets,
+            'heights': np.array([tree.height for tree in trees], dtype=int),
+            'lb': concatenate('lb', (0, dim)),
+            'ub': concatenate('ub', (0, dim)),
+            'left': concatenate('left', (0,)).astype(int),
+            'right': concatenate('right', (0,)).astype(int),
+        }
+
+
+_region_cache = None
+
+
+def get_region_cache():
+    """
+    Region cache of the process, in the directory set by the
+    ``NEUROLANG_REGION_CACHE`` environment variable if no cache was set
+    with `set_region_cache`. ``None`` if there is neither.
+    """
+    global _region_cache
+    if _region_cache is None:
+        directory = os.environ.get(CACHE_DIRECTORY_VARIABLE)
+        if directory:
+            _region_cache = RegionCache(directory)
+    return _region_cache
+
+
+def set_region_cache(region_cache):
+    global _region_cache
+    _region_cache = region_cache
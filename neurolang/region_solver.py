@@ -1,7 +1,8 @@
 import typing
 import re
 
-from .CD_relations import cardinal_relation, inverse_directions
+from .CD_relations import (cardinal_relation, cardinal_relation_pairs,
+                           inverse_directions)
 from .regions import Region, region_union
 from .expression_walker import PatternWalker
 from .expressions import Constant
@@ -38,6 +39,15 @@ class RegionSolver(PatternWalker[Region]):
                     refine_overlapping=refine_overlapping,
                     stop_at=max_tree_depth_level
                 ))
+
+            def columnwise(xs, ys):
+                return cardinal_relation_pairs(
+                    xs, ys, relation,
+                    refine_overlapping=refine_overlapping,
+                    stop_at=max_tree_depth_level
+                )
+
+            fun.columnwise = columnwise
             return fun
 
         def anatomical_direction_function(relation, refine_overlapping=False):
@@ -63,6 +73,25 @@ class RegionSolver(PatternWalker[Region]):
                     )
                 )
 
+            def columnwise(xs, ys):
+                return cardinal_relation_pairs(
+                    xs, ys, relation,
+                    refine_overlapping=refine_overlapping,
+                    stop_at=max_tree_depth_level
+                ) & ~(
+                    cardinal_relation_pairs(
+                        xs, ys, inverse_directions[relation],
+                        refine_overlapping=refine_overlapping,
+                        stop_at=max_tree_depth_level
+                    ) |
+                    cardinal_relation_pairs(
+                        xs, ys, cardinal_operations['overlapping'],
+                        refine_overlapping=refine_overlapping,
+                        stop_at=max_tree_depth_level
+                    )
+                )
+
+            func.columnwise = columnwise
             return func
 
         for key, value in cardinal_operations.items():
@@ -4,7 +4,7 @@ import scipy.ndimage
 from itertools import product
 
 from .exceptions import NeuroLangException
-from .aabb_tree import AABB, Tree, aabb_from_vertices, Node
+from .aabb_tree import AABB, ArrayTree, Node, Tree, aabb_from_vertices
 
 __all__ = [
     'region_union', 'region_intersection', 'region_difference',
@@ -167,62 +167,12 @@ class PointSet(VolumetricBrainRegion):
         return aabb_from_vertices(points_xyz)
 
     def build_tree(self):
-        box = self._bounding_box
-        tree = Tree()
-        tree.add(box)
-
-        affine_matrix_inv = np.linalg.inv(self.affine)
-
-        stack = list([(box.lb, box.ub, self.points_ijk, tree.root)])
-        while stack:
-            node = stack.pop()
-            lb, ub, parent_voxels, tree_node = node
-
+        points_xyz = nib.affines.apply_affine(self.affine, self.points_ijk)
+        tree = ArrayTree.from_elements(
+            points_xyz, points_xyz, self.points_ijk,
             # this only works if the affine matrix is diagonal
-            middle_point_xyz = (lb + ub) / 2
-            middle_point_ijk = nib.affines.apply_affine(
-                affine_matrix_inv, middle_point_xyz
-            )
-
-            axes = np.argsort(ub - lb)
-            for ax in axes:
-                left_mask = parent_voxels.T[ax] <= middle_point_ijk[ax]
-                points_left = parent_voxels[left_mask]
-                if 0 < len(points_left) < len(parent_voxels):
-                    break
-            else:
-                continue
-
-            height = tree_node.height - 1
-
-            box_left = self.generate_bounding_box(points_left)
-            tree_node.left = Node(
-                box=box_left, parent=tree_node, height=height
-            )
-            stack.append(
-                (box_left.lb, box_left.ub, points_left, tree_node.left)
-            )
-
-            points_right = parent_voxels[~left_mask]
-            box_right = self.generate_bounding_box(points_right)
-            tree_node.right = Node(
-                box=box_right, parent=tree_node, height=height
-            )
-            stack.append(
-                (box_right.lb, box_right.ub, points_right, tree_node.right)
-            )
-
-            tree.height = -height
-
-        stack = [tree.root]
-        while stack:
-            node = stack.pop()
-            node.height = tree.height + node.height
-            if node.left is not None:
-                stack.append(node.left)
-            if node.right is not None:
-                stack.append(node.right)
-
+            lambda points: nib.affines.apply_affine(self.affine_inv, points)
+        )
         self._aabb_tree = tree
         return tree
 
@@ -268,7 +218,8 @@ class PointSet(VolumetricBrainRegion):
 
 class ExplicitVBR(VolumetricBrainRegion):
     def __init__(
-        self, voxels, affine_matrix, image_dim=None, prebuild_tree=False
+        self, voxels, affine_matrix, image_dim=None, prebuild_tree=False,
+        aabb_tree=None
     ):
         self.voxels = np.asanyarray(voxels, dtype=int)
         self.affine = affine_matrix
@@ -276,9 +227,12 @@ class ExplicitVBR(VolumetricBrainRegion):
         for ar in (self.voxels, self.affine, self.affine_inv):
             ar.setflags(write=False)
         self.image_dim = image_dim
-        self._aabb_tree = None
-        self._bounding_box = self.generate_bounding_box(self.voxels)
-        if prebuild_tree:
+        self._aabb_tree = aabb_tree
+        if aabb_tree is None:
+            self._bounding_box = self.generate_bounding_box(self.voxels)
+        else:
+            self._bounding_box = aabb_tree.box(aabb_tree.root)
+        if prebuild_tree and aabb_tree is None:
             self.build_tree()
 
     @property
@@ -298,62 +252,17 @@ class ExplicitVBR(VolumetricBrainRegion):
         return aabb_from_vertices(voxels_xyz)
 
     def build_tree(self):
-        box = self._bounding_box
-        tree = Tree()
-        tree.add(box)
-
-        affine_matrix_inv = np.linalg.inv(self.affine)
-
-        stack = list([(box.lb, box.ub, self.voxels, tree.root)])
-        while stack:
-            node = stack.pop()
-            lb, ub, parent_voxels, tree_node = node
-
+        voxels_xyz = nib.affines.apply_affine(self.affine, self.voxels)
+        opposite_corners_xyz = nib.affines.apply_affine(
+            self.affine, self.voxels + 1
+        )
+        tree = ArrayTree.from_elements(
+            np.minimum(voxels_xyz, opposite_corners_xyz),
+            np.maximum(voxels_xyz, opposite_corners_xyz),
+            self.voxels,
             # this only works if the affine matrix is diagonal
-            middle_point_xyz = (lb + ub) / 2
-            middle_point_ijk = nib.affines.apply_affine(
-                affine_matrix_inv, middle_point_xyz
-            )
-
-            axes = np.argsort(ub - lb)
-            for ax in axes:
-                left_mask = parent_voxels.T[ax] <= middle_point_ijk[ax]
-                voxels_left = parent_voxels[left_mask]
-                if 0 < len(voxels_left) < len(parent_voxels):
-                    break
-            else:
-                continue
-
-            height = tree_node.height - 1
-
-            box_left = self.generate_bounding_box(voxels_left)
-            tree_node.left = Node(
-                box=box_left, parent=tree_node, height=height
-            )
-            stack.append(
-                (box_left.lb, box_left.ub, voxels_left, tree_node.left)
-            )
-
-            voxels_right = parent_voxels[~left_mask]
-            box_right = self.generate_bounding_box(voxels_right)
-            tree_node.right = Node(
-                box=box_right, parent=tree_node, height=height
-            )
-            stack.append(
-                (box_right.lb, box_right.ub, voxels_right, tree_node.right)
-            )
-
-            tree.height = -height
-
-        stack = [tree.root]
-        while stack:
-            node = stack.pop()
-            node.height = tree.height + node.height
-            if node.left is not None:
-                stack.append(node.left)
-            if node.right is not None:
-                stack.append(node.right)
-
+            lambda points: nib.affines.apply_affine(self.affine_inv, points)
+        )
         self._aabb_tree = tree
         return tree
 
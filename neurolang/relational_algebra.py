@@ -1,6 +1,11 @@
 import operator
+from collections import abc
+from itertools import repeat
 from typing import AbstractSet, Tuple
 
+import numpy as np
+import pandas as pd
+
 from . import expression_walker as ew
 from . import type_system
 from .exceptions import NeuroLangException
@@ -15,8 +20,9 @@ from .expressions import (
 )
 from .utils import NamedRelationalAlgebraFrozenSet, RelationalAlgebraSet
 from .utils.relational_algebra_set import (
-    RelationalAlgebraColumnInt, RelationalAlgebraColumnStr,
-    RelationalAlgebraStringExpression
+    RelationalAlgebraColumnFunction, RelationalAlgebraColumnInt,
+    RelationalAlgebraColumnStr, RelationalAlgebraStringExpression,
+    exact_integer_ufunc
 )
 
 eq_ = Constant(operator.eq)
@@ -114,6 +120,58 @@ class NaturalJoin(RelationalAlgebraOperation):
         return f"[{self.relation_left}" f"\N{JOIN}" f"{self.relation_right}]"
 
 
+class SemiJoin(RelationalAlgebraOperation):
+    """
+    Tuples of the left relation which agree with some tuple of the
+    right relation on their common columns.
+    """
+    def __init__(self, relation_left, relation_right):
+        self.relation_left = relation_left
+        self.relation_right = relation_right
+
+    def __repr__(self):
+        return (
+            f"[{self.relation_left}"
+            f"\N{LEFT NORMAL FACTOR SEMIDIRECT PRODUCT}"
+            f"{self.relation_right}]"
+        )
+
+
+class AntiJoin(RelationalAlgebraOperation):
+    """
+    Tuples of the left relation which do not agree with any tuple of
+    the right relation on their common columns.
+    """
+    def __init__(self, relation_left, relation_right):
+        self.relation_left = relation_left
+        self.relation_right = relation_right
+
+    def __repr__(self):
+        return (
+            f"[{self.relation_left}"
+            f"\N{WHITE RIGHT-POINTING TRIANGLE}"
+            f"{self.relation_right}]"
+        )
+
+
+class MultiwayJoin(RelationalAlgebraOperation):
+    """
+    Natural join of several named relations at once, evaluated through
+    the `multiwayjoin` method of the sets such that backends can use
+    worst-case optimal algorithms, whose intermediate results are never
+    larger than the worst-case size of the output.
+    """
+    def __init__(self, relations):
+        self.relations = tuple(relations)
+
+    def __repr__(self):
+        return (
+            "["
+            + "\N{JOIN}".join(repr(r) for r in self.relations)
+            + "]"
+        )
+
+
 class Product(RelationalAlgebraOperation):
     def __init__(self, relations):
         self.relations = tuple(relations)
@@ -454,6 +512,123 @@ class StringArithmeticWalker(ew.PatternWalker):
         )
 
 
+NUMPY_UFUNCS = {
+    operator.add: exact_integer_ufunc(np.add),
+    operator.sub: exact_integer_ufunc(np.subtract),
+    operator.mul: exact_integer_ufunc(np.multiply),
+    operator.truediv: np.true_divide,
+    operator.floordiv: np.floor_divide,
+    operator.mod: np.mod,
+    operator.neg: exact_integer_ufunc(np.negative),
+    operator.eq: np.equal,
+    operator.ne: np.not_equal,
+    operator.gt: np.greater,
+    operator.lt: np.less,
+    operator.ge: np.greater_equal,
+    operator.le: np.less_equal,
+    operator.and_: np.bitwise_and,
+    operator.or_: np.bitwise_or,
+    operator.invert: np.invert,
+    operator.not_: np.logical_not,
+}
+
+
+def _map_rows(function, values, varying, length):
+    iterables = [
+        v if var else repeat(v, length)
+        for v, var in zip(values, varying)
+    ]
+    if len(iterables) == 0:
+        results = [function() for _ in range(length)]
+    else:
+        results = list(map(function, *iterables))
+    if len(results) == 0:
+        return np.empty(0, dtype=object)
+    return pd.Series(results).values
+
+
+def _as_column(value, varying, length):
+    if varying:
+        return value
+    column = np.empty(length, dtype=object)
+    column.fill(value)
+    return column
+
+
+class FunctionApplicationToColumnFunction(ew.PatternWalker):
+    """
+    Walker compiling a `FunctionApplication` on a relation's columns into
+    a function on the arrays of values of those columns. Operators with
+    a NumPy ufunc counterpart are evaluated by the ufunc, as are functions
+    with a ``columnwise`` attribute, taking the arrays of values of their
+    arguments. Any other function is mapped over the rows.
+
+    Each expression is compiled into a pair of a function, receiving a
+    dictionary from column names to arrays of values and the number of
+    rows, and whether its result varies across rows.
+    """
+    def compile(self, expression):
+        columns = tuple(c.value for c in get_expression_columns(expression))
+        evaluate, _ = self.walk(expression)
+        return RelationalAlgebraColumnFunction(
+            lambda length, *values: evaluate(
+                dict(zip(columns, values)), length
+            ),
+            columns
+        )
+
+    @ew.add_match(FunctionApplication(Constant, ...))
+    def function_application(self, expression):
+        function = expression.functor.value
+        compiled_args = tuple(self.walk(arg) for arg in expression.args)
+        evaluators = tuple(evaluate for evaluate, _ in compiled_args)
+        varying = tuple(varies for _, varies in compiled_args)
+        columnwise = getattr(function, 'columnwise', None)
+        if columnwise is not None and any(varying):
+            return (
+                lambda columns, length: columnwise(*(
+                    _as_column(e(columns, length), varies, length)
+                    for e, varies in zip(evaluators, varying)
+                )),
+                True
+            )
+        ufunc = self._ufunc(function)
+        if ufunc is not None and any(varying) and all(
+            varies or np.isscalar(arg.value)
+            for arg, varies in zip(expression.args, varying)
+        ):
+            return (
+                lambda columns, length: ufunc(
+                    *(e(columns, length) for e in evaluators)
+                ),
+                True
+            )
+        return (
+            lambda columns, length: _map_rows(
+                function, [e(columns, length) for e in evaluators],
+                varying, length
+            ),
+            True
+        )
+
+    @staticmethod
+    def _ufunc(function):
+        try:
+            return NUMPY_UFUNCS.get(function)
+        except TypeError:
+            return None
+
+    @ew.add_match(Constant[Column])
+    def column(self, column):
+        name = column.value
+        return (lambda columns, length: columns[name]), True
+
+    @ew.add_match(Constant)
+    def constant(self, constant):
+        value = constant.value
+        return (lambda columns, length: value), False
+
+
 class ReplaceConstantColumnStrBySymbol(ew.ExpressionWalker):
     @ew.add_match(Constant[ColumnStr])
     def column_str(self, expression):
@@ -469,9 +644,8 @@ class RelationalAlgebraSolver(ew.ExpressionWalker):
     as objects with the same interface as :obj:`RelationalAlgebraSet`.
     """
 
-    _rccsbs = ReplaceConstantColumnStrBySymbol()
     _saw = StringArithmeticWalker()
-    _fa_2_lambda = ew.FunctionApplicationToPythonLambda()
+    _fa_2_cf = FunctionApplicationToColumnFunction()
 
     def __init__(self, symbol_table=None):
         self.symbol_table = symbol_table
@@ -561,6 +735,32 @@ class RelationalAlgebraSolver(ew.ExpressionWalker):
         res = left.naturaljoin(right)
         return self._build_relation_constant(res)
 
+    @ew.add_match(SemiJoin(Constant, Constant))
+    def ra_semijoin(self, semijoin):
+        left = semijoin.relation_left.value
+        right = semijoin.relation_right.value
+        res = left.semijoin(right)
+        return self._build_relation_constant(res)
+
+    @ew.add_match(AntiJoin(Constant, Constant))
+    def ra_antijoin(self, antijoin):
+        left = antijoin.relation_left.value
+        right = antijoin.relation_right.value
+        res = left.antijoin(right)
+        return self._build_relation_constant(res)
+
+    @ew.add_match(
+        MultiwayJoin,
+        lambda join: all(
+            isinstance(relation, Constant)
+            for relation in join.relations
+        )
+    )
+    def ra_multiway_join(self, multiway_join):
+        relations = [relation.value for relation in multiway_join.relations]
+        res = relations[0].multiwayjoin(*relations[1:])
+        return self._build_relation_constant(res)
+
     @ew.add_match(Difference(Constant, Constant))
     def ra_difference(self, difference):
         return self._type_preserving_binary_operation(difference)
@@ -654,10 +854,7 @@ class RelationalAlgebraSolver(ew.ExpressionWalker):
             try:
                 return self._saw.walk(fun_exp).value
             except NeuroLangPatternMatchingNoMatch:
-                fun, args = self._fa_2_lambda.walk(self._rccsbs.walk(fun_exp))
-                return lambda t: fun(
-                    **{arg: t[arg] for arg in args}
-                )
+                return self._fa_2_cf.compile(fun_exp)
         elif isinstance(fun_exp, Constant[ColumnInt]):
             return RelationalAlgebraColumnInt(fun_exp.value)
         elif isinstance(fun_exp, Constant[ColumnStr]):
@@ -752,6 +949,35 @@ class RelationalAlgebraSolver(ew.ExpressionWalker):
         return self._build_relation_constant(new_relation, type_=type_)
 
 
+def hypergraph_is_cyclic(edges):
+    """
+    Whether the hypergraph, given as an iterable of sets of vertices, is
+    cyclic in the sense of α-acyclicity, decided through the GYO
+    reduction: vertices belonging to only one edge and edges contained
+    in other edges are removed until no rule applies.
+    """
+    edges = [set(edge) for edge in edges]
+    changed = True
+    while changed and len(edges) > 1:
+        changed = False
+        for edge in edges:
+            lonely = {
+                vertex for vertex in edge
+                if sum(vertex in other for other in edges) == 1
+            }
+            if lonely:
+                edge -= lonely
+                changed = True
+        for i, edge in enumerate(edges):
+            if any(
+                edge <= other for j, other in enumerate(edges) if i != j
+            ):
+                del edges[i]
+                changed = True
+                break
+    return len(edges) > 1
+
+
 class RelationalAlgebraSimplification(ew.ExpressionWalker):
     @ew.add_match(Product, lambda x: len(x.relations) == 1)
     def single_product(self, product):
@@ -1046,7 +1272,7 @@ class RelationalAlgebraOptimiser(
     equi-selection/product compositions into equijoins.
     """
 
-    pass
+    memoize = True
 
 
 def _const_relation_type_is_known(const_relation):
@@ -1090,8 +1316,11 @@ def _sort_typed_const_named_relation_tuple_type_args(const_named_relation):
 def _infer_relation_type(relation):
     """
     Infer the type of the tuples in the relation based on its first tuple. If
-    the relation is empty, just return `Abstract[Tuple]`.
+    the relation is empty, or its computation has been deferred, just return
+    `Abstract[Tuple]`.
     """
+    if relation.is_deferred():
+        return AbstractSet[Tuple]
     if relation.is_empty() or relation.arity == 0:
         return AbstractSet[Tuple]
     if hasattr(relation, "row_type"):
@@ -1165,6 +1394,30 @@ class RelationalAlgebraPushInSelections(ew.PatternWalker):
             )
         )
 
+    @ew.add_match(Selection(SemiJoin, ...))
+    def push_selection_in_semijoin(self, expression):
+        return self.walk(
+            SemiJoin(
+                Selection(
+                    expression.relation.relation_left,
+                    expression.formula
+                ),
+                expression.relation.relation_right
+            )
+        )
+
+    @ew.add_match(Selection(AntiJoin, ...))
+    def push_selection_in_antijoin(self, expression):
+        return self.walk(
+            AntiJoin(
+                Selection(
+                    expression.relation.relation_left,
+                    expression.formula
+                ),
+                expression.relation.relation_right
+            )
+        )
+
     @ew.add_match(
         Selection(Projection, ...),
         lambda exp: len(
@@ -1177,3 +1430,273 @@ class RelationalAlgebraPushInSelections(ew.PatternWalker):
             Selection(expression.relation.relation, expression.formula),
             expression.relation.attributes
         )
+
+
+class RelationalAlgebraReorderJoins(ew.ExpressionWalker):
+    """
+    Reorders trees of natural joins as left-deep trees chosen greedily.
+    The smallest relation goes first and, at each step, the relation
+    minimising the estimated size of the intermediate result is joined
+    next, preferring relations sharing columns with the previous ones
+    in order to avoid cross products.
+
+    Cardinalities are those of the relations in the symbol table, or
+    in constants, estimated through selections, projections, renames and
+    joins. Join trees whose operands' columns or cardinalities can not
+    be obtained are left untouched. Reordered trees are projected back
+    to their original column order.
+    """
+    selection_selectivity = .1
+
+    def __init__(self, symbol_table=None):
+        if symbol_table is None:
+            symbol_table = dict()
+        self.symbol_table = symbol_table
+
+    @ew.add_match(NaturalJoin)
+    def reorder_natural_join(self, expression):
+        operands = self._natural_join_operands(expression)
+        new_operands = tuple(self.walk(operand) for operand in operands)
+        if len(operands) > 2:
+            order = self._greedy_join_order(new_operands)
+        else:
+            order = None
+        if order is None:
+            order = range(len(new_operands))
+        if all(
+            new_operands[i] is operand for i, operand in zip(order, operands)
+        ):
+            return expression
+        new_expression = new_operands[order[0]]
+        for i in order[1:]:
+            new_expression = NaturalJoin(new_expression, new_operands[i])
+        columns = self.expression_columns(expression)
+        if self.expression_columns(new_expression) != columns:
+            new_expression = Projection(new_expression, columns)
+        return new_expression
+
+    @staticmethod
+    def _natural_join_operands(expression):
+        operands = []
+        stack = [expression]
+        while stack:
+            expression = stack.pop()
+            if isinstance(expression, NaturalJoin):
+                stack += [expression.relation_right, expression.relation_left]
+            else:
+                operands.append(expression)
+        return operands
+
+    def _greedy_join_order(self, operands):
+        columns = [self.expression_columns(operand) for operand in operands]
+        sizes = [self.estimate_cardinality(operand) for operand in operands]
+        if any(c is None for c in columns) or any(s is None for s in sizes):
+            return None
+        columns = [set(c) for c in columns]
+        remaining = list(range(len(operands)))
+        current = min(remaining, key=lambda i: sizes[i])
+        remaining.remove(current)
+        order = [current]
+        current_columns = set(columns[current])
+        current_size = sizes[current]
+        while remaining:
+            connected = [
+                i for i in remaining
+                if not columns[i].isdisjoint(current_columns)
+            ]
+            if len(connected) == 0:
+                connected = remaining
+            current = min(
+                connected,
+                key=lambda i: self._join_cardinality(
+                    current_size, sizes[i],
+                    not columns[i].isdisjoint(current_columns)
+                )
+            )
+            current_size = self._join_cardinality(
+                current_size, sizes[current],
+                not columns[current].isdisjoint(current_columns)
+            )
+            current_columns |= columns[current]
+            remaining.remove(current)
+            order.append(current)
+        return order
+
+    @staticmethod
+    def _join_cardinality(left_size, right_size, have_common_columns):
+        if not have_common_columns:
+            return left_size * right_size
+        return left_size * right_size / max(left_size, right_size, 1)
+
+    def _relation_constant(self, expression):
+        if isinstance(expression, Symbol):
+            if expression not in self.symbol_table:
+                return None
+            expression = self.symbol_table[expression]
+        if (
+            isinstance(expression, Constant) and
+            isinstance(expression.value, abc.Set)
+        ):
+            return expression
+        return None
+
+    def expression_columns(self, expression):
+        """
+        Named columns of the relation resulting from the expression, as a
+        tuple of column expressions, or ``None`` if they are not known.
+        """
+        if isinstance(expression, (Constant, Symbol)):
+            relation = self._relation_constant(expression)
+            if (
+                relation is None or
+                not isinstance(relation.value, NamedRelationalAlgebraFrozenSet)
+            ):
+                return None
+            return tuple(
+                str2columnstr_constant(c) for c in relation.value.columns
+            )
+        elif isinstance(expression, NameColumns):
+            return tuple(expression.column_names)
+        elif isinstance(expression, Projection):
+            return tuple(expression.attributes)
+        elif isinstance(expression, ExtendedProjection):
+            return tuple(p.dst_column for p in expression.projection_list)
+        elif isinstance(expression, NaturalJoin):
+            left = self.expression_columns(expression.relation_left)
+            right = self.expression_columns(expression.relation_right)
+            if left is None or right is None:
+                return None
+            return left + tuple(c for c in right if c not in left)
+        elif isinstance(expression, MultiwayJoin):
+            columns = tuple()
+            for relation in expression.relations:
+                relation_columns = self.expression_columns(relation)
+                if relation_columns is None:
+                    return None
+                columns += tuple(
+                    c for c in relation_columns if c not in columns
+                )
+            return columns
+
+        columns = self.expression_columns(expression.relation)
+        if columns is None:
+            return None
+        elif isinstance(expression, RenameColumn):
+            columns = tuple(
+                expression.dst if c == expression.src else c
+                for c in columns
+            )
+        elif isinstance(expression, RenameColumns):
+            renames = dict(expression.renames)
+            columns = tuple(renames.get(c, c) for c in columns)
+        elif isinstance(expression, Destroy):
+            columns = columns + (expression.dst_column,)
+        elif isinstance(expression, ConcatenateConstantColumn):
+            columns = columns + (expression.column_name,)
+        elif not isinstance(expression, Selection):
+            return None
+        return columns
+
+    def estimate_cardinality(self, expression):
+        """
+        Estimated number of tuples resulting from the expression, or
+        ``None`` if it can not be estimated.
+        """
+        if isinstance(expression, (Constant, Symbol)):
+            relation = self._relation_constant(expression)
+            if relation is None:
+                return None
+            return len(relation.value)
+        elif isinstance(expression, NaturalJoin):
+            left = self.estimate_cardinality(expression.relation_left)
+            right = self.estimate_cardinality(expression.relation_right)
+            if left is None or right is None:
+                return None
+            return self._join_cardinality(left, right, True)
+        elif isinstance(expression, Selection):
+            size = self.estimate_cardinality(expression.relation)
+            if size is None:
+                return None
+            return size * self.selection_selectivity
+        elif isinstance(expression, (
+            Projection, ExtendedProjection, NameColumns, RenameColumn,
+            RenameColumns, ConcatenateConstantColumn, Destroy
+        )):
+            return self.estimate_cardinality(expression.relation)
+        return None
+
+
+class RelationalAlgebraMultiwayJoins(RelationalAlgebraReorderJoins):
+    """
+    Replaces trees of natural joins whose operands form a cyclic
+    hypergraph of columns, such as triangles, by a `MultiwayJoin`,
+    avoiding the large intermediate results of binary joins. Acyclic
+    trees are reordered by cardinality.
+    """
+    @ew.add_match(NaturalJoin)
+    def multiway_natural_join(self, expression):
+        operands = self._natural_join_operands(expression)
+        columns = [self.expression_columns(operand) for operand in operands]
+        if (
+            any(c is None for c in columns) or
+            not hypergraph_is_cyclic(columns)
+        ):
+            return self.reorder_natural_join(expression)
+        return MultiwayJoin(tuple(self.walk(operand) for operand in operands))
+
+
+class RelationalAlgebraSemiJoinProjections(ew.ExpressionWalker):
+    """
+    Replaces the natural joins under a projection keeping columns of
+    only one of their operands by semijoins of that operand, applying
+    it recursively, such that the joins are not materialised. A
+    projection on no columns, as those deciding whether a conjunctive
+    query has any answer, turns an acyclic join tree into semijoins.
+
+    Columns of the relations are obtained as in
+    `RelationalAlgebraReorderJoins`, joins whose operands' columns are
+    not known are left untouched.
+    """
+    def __init__(self, symbol_table=None):
+        self.join_walker = RelationalAlgebraReorderJoins(symbol_table)
+
+    @ew.add_match(Projection(Projection, ...))
+    def merge_projections(self, expression):
+        return self.walk(
+            Projection(expression.relation.relation, expression.attributes)
+        )
+
+    @ew.add_match(Projection(NaturalJoin, ...))
+    def projection_natural_join(self, expression):
+        relation = self.semijoin_reduction(
+            expression.relation, set(expression.attributes)
+        )
+        if relation is expression.relation:
+            return expression
+        return Projection(relation, expression.attributes)
+
+    def semijoin_reduction(self, expression, columns):
+        """
+        Relation with the same projection on ``columns`` as
+        ``expression``, including at least those columns.
+        """
+        if not isinstance(expression, NaturalJoin):
+            return self.walk(expression)
+        left = expression.relation_left
+        right = expression.relation_right
+        left_columns = self.join_walker.expression_columns(left)
+        right_columns = self.join_walker.expression_columns(right)
+        if left_columns is None or right_columns is None:
+            return self.walk(expression)
+        common = set(left_columns) & set(right_columns)
+        if columns <= set(left_columns):
+            return SemiJoin(
+                self.semijoin_reduction(left, columns | common),
+                self.walk(right)
+            )
+        elif columns <= set(right_columns):
+            return SemiJoin(
+                self.semijoin_reduction(right, columns | common),
+                self.walk(left)
+            )
+        return self.walk(expression)
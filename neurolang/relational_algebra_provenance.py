@@ -34,6 +34,7 @@ from .relational_algebra import (
     eq_,
     str2columnstr_constant
 )
+from .utils.relational_algebra_set import register_aggregate_kernel
 
 ADD = Constant(operator.add)
 MUL = Constant(operator.mul)
@@ -661,3 +662,9 @@ class RelationalAlgebraProvenanceExpressionSemringSolver(
             f"Relational Algebra with Provenance "
             f"operation {type(ra_operation)} not implemented"
         )
+
+
+# on numeric provenance columns, the semiring sum is the sum
+register_aggregate_kernel(
+    RelationalAlgebraProvenanceExpressionSemringSolver._semiring_agg_sum, sum
+)
@@ -1,6 +1,6 @@
 import numpy as np
 
-from ..aabb_tree import AABB, Tree
+from ..aabb_tree import AABB, ArrayTree, Tree
 
 
 def _generate_random_box(x_bounds, y_bounds, z_bounds, size_bounds):
@@ -162,3 +162,47 @@ def test_overlapping_regions():
         tree.add(box, regions={label})
         expected_overlapping.add(label)
     assert tree.query_overlapping_regions('target') == expected_overlapping
+
+
+def test_array_tree_construction():
+    points = np.array([[0, 0, 0], [2, 0, 1], [5, 5, 5]], dtype=float)
+    tree = ArrayTree.from_elements(points, points + 1)
+    assert tree.box(tree.root) == AABB((0, 0, 0), (6, 6, 6))
+    assert tree.height == 2
+    assert tree.is_leaf.sum() == len(points)
+    leaves = np.flatnonzero(tree.is_leaf)
+    assert (
+        set(map(tuple, tree.lb[leaves])) ==
+        set(map(tuple, points))
+    )
+    for node in np.flatnonzero(~tree.is_leaf):
+        box = tree.box(node)
+        for child in tree.children(node):
+            assert box.contains(tree.box(child))
+
+    tree = ArrayTree.from_elements(points[:1], points[:1] + 1)
+    assert len(tree) == 1
+    assert tree.height == 0
+    assert tree.children(tree.root) == ()
+
+
+def test_array_tree_query_overlapping():
+    np.random.seed(0)
+    lb = np.random.uniform(0, 10, size=(100, 3))
+    ub = lb + np.random.uniform(0, 1, size=(100, 3))
+    tree = ArrayTree.from_elements(lb, ub)
+
+    query_lb = np.random.uniform(0, 10, size=(20, 3))
+    query_ub = query_lb + np.random.uniform(0, 3, size=(20, 3))
+    boxes, leaves = tree.query_overlapping(query_lb, query_ub)
+    result = set(zip(
+        boxes, map(tuple, tree.lb[leaves]), map(tuple, tree.ub[leaves])
+    ))
+
+    expected = set(
+        (i, tuple(lb[j]), tuple(ub[j]))
+        for i in range(len(query_lb))
+        for j in range(len(lb))
+        if AABB(lb[j], ub[j]).overlaps(AABB(query_lb[i], query_ub[i]))
+    )
+    assert result == expected
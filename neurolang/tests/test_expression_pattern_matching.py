@@ -2,9 +2,10 @@ from pytest import raises
 import typing
 
 from .. import expressions
+from .. import expression_pattern_matching
 from ..expression_pattern_matching import (
     PatternMatcher, add_match, NeuroLangPatternMatchingNoMatch,
-    UndeterminedType
+    UndeterminedType, PatternMatchingTracer, trace_pattern_matching
 )
 from ..expressions import Projection, Statement, Query
 
@@ -211,3 +212,106 @@ def test_pattern_matching_wrong_args():
             )
             def __(self, expression):
                 return expression
+
+
+def test_dispatch_table_candidates():
+    class PM0(PatternMatcher):
+        @add_match(F_(..., (..., ...)))
+        def binary_application(self, expression):
+            return 'binary'
+
+        @add_match(...)
+        def _(self, expression):
+            return 'default'
+
+    class PM(PM0):
+        @add_match(C_[int])
+        def constant_int(self, expression):
+            return 'int'
+
+        @add_match(expressions.Symbol)
+        def symbol(self, expression):
+            return 'symbol'
+
+    table = PM.__dispatch_table__
+    assert len(table) == 4
+    assert list(PM().patterns) == list(table.patterns)
+
+    candidates = table.candidates(C_[int](1))
+    assert [p.action for p, _ in candidates] == [PM.constant_int, PM._]
+    candidates = table.candidates(S_('a'))
+    assert [p.action for p, _ in candidates] == [PM.symbol, PM._]
+    assert [a for _, a in table.candidates(F_(S_('f'), (S_('a'),)))] == [
+        (('args', 2),), ()
+    ]
+
+    pm = PM()
+    assert pm.match(C_[int](1)) == 'int'
+    assert pm.match(C_[str]('a')) == 'default'
+    assert pm.match(S_('a')) == 'symbol'
+    assert pm.match(F_(S_('f'), (S_('a'), S_('b')))) == 'binary'
+    assert pm.match(F_(S_('f'), (S_('a'),))) == 'default'
+
+
+def test_dispatch_table_first_match_order():
+    class PM(PatternMatcher):
+        @add_match(expressions.Expression)
+        def expression(self, expression):
+            return 'expression'
+
+        @add_match(C_[int])
+        def constant_int(self, expression):
+            return 'int'
+
+    pm = PM()
+    for e in example_expressions.values():
+        assert pm.match(e) == 'expression'
+
+
+def test_trace_pattern_matching():
+    class PM(PatternMatcher):
+        @add_match(F_)
+        def function_application(self, expression):
+            return self.match(expression.functor)
+
+        @add_match(...)
+        def _(self, expression):
+            return expression
+
+    pm = PM()
+    exp = F_(S_('f'), (C_[int](1),))
+    with trace_pattern_matching() as tracer:
+        assert pm.match(exp) == S_('f')
+    assert pm.match(exp) == S_('f')
+
+    assert isinstance(tracer, PatternMatchingTracer)
+    assert [t.action for t in tracer.traces] == [
+        PM._, PM.function_application
+    ]
+    assert tracer.traces[1].pattern is F_
+    assert tracer.traces[1].elapsed >= tracer.traces[0].elapsed
+    summary = tracer.summary()
+    assert summary[PM._.__qualname__][0] == 1
+    assert summary[PM.function_application.__qualname__][0] == 1
+
+
+def test_pattern_matching_logging_switch(caplog, monkeypatch):
+    class PM(PatternMatcher):
+        @add_match(C_[int](...))
+        def _(self, expression):
+            return expression
+
+    pm = PM()
+    caplog.set_level(
+        expression_pattern_matching.FINEDEBUG,
+        logger=expression_pattern_matching.__name__
+    )
+    pm.match(C_[int](1))
+    assert len(caplog.records) > 0
+
+    caplog.clear()
+    monkeypatch.setattr(
+        expression_pattern_matching, 'PATTERN_MATCHING_LOGGING', False
+    )
+    pm.match(C_[int](1))
+    assert len(caplog.records) == 0
@@ -221,3 +221,91 @@ def test_replace_expression_with_tuple():
     assert isinstance(result[1], Tuple)
     assert result[1][0] == s3
     assert result[1][1] is s2 and result[1][1].is_fresh
+
+
+def test_memoized_walker():
+    class Walker(expression_walker.ExpressionWalker):
+        memoize = True
+        memoize_maxsize = 2
+
+        def __init__(self):
+            self.symbols_walked = 0
+
+        @expression_walker.add_match(S_, lambda s: s.name.islower())
+        def symbol(self, expression):
+            self.symbols_walked += 1
+            return S_(expression.name.upper())
+
+        @expression_walker.add_match(S_)
+        def upper_symbol(self, expression):
+            return expression
+
+    w = Walker()
+    f = S_('f')
+    exp = F_(f, (S_('a'), S_('a'), S_('b')))
+    res = w.walk(exp)
+    assert res == F_(S_('F'), (S_('A'), S_('A'), S_('B')))
+    assert w.symbols_walked == 3
+    info = w.walk_cache_info()
+    assert info.hits > 0
+    assert info.maxsize == 2
+    assert info.currsize == 2
+
+    c = C_[int](1)
+    hits = w.walk_cache_info().hits
+    assert w.walk(c) is c
+    assert w.walk(C_[int](1)) is not c
+    assert w.walk_cache_info().hits == hits + 1
+
+    w.walk_cache_clear()
+    assert w.walk_cache_info() == expression_walker.WalkCacheInfo(0, 0, 2, 0)
+
+
+def test_memoized_walker_distinguishes_types():
+    w = expression_walker.ReplaceSymbolWalker({'a': C_[int](1)})
+    assert w.memoize
+    exp = F_(S_('f'), (S_('a'), S_('b'), S_[int]('b')))
+    res = w.walk(exp)
+    assert res.args[0] == C_[int](1)
+    assert res.args[1].type is S_('b').type
+    assert res.args[2].type is int
+
+
+def test_fixpoint_rewrite_walker():
+    add = C_(lambda x, y: x + y)
+
+    class Walker(expression_walker.FixpointRewriteWalker):
+        @expression_walker.add_match(F_(add, (C_[int], C_[int])))
+        def fold(self, expression):
+            return C_[int](expression.args[0].value + expression.args[1].value)
+
+        @expression_walker.add_match(F_(add, (C_[int](0), ...)))
+        def zero_left(self, expression):
+            return expression.args[1]
+
+    w = Walker()
+    x = S_('x')
+    untouched = F_(add, (x, x))
+    exp = F_(add, (F_(add, (C_[int](1), C_[int](-1))), untouched))
+    res = w.walk(exp)
+    assert res is untouched
+    assert w.rewrite_counts == {
+        Walker.fold.__qualname__: 1,
+        Walker.zero_left.__qualname__: 1,
+    }
+
+    exp = F_(add, (F_(add, (C_[int](1), C_[int](2))), C_[int](3)))
+    assert w.walk(exp) == C_[int](6)
+    assert w.rewrite_counts[Walker.fold.__qualname__] == 2
+
+
+def test_fixpoint_rewrite_walker_max_rewrites():
+    class Walker(expression_walker.FixpointRewriteWalker):
+        max_rewrites = 10
+
+        @expression_walker.add_match(S_)
+        def rename(self, expression):
+            return S_(expression.name + '_')
+
+    with raises(expressions.NeuroLangException):
+        Walker().walk(S_('a'))
@@ -316,3 +316,34 @@ def test_fresh_symbol_subclass():
 
     assert isinstance(TestSymbol.fresh(), TestSymbol)
     assert isinstance(TestSymbol[int].fresh(), TestSymbol[int])
+
+
+def test_intern_expressions():
+    S_ = expressions.Symbol
+    C_ = expressions.Constant
+    F_ = expressions.FunctionApplication
+
+    with expressions.intern_expressions():
+        a = C_[int](1)
+        b = C_[int](1)
+        c = C_(1)
+        d = C_(1.)
+        e = C_(True)
+        f = F_(S_('f'), (a, S_('x')))
+        g = F_(S_('f'), (b, S_('x')))
+        h = C_[AbstractSet[int]](frozenset((C_(1), C_(2))))
+        i = C_[AbstractSet[int]](frozenset((C_(2), C_(1))))
+        p = F_(S_('f'), ...)
+        q = F_(S_('f'), ...)
+        unhashable = C_([1, 2])
+
+    assert a is b
+    assert c == a
+    assert d is not c and d.type is float
+    assert e is not c and e.type is bool
+    assert f is g
+    assert hash(f) == hash(F_(S_('f'), (C_[int](1), S_('x'))))
+    assert h is i
+    assert p is not q
+    assert unhashable.value == [C_(1), C_(2)]
+    assert C_[int](1) is not a
@@ -0,0 +1,85 @@
+import nibabel as nib
+import numpy as np
+
+from ..frontend import NeurolangDL
+from ..region_cache import RegionCache, get_region_cache, set_region_cache
+from ..regions import ExplicitVBR
+
+
+def _atlas_image():
+    data = np.zeros((10, 10, 10), dtype=np.int16)
+    data[1:4, 1:4, 1:4] = 1
+    data[6:9, 2:5, 5:7] = 2
+    data[0, 9, 9] = 5
+    affine = np.diag((2, 2, 2, 1))
+    return nib.Nifti1Image(data, affine)
+
+
+def test_region_cache_stores_atlas(tmp_path):
+    image = _atlas_image()
+    data = np.asanyarray(image.dataobj)
+    cache = RegionCache(str(tmp_path))
+    atlas = cache.atlas(image)
+    assert set(atlas.labels) == {1, 2, 5}
+    assert atlas.region(3) is None
+
+    other_atlas = RegionCache(str(tmp_path)).atlas(image)
+    assert len(list(tmp_path.iterdir())) == 1
+    for label in (1, 2, 5):
+        expected = ExplicitVBR(
+            np.transpose((data == label).nonzero()), image.affine,
+            image_dim=image.shape
+        )
+        region = other_atlas.region(label)
+        assert isinstance(region.voxels, np.memmap)
+        assert region == expected
+        assert region.bounding_box == expected.bounding_box
+        tree = region.aabb_tree
+        expected_tree = expected.build_tree()
+        assert tree.height == expected_tree.height
+        for name in ('lb', 'ub', 'left', 'right'):
+            assert np.array_equal(
+                getattr(tree, name), getattr(expected_tree, name)
+            )
+
+    other_image = nib.Nifti1Image(data, np.eye(4))
+    cache.atlas(other_image)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_frontend_uses_region_cache(tmp_path):
+    image = _atlas_image()
+    set_region_cache(RegionCache(str(tmp_path)))
+    try:
+        assert get_region_cache() is not None
+        nl = NeurolangDL()
+        atlas = nl.add_atlas_set('atlas', {1: 'a', 2: 'b', 3: 'c'}, image)
+        assert len(list(tmp_path.iterdir())) == 1
+        regions = dict(atlas.value)
+        assert set(regions) == {'a', 'b'}
+        assert regions['b'] == nl.create_region(image, label=2)
+    finally:
+        set_region_cache(None)
+
+
+def test_region_cache_stores_only_requested_label(tmp_path):
+    data = np.random.RandomState(0).uniform(size=(10, 10, 10))
+    data[2:4, 2:4, 2:4] = 1.
+    image = nib.Nifti1Image(data, np.eye(4))
+    set_region_cache(RegionCache(str(tmp_path)))
+    try:
+        region = NeurolangDL.create_region(image, label=1.)
+        entries = list(tmp_path.iterdir())
+        assert len(entries) == 1
+        labels = np.load(str(entries[0] / 'labels.npy'))
+        assert list(labels) == [1.]
+        assert region == ExplicitVBR(
+            np.transpose((data == 1.).nonzero()), image.affine,
+            image_dim=image.shape
+        )
+        other_region = RegionCache(str(tmp_path)).region(image, 1.)
+        assert isinstance(other_region.voxels, np.memmap)
+        assert other_region == region
+        assert len(list(tmp_path.iterdir())) == 1
+    finally:
+        set_region_cache(None)
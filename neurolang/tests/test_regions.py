@@ -5,7 +5,8 @@ from numpy import random
 import nibabel as nib
 
 from ..aabb_tree import AABB
-from ..CD_relations import (cardinal_relation,
+from ..CD_relations import (_direction_tensors, cardinal_relation,
+                            cardinal_relation_matrix, cardinal_relation_pairs,
                             cardinal_relation_prepare_regions,
                             direction_matrix, is_in_direction)
 from ..exceptions import NeuroLangException
@@ -287,6 +288,73 @@ def test_explicit_region_overlay():
     assert np.array_equal(region1.voxels, region1.to_ijk(affine))
 
 
+def test_direction_tensors_match_direction_matrix():
+    np.random.seed(0)
+    lb = np.random.randint(0, 5, size=(200, 3)).astype(float)
+    ub = lb + np.random.randint(1, 4, size=(200, 3))
+    other_lb = np.random.randint(0, 5, size=(200, 3)).astype(float)
+    other_ub = other_lb + np.random.randint(1, 4, size=(200, 3))
+    tensors = _direction_tensors(lb, ub, other_lb, other_ub)
+    for i in range(len(lb)):
+        assert np.array_equal(
+            tensors[i],
+            direction_matrix(
+                AABB(lb[i], ub[i]), AABB(other_lb[i], other_ub[i])
+            )
+        )
+
+
+def test_cardinal_relation_matrix():
+    np.random.seed(0)
+    lb = np.random.randint(0, 5, size=(20, 3)).astype(float)
+    ub = lb + np.random.randint(1, 4, size=(20, 3))
+    other_lb = np.random.randint(0, 5, size=(10, 3)).astype(float)
+    other_ub = other_lb + np.random.randint(1, 4, size=(10, 3))
+    for directions in ('L', 'R', 'A', 'P', 'I', 'S', 'O', 'LA', 'IO'):
+        matrix = cardinal_relation_matrix(
+            lb, ub, other_lb, other_ub, directions
+        )
+        assert matrix.shape == (len(lb), len(other_lb))
+        for i, j in np.ndindex(matrix.shape):
+            assert matrix[i, j] == is_in_direction(
+                direction_matrix(
+                    AABB(lb[i], ub[i]), AABB(other_lb[j], other_ub[j])
+                ),
+                directions
+            )
+
+
+def test_cardinal_relation_pairs():
+    np.random.seed(0)
+    regions = [
+        ExplicitVBR(
+            np.unique(np.random.randint(0, 8, size=(10, 3)), axis=0),
+            np.eye(4)
+        )
+        for _ in range(6)
+    ]
+    pairs = [(r, s) for r in regions for s in regions]
+    xs = [r for r, _ in pairs]
+    ys = [s for _, s in pairs]
+    for refine_overlapping in (False, True):
+        for directions in ('L', 'A', 'S', 'O', 'LA'):
+            result = cardinal_relation_pairs(
+                xs, ys, directions, refine_overlapping=refine_overlapping
+            )
+            expected = [
+                cardinal_relation(
+                    r, s, directions, refine_overlapping=refine_overlapping
+                )
+                for r, s in pairs
+            ]
+            assert result.tolist() == expected
+            result = cardinal_relation_pairs(
+                xs[:len(regions)], ys[:len(regions)], directions,
+                refine_overlapping=refine_overlapping
+            )
+            assert result.tolist() == expected[:len(regions)]
+
+
 def test_build_tree_one_voxel_regions():
 
     region = ExplicitVBR(np.array([[2, 2, 2]]), np.eye(4))
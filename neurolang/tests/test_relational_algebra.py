@@ -6,8 +6,9 @@ import pytest
 from ..datalog.basic_representation import WrappedRelationalAlgebraSet
 from ..exceptions import NeuroLangException
 from ..expressions import Constant, Symbol
-from ..expression_walker import ExpressionWalker
+from ..expression_walker import ExpressionWalker, FixpointRewriteWalker
 from ..relational_algebra import (
+    AntiJoin,
     ColumnInt,
     ColumnStr,
     ConcatenateConstantColumn,
@@ -17,19 +18,25 @@ from ..relational_algebra import (
     ExtendedProjectionListMember,
     Intersection,
     NameColumns,
+    MultiwayJoin,
     NaturalJoin,
     Product,
     Projection,
     RelationalAlgebraOptimiser,
+    RelationalAlgebraMultiwayJoins,
     RelationalAlgebraSolver,
     EliminateTrivialProjections,
     RelationalAlgebraPushInSelections,
+    RelationalAlgebraReorderJoins,
+    RelationalAlgebraSemiJoinProjections,
     RenameColumn,
     RenameColumns,
     Selection,
+    SemiJoin,
     str2columnstr_constant,
     Union,
     eq_,
+    hypergraph_is_cyclic,
     _const_relation_type_is_known,
     _sort_typed_const_named_relation_tuple_type_args,
     _infer_relation_type,
@@ -110,6 +117,29 @@ def test_naturaljoin():
     assert sol == r1_named.naturaljoin(r2_named)
 
 
+def test_semijoin_antijoin():
+    r1_named = NamedRelationalAlgebraFrozenSet(('x', 'y'), R1)
+    r2_named = NamedRelationalAlgebraFrozenSet(('x', 'z'), R2)
+    c1 = C_[AbstractSet[Tuple[int, int]]](r1_named)
+    c2 = C_[AbstractSet[Tuple[int, int]]](r2_named)
+
+    sol = RelationalAlgebraSolver().walk(SemiJoin(c1, c2)).value
+    assert sol == r1_named.naturaljoin(r2_named).projection('x', 'y')
+
+    sol = RelationalAlgebraSolver().walk(AntiJoin(c1, c2)).value
+    assert sol == r1_named - r1_named.naturaljoin(r2_named).projection(
+        'x', 'y'
+    )
+
+    class Opt(RelationalAlgebraPushInSelections, ExpressionWalker):
+        pass
+
+    formula = eq_(str2columnstr_constant('y'), C_(2))
+    exp = Selection(AntiJoin(c1, c2), formula)
+    res = Opt().walk(exp)
+    assert res == AntiJoin(Selection(c1, formula), c2)
+
+
 def test_union_unnamed():
     r1 = C_[AbstractSet](WrappedRelationalAlgebraSet([(1, 2), (7, 8)]))
     r2 = C_[AbstractSet](WrappedRelationalAlgebraSet([(5, 0), (7, 8)]))
@@ -571,6 +601,71 @@ def test_extended_projection_lambda_function():
     assert result == expected
 
 
+def test_python_functions_on_columns():
+    relation = Constant[AbstractSet](
+        NamedRelationalAlgebraFrozenSet(
+            columns=("x", "y"), iterable=[(50, 100), (20, 80), (5, 1)]
+        )
+    )
+    x = Constant(ColumnStr("x"))
+    y = Constant(ColumnStr("y"))
+    z = Constant(ColumnStr("z"))
+    c = Constant(ColumnStr("c"))
+    fun = Constant(lambda u, v: f"{u}-{v}")
+    counter = iter(range(10))
+    count = Constant(lambda: next(counter))
+
+    selection = Selection(
+        relation, C_(operator.gt)(C_(len)(fun(x, y)), C_(3))
+    )
+    extended_proj_op = ExtendedProjection(
+        selection,
+        (
+            ExtendedProjectionListMember(fun(x, y * C_(2)), z),
+            ExtendedProjectionListMember(count(), c),
+        )
+    )
+    expected = Constant[AbstractSet](
+        NamedRelationalAlgebraFrozenSet(
+            columns=("z", "c"),
+            iterable=[("50-200", 0), ("20-160", 1)]
+        )
+    )
+    solver = RelationalAlgebraSolver()
+    result = solver.walk(extended_proj_op)
+    assert result == expected
+
+
+def test_columnwise_functions_on_columns():
+    relation = Constant[AbstractSet](
+        NamedRelationalAlgebraFrozenSet(
+            columns=("x", "y"), iterable=[(50, 100), (20, 10), (5, 1)]
+        )
+    )
+    x = Constant(ColumnStr("x"))
+    calls = []
+
+    def larger(u, v):
+        return u > v
+
+    def larger_columnwise(us, vs):
+        calls.append(len(us))
+        return [u > v for u, v in zip(us, vs)]
+
+    larger.columnwise = larger_columnwise
+
+    selection = Selection(relation, C_(larger)(x, C_(10)))
+    expected = Constant[AbstractSet](
+        NamedRelationalAlgebraFrozenSet(
+            columns=("x", "y"), iterable=[(50, 100), (20, 10)]
+        )
+    )
+    solver = RelationalAlgebraSolver()
+    result = solver.walk(selection)
+    assert result == expected
+    assert calls == [3]
+
+
 def test_extended_projection_numeric_named_columns():
     relation = Constant[AbstractSet](
         NamedRelationalAlgebraFrozenSet(
@@ -841,6 +936,31 @@ def test_push_in_optimiser():
     assert res == exp_res
 
 
+def test_push_in_optimiser_fixpoint():
+    class Opt(RelationalAlgebraPushInSelections, FixpointRewriteWalker):
+        pass
+
+    opt = Opt()
+
+    r1 = Symbol('r1')
+    r2 = Symbol('r2')
+    r3 = Symbol('r3')
+    a = Constant[ColumnStr](ColumnStr('a'))
+    b = Constant[ColumnStr](ColumnStr('b'))
+    op = Symbol('op')
+    formula = op(a)
+
+    exp = Selection(
+        NaturalJoin(NaturalJoin(RenameColumn(r1, b, a), r2), r3), formula
+    )
+    res = opt.walk(exp)
+    exp_res = NaturalJoin(
+        NaturalJoin(Selection(RenameColumn(r1, b, a), formula), r2), r3
+    )
+    assert res == exp_res
+    assert sum(opt.rewrite_counts.values()) == 2
+
+
 def test_eliminate_trivial_projections_optimiser():
     class Opt(EliminateTrivialProjections, ExpressionWalker):
         pass
@@ -868,3 +988,101 @@ def test_eliminate_trivial_projections_optimiser():
     exp1 = Projection(r, (a, b))
     res1 = opt.walk(exp1)
     assert res1 is r
+
+
+def test_reorder_joins_by_cardinality():
+    x, y, z, w = (str2columnstr_constant(c) for c in 'xyzw')
+    a = Symbol('a')
+    b = Symbol('b')
+    c = Symbol('c')
+    symbol_table = {
+        a: C_[AbstractSet](NamedRelationalAlgebraFrozenSet(
+            ('x', 'y'), [(i, i + 1) for i in range(100)]
+        )),
+        b: C_[AbstractSet](NamedRelationalAlgebraFrozenSet(
+            ('y', 'z'), [(i, i) for i in range(50)]
+        )),
+        c: C_[AbstractSet](NamedRelationalAlgebraFrozenSet(
+            ('z', 'w'), [(1, 2)]
+        )),
+    }
+
+    exp = NaturalJoin(NaturalJoin(a, b), c)
+    res = RelationalAlgebraReorderJoins(symbol_table).walk(exp)
+    assert res == Projection(NaturalJoin(NaturalJoin(c, b), a), (x, y, z, w))
+    assert RelationalAlgebraReorderJoins(symbol_table).walk(res) is res
+
+    solver = RelationalAlgebraSolver(symbol_table)
+    assert solver.walk(res) == solver.walk(exp)
+
+    exp = NaturalJoin(NaturalJoin(c, a), b)
+    res = RelationalAlgebraReorderJoins(symbol_table).walk(exp)
+    assert res == Projection(NaturalJoin(NaturalJoin(c, b), a), (z, w, x, y))
+
+    exp = NaturalJoin(NaturalJoin(a, b), Symbol('d'))
+    res = RelationalAlgebraReorderJoins(symbol_table).walk(exp)
+    assert res is exp
+
+
+def test_semijoin_projections():
+    x, y = (str2columnstr_constant(c) for c in 'xy')
+    a = Symbol('a')
+    b = Symbol('b')
+    c = Symbol('c')
+    symbol_table = {
+        a: C_[AbstractSet](NamedRelationalAlgebraFrozenSet(
+            ('x', 'y'), [(i, i + 1) for i in range(10)]
+        )),
+        b: C_[AbstractSet](NamedRelationalAlgebraFrozenSet(
+            ('y', 'z'), [(i, i) for i in range(5)]
+        )),
+        c: C_[AbstractSet](NamedRelationalAlgebraFrozenSet(
+            ('z', 'w'), [(3, 2)]
+        )),
+    }
+    walker = RelationalAlgebraSemiJoinProjections(symbol_table)
+    solver = RelationalAlgebraSolver(symbol_table)
+
+    exp = Projection(NaturalJoin(NaturalJoin(a, b), c), tuple())
+    res = walker.walk(exp)
+    assert res == Projection(SemiJoin(SemiJoin(b, a), c), tuple())
+    assert solver.walk(res).value.is_dee()
+
+    exp = Projection(NaturalJoin(NaturalJoin(a, b), c), (x,))
+    res = walker.walk(exp)
+    assert res == Projection(SemiJoin(NaturalJoin(a, b), c), (x,))
+    assert solver.walk(res) == solver.walk(exp)
+
+    exp = Projection(Projection(NaturalJoin(a, b), (x, y)), (y,))
+    res = walker.walk(exp)
+    assert res == Projection(SemiJoin(a, b), (y,))
+    assert solver.walk(res) == solver.walk(exp)
+
+    exp = Projection(NaturalJoin(a, Symbol('d')), tuple())
+    assert walker.walk(exp) == exp
+
+
+def test_multiway_join():
+    x, y, z = (str2columnstr_constant(c) for c in 'xyz')
+    edges = [(i, (i + 1) % 6) for i in range(6)] + [(0, 2), (2, 4), (4, 0)]
+    r_xy = NamedRelationalAlgebraFrozenSet(('x', 'y'), edges)
+    r_yz = NamedRelationalAlgebraFrozenSet(('y', 'z'), edges)
+    r_zx = NamedRelationalAlgebraFrozenSet(('z', 'x'), edges)
+
+    res = r_xy.naturaljoin(r_yz).naturaljoin(r_zx)
+    c_xy, c_yz, c_zx = (C_[AbstractSet](r) for r in (r_xy, r_yz, r_zx))
+    exp = MultiwayJoin((c_xy, c_yz, c_zx))
+    assert RelationalAlgebraSolver().walk(exp).value == res
+
+    assert hypergraph_is_cyclic([{x, y}, {y, z}, {z, x}])
+    assert not hypergraph_is_cyclic([{x, y}, {y, z}, {x, y, z}])
+    assert not hypergraph_is_cyclic([{x, y}, {y, z}])
+
+    triangle = NaturalJoin(NaturalJoin(c_xy, c_yz), c_zx)
+    res = RelationalAlgebraMultiwayJoins().walk(triangle)
+    assert res == MultiwayJoin((c_xy, c_yz, c_zx))
+
+    r_zw = NamedRelationalAlgebraFrozenSet(('z', 'w'), edges)
+    path = NaturalJoin(NaturalJoin(c_xy, c_yz), C_[AbstractSet](r_zw))
+    res = RelationalAlgebraMultiwayJoins().walk(path)
+    assert not isinstance(res, MultiwayJoin)
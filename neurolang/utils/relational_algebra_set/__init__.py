@@ -1,13 +1,34 @@
-from .pandas import (NamedRelationalAlgebraFrozenSet,
-                     RelationalAlgebraFrozenSet, RelationalAlgebraSet,
+import os
+
+from .pandas import (RelationalAlgebraColumnFunction,
                      RelationalAlgebraColumnInt, RelationalAlgebraColumnStr,
-                     RelationalAlgebraStringExpression)
+                     RelationalAlgebraStringExpression, deferred_evaluation,
+                     exact_integer_ufunc, log_sum_exp, noisy_or,
+                     register_aggregate_kernel)
+
+# The sets are backed by pandas DataFrames unless the environment variable
+# ``NEUROLANG_RA_BACKEND`` is set to ``arrow`` when this module is first
+# imported, in which case they are backed by Apache Arrow tables.
+RA_BACKEND_VARIABLE = 'NEUROLANG_RA_BACKEND'
+
+if os.environ.get(RA_BACKEND_VARIABLE, 'pandas') == 'arrow':
+    from .arrow import (NamedRelationalAlgebraFrozenSet,
+                        RelationalAlgebraFrozenSet, RelationalAlgebraSet)
+else:
+    from .pandas import (NamedRelationalAlgebraFrozenSet,
+                         RelationalAlgebraFrozenSet, RelationalAlgebraSet)
 
 __all__ = [
+    "RelationalAlgebraColumnFunction",
     "RelationalAlgebraColumnInt",
     "RelationalAlgebraColumnStr",
     "RelationalAlgebraStringExpression",
     "RelationalAlgebraFrozenSet",
     "RelationalAlgebraSet",
-    "NamedRelationalAlgebraFrozenSet"
+    "NamedRelationalAlgebraFrozenSet",
+    "deferred_evaluation",
+    "exact_integer_ufunc",
+    "log_sum_exp",
+    "noisy_or",
+    "register_aggregate_kernel"
 ]
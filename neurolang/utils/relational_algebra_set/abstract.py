@@ -34,6 +34,13 @@ class RelationalAlgebraFrozenSet(Set):
             not self.is_empty()
         )
 
+    def is_deferred(self):
+        """
+        Whether the contents of the set are yet to be computed,
+        in which case querying them triggers the computation.
+        """
+        return False
+
     @abstractmethod
     def __contains__(self, element):
         pass
@@ -148,6 +155,38 @@ class NamedRelationalAlgebraFrozenSet(RelationalAlgebraFrozenSet):
     def naturaljoin(self, other):
         pass
 
+    def multiwayjoin(self, *others):
+        """
+        Natural join of this set with all the others. Backends can
+        override it with a worst-case optimal algorithm.
+        """
+        res = self
+        for other in others:
+            res = res.naturaljoin(other)
+        return res
+
+    def semijoin(self, other):
+        """
+        Tuples of this set agreeing with some tuple of the other set on
+        their common columns.
+        """
+        on = tuple(c for c in self.columns if c in other.columns)
+        if len(on) == 0:
+            if other.is_empty():
+                return self - self
+            return self
+        return (
+            self.naturaljoin(other.projection(*on))
+            .projection(*self.columns)
+        )
+
+    def antijoin(self, other):
+        """
+        Tuples of this set not agreeing with any tuple of the other set
+        on their common columns.
+        """
+        return self - self.semijoin(other)
+
     @abstractmethod
     def cross_product(self, other):
         pass
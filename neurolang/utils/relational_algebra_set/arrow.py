@@ -0,0 +1,1701 @@
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import abstract as abc
+from . import pandas as pandas_backend
+from .pandas import (
+    AGGREGATE_KERNELS,
+    RelationalAlgebraColumn,
+    RelationalAlgebraColumnFunction,
+    RelationalAlgebraColumnInt,
+    RelationalAlgebraColumnStr,
+    RelationalAlgebraStringExpression,
+    ValueDictionary,
+    _ARRAY_TYPES,
+    _HASH_INDEX_MIN_LOOKUPS,
+    _STRING_EXPRESSION_COMPILER,
+    _broadcast_value,
+    deferred_evaluation,
+    log_sum_exp,
+    noisy_or,
+    register_aggregate_kernel
+)
+
+__all__ = [
+    "RelationalAlgebraColumnFunction",
+    "RelationalAlgebraColumnInt",
+    "RelationalAlgebraColumnStr",
+    "RelationalAlgebraStringExpression",
+    "RelationalAlgebraFrozenSet",
+    "RelationalAlgebraSet",
+    "NamedRelationalAlgebraFrozenSet",
+    "deferred_evaluation",
+    "log_sum_exp",
+    "noisy_or",
+    "register_aggregate_kernel"
+]
+
+
+# Errors raised comparing values of unrelated types with colliding hashes
+_COMPARISON_ERRORS = (TypeError, ValueError)
+
+
+class ObjectDictionary(ValueDictionary):
+    """
+    Process-wide dictionary assigning an integer code to every hashable
+    value stored in a column of the Arrow sets without a native Arrow
+    type. Values which are not strings are keyed by type as well,
+    recursively within tuples and frozensets, such that equal values of
+    different types, as ``1`` and ``True`` or ``(1, 2)`` and a tuple of
+    objects equal to ``1`` and ``2``, are decoded to the value that was
+    encoded.
+
+    Codes of equal values are comparable through the code of their
+    equality class, that of the first equal value encoded, which
+    ``lookup`` returns and ``classes`` maps codes to. As long as
+    ``has_variants`` is false, every code is that of its class.
+
+    The dictionary is unbounded, as these columns can only be stored
+    through their codes.
+    """
+    def __init__(self, capacity=1024):
+        super().__init__(capacity, max_size=None)
+        self._class_codes = dict()
+        self._classes = np.empty(capacity, dtype=np.int64)
+        self.has_variants = False
+
+    @staticmethod
+    def _key(value):
+        value_type = type(value)
+        if value_type in ValueDictionary.encodable_types:
+            return value
+        if isinstance(value, tuple):
+            value = tuple(ObjectDictionary._key(v) for v in value)
+        elif isinstance(value, frozenset):
+            value = frozenset(ObjectDictionary._key(v) for v in value)
+        return (value_type, value)
+
+    @staticmethod
+    def _python_value(value):
+        if isinstance(value, np.generic):
+            value = value.item()
+        return value
+
+    def encode(self, values):
+        """
+        Codes for the values in the array. Raises ``TypeError`` if
+        one of them is unhashable.
+        """
+        codes = super().encode(values)
+        if codes is None:
+            codes = np.empty(len(values), dtype=np.int64)
+            for i, value in enumerate(values):
+                codes[i] = self.code(value)
+        return codes
+
+    def _add(self, value):
+        size = self._size
+        code = super()._add(value)
+        if self._size > size:
+            if code == len(self._classes):
+                classes = np.empty(len(self._values), dtype=np.int64)
+                classes[:code] = self._classes[:code]
+                self._classes = classes
+            try:
+                class_code = self._class_codes.setdefault(value, code)
+            except _COMPARISON_ERRORS:
+                class_code = code
+            self._classes[code] = class_code
+            if class_code != code:
+                self.has_variants = True
+        return code
+
+    def code(self, value):
+        value = self._python_value(value)
+        code = self._codes.get(self._key(value))
+        if code is None:
+            with self._lock:
+                code = self._add(value)
+        return code
+
+    def lookup(self, value):
+        """
+        Code of the equality class of the value or ``None`` if no
+        equal value was ever encoded. Raises ``TypeError`` if the
+        value is unhashable.
+        """
+        value = self._python_value(value)
+        try:
+            code = self._class_codes.get(value)
+        except _COMPARISON_ERRORS:
+            code = None
+        if code is None:
+            code = self._codes.get(self._key(value))
+            if code is not None:
+                code = self._classes[code]
+        return code
+
+    def classes(self, codes):
+        """Codes of the equality classes of the values with the codes."""
+        if not self.has_variants:
+            return codes
+        return self._classes.take(codes)
+
+
+OBJECT_DICTIONARY = ObjectDictionary()
+
+_BOOL_TYPES = (bool, np.bool_)
+_INTEGER_TYPES = (int, np.integer)
+_NUMBER_TYPES = (int, float, np.integer, np.floating)
+_ARROW_ERRORS = (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError)
+
+
+def _object_array(values):
+    array = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        array[i] = value
+    return array
+
+
+def _arrow_column(values):
+    """
+    Arrow array holding the values and whether it holds the codes
+    of the values in the ``OBJECT_DICTIONARY`` instead. Columns of
+    booleans, integers, floats and dates are stored natively.
+    """
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return values, False
+    if isinstance(values, (pd.Series, pd.api.extensions.ExtensionArray)):
+        values = values.to_numpy()
+    elif not isinstance(values, np.ndarray):
+        values = _object_array(values)
+    if values.dtype.kind in 'biufmM':
+        return pa.array(values), False
+    if len(values) == 0:
+        return pa.nulls(0), False
+    values = values.astype(object, copy=False)
+    types = set(map(type, values))
+    if all(issubclass(t, _BOOL_TYPES) for t in types):
+        return pa.array(values.astype(bool)), False
+    if all(
+        issubclass(t, _NUMBER_TYPES) and not issubclass(t, _BOOL_TYPES)
+        for t in types
+    ):
+        if not all(issubclass(t, _INTEGER_TYPES) for t in types):
+            return pa.array(values.astype(np.float64)), False
+        try:
+            return pa.array(values.astype(np.int64)), False
+        except OverflowError:
+            pass
+    return pa.array(OBJECT_DICTIONARY.encode(values)), True
+
+
+def _positional_names(arity, prefix=''):
+    return [f'{prefix}{i}' for i in range(arity)]
+
+
+def _nullary_table(length):
+    return pa.table({'_': pa.nulls(length)}).select([])
+
+
+def _make_table(arrays, length=0):
+    """Table of the arrays, named by their positions."""
+    if len(arrays) == 0:
+        return _nullary_table(length)
+    return pa.Table.from_arrays(
+        list(arrays), names=_positional_names(len(arrays))
+    )
+
+
+def _table_from_arrays(arrays, length=0):
+    columns = []
+    encoded = set()
+    for i, values in enumerate(arrays):
+        column, is_encoded = _arrow_column(values)
+        columns.append(column)
+        if is_encoded:
+            encoded.add(i)
+    return _make_table(columns, length), frozenset(encoded)
+
+
+def _table_from_dataframe(container):
+    return _table_from_arrays(
+        [container.iloc[:, i] for i in range(container.shape[1])],
+        len(container)
+    )
+
+
+def _table_from_rows(rows, arity=None):
+    rows = [_normalise_row(row) for row in rows]
+    if arity is None:
+        arity = len(rows[0]) if len(rows) > 0 else 0
+    if len(rows) == 0:
+        return _make_table([pa.nulls(0)] * arity), frozenset()
+    return _table_from_arrays(
+        [_object_array(column) for column in zip(*rows)], len(rows)
+    )
+
+
+def _normalise_row(row):
+    if isinstance(row, tuple):
+        return row
+    if isinstance(row, (list, np.ndarray)):
+        return tuple(row)
+    return (row,)
+
+
+def _table_from_iterable(iterable, arity=None):
+    if isinstance(iterable, pd.DataFrame):
+        return _table_from_dataframe(iterable)
+    if isinstance(iterable, np.ndarray) and iterable.ndim == 2:
+        return _table_from_arrays(
+            [iterable[:, i] for i in range(iterable.shape[1])],
+            len(iterable)
+        )
+    if arity is None and isinstance(iterable, abc.RelationalAlgebraFrozenSet):
+        arity = iterable.arity
+    return _table_from_rows(iterable, arity)
+
+
+def _comparable_column(column):
+    """
+    Encoded column with its codes replaced by those of their equality
+    classes, such that equal values of different types compare equal.
+    """
+    if not OBJECT_DICTIONARY.has_variants:
+        return column
+    return pa.array(
+        OBJECT_DICTIONARY.classes(
+            column.to_numpy(zero_copy_only=False).astype(np.int64)
+        ),
+        pa.int64()
+    )
+
+
+def _comparable_table(table, encoded):
+    if not OBJECT_DICTIONARY.has_variants:
+        return table
+    for position in encoded:
+        table = table.set_column(
+            position, table.field(position).name,
+            _comparable_column(table.column(position))
+        )
+    return table
+
+
+def _unique_rows(table, encoded=frozenset()):
+    """
+    Rows of the table without duplicates, comparing the codes of the
+    ``encoded`` positions by their equality classes and keeping the
+    first of the rows holding equal values.
+    """
+    if table.num_rows <= 1:
+        return table
+    if table.num_columns == 0:
+        return table.slice(0, 1)
+    keys = _comparable_table(table, encoded)
+    if keys is table:
+        return (
+            table
+            .group_by(table.column_names, use_threads=False)
+            .aggregate([])
+            .select(table.column_names)
+        )
+    rows = (
+        keys
+        .append_column('row', pa.array(np.arange(table.num_rows)))
+        .group_by(table.column_names, use_threads=False)
+        .aggregate([('row', 'min')])
+        .column('row_min')
+        .to_numpy()
+    )
+    return table.take(np.sort(rows))
+
+
+def _encode_column(table, position):
+    column = table.column(position)
+    codes = OBJECT_DICTIONARY.encode(_object_array(column.to_pylist()))
+    return table.set_column(
+        position, table.field(position).name, pa.array(codes, pa.int64())
+    )
+
+
+def _cast_column(table, position, type_):
+    return table.set_column(
+        position, table.field(position).name,
+        table.column(position).cast(type_)
+    )
+
+
+def _common_type(left, right):
+    if pa.types.is_null(left):
+        return right
+    if pa.types.is_null(right):
+        return left
+    numeric = (pa.types.is_integer, pa.types.is_floating)
+    if not all(any(f(t) for f in numeric) for t in (left, right)):
+        return None
+    if pa.types.is_floating(left) or pa.types.is_floating(right):
+        return pa.float64()
+    return pa.int64()
+
+
+def _align_tables(left, left_encoded, right, right_encoded, pairs):
+    """
+    Make each pair of (left, right) columns comparable, encoding the
+    native column of a pair whose other column is encoded, and casting
+    pairs of native columns of different types to a common type, or
+    encoding both if there is none.
+    """
+    left_encoded = set(left_encoded)
+    right_encoded = set(right_encoded)
+    pending = True
+    while pending:
+        pending = False
+        for i, j in pairs:
+            left_is_encoded = i in left_encoded
+            right_is_encoded = j in right_encoded
+            if left_is_encoded and right_is_encoded:
+                continue
+            elif left_is_encoded != right_is_encoded:
+                pending = True
+                if left_is_encoded:
+                    right = _encode_column(right, j)
+                    right_encoded.add(j)
+                else:
+                    left = _encode_column(left, i)
+                    left_encoded.add(i)
+                continue
+            left_type = left.column(i).type
+            right_type = right.column(j).type
+            if left_type == right_type:
+                continue
+            pending = True
+            type_ = _common_type(left_type, right_type)
+            if type_ is None:
+                left = _encode_column(left, i)
+                left_encoded.add(i)
+                right = _encode_column(right, j)
+                right_encoded.add(j)
+            else:
+                left = _cast_column(left, i, type_)
+                right = _cast_column(right, j, type_)
+    return left, frozenset(left_encoded), right, frozenset(right_encoded)
+
+
+def _join(
+    left, right, left_on, right_on, join_type, right_columns=(),
+    left_encoded=frozenset(), right_encoded=frozenset()
+):
+    """
+    Hash join of the tables on the positions ``left_on`` and ``right_on``,
+    with the columns of ``left`` followed by the ``right_columns``
+    positions of ``right``. Pairs of encoded positions are joined on the
+    equality classes of their codes.
+    """
+    left = left.rename_columns(_positional_names(left.num_columns, 'l'))
+    right = right.rename_columns(_positional_names(right.num_columns, 'r'))
+    columns = left.column_names + [f'r{j}' for j in right_columns]
+    left_keys = [f'l{i}' for i in left_on]
+    right_keys = [f'r{j}' for j in right_on]
+    if OBJECT_DICTIONARY.has_variants:
+        for n, (i, j) in enumerate(zip(left_on, right_on)):
+            if i in left_encoded and j in right_encoded:
+                left = left.append_column(
+                    f'lk{n}', _comparable_column(left.column(i))
+                )
+                right = right.append_column(
+                    f'rk{n}', _comparable_column(right.column(j))
+                )
+                left_keys[n] = f'lk{n}'
+                right_keys[n] = f'rk{n}'
+    result = left.join(
+        right,
+        keys=left_keys,
+        right_keys=right_keys,
+        join_type=join_type,
+        coalesce_keys=False,
+        use_threads=True
+    )
+    result = result.select(columns)
+    return result.rename_columns(_positional_names(result.num_columns))
+
+
+def _matching_rows(
+    left, right, left_on, right_on, keep_matching,
+    left_encoded=frozenset(), right_encoded=frozenset()
+):
+    """Positions, in order, of the rows of left with a match in right."""
+    keys = left.select(list(left_on)).rename_columns(
+        _positional_names(len(left_on))
+    )
+    keys = keys.append_column('row', pa.array(np.arange(left.num_rows)))
+    matched = _join(
+        keys, right, range(len(left_on)), right_on,
+        'left semi' if keep_matching else 'left anti',
+        left_encoded=frozenset(
+            n for n, i in enumerate(left_on) if i in left_encoded
+        ),
+        right_encoded=right_encoded
+    )
+    return np.sort(matched.column(len(left_on)).to_numpy())
+
+
+def _cross_product_tables(left, right):
+    left_rows = np.repeat(np.arange(left.num_rows), right.num_rows)
+    right_rows = np.tile(np.arange(right.num_rows), left.num_rows)
+    left = left.take(left_rows)
+    right = right.take(right_rows)
+    return _make_table(left.columns + right.columns, len(left_rows))
+
+
+def _shifted(positions, offset):
+    return frozenset(p + offset for p in positions)
+
+
+@lru_cache(maxsize=None)
+def _row_type(columns):
+    return namedtuple(
+        'tuple', [str(c) for c in columns], rename=True
+    )
+
+
+class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
+    """
+    Relational algebra set backed by an Apache Arrow table. Columns
+    without a native Arrow type, as strings, are stored as integer
+    codes of the process-wide ``OBJECT_DICTIONARY`` and only decoded
+    when values are exposed to the caller. Arrow tables are immutable,
+    hence projections and copies share the columns of their source.
+    """
+    def __init__(self, iterable=None):
+        self._table = _nullary_table(0)
+        self._encoded_columns = frozenset()
+        self._might_have_duplicates = True
+        self._row_index = (None, 0, None)
+        if iterable is not None:
+            if isinstance(iterable, RelationalAlgebraFrozenSet):
+                self._table = iterable._table
+                self._encoded_columns = iterable._encoded_columns
+                self._might_have_duplicates = (
+                    iterable._might_have_duplicates
+                )
+            else:
+                self._table, self._encoded_columns = (
+                    _table_from_iterable(iterable)
+                )
+
+    def _new(self, table, encoded_columns, might_have_duplicates=True):
+        output = self._empty_set_same_structure()
+        output._table = table
+        output._encoded_columns = encoded_columns
+        output._might_have_duplicates = might_have_duplicates
+        return output
+
+    def _position(self, column):
+        return column
+
+    def _positions(self, columns):
+        return [self._position(c) for c in columns]
+
+    def _decoded_array(self, position, table=None):
+        if table is None:
+            table = self._table
+        values = table.column(position).to_numpy()
+        if position in self._encoded_columns:
+            values = OBJECT_DICTIONARY.decode(values)
+        return values
+
+    def _decoded_list(self, position, table=None):
+        if table is None:
+            table = self._table
+        if position in self._encoded_columns:
+            return self._decoded_array(position, table).tolist()
+        return table.column(position).to_pylist()
+
+    def _decoded_columns(self):
+        return _DecodedColumns(self)
+
+    def _evaluate_string_expression(self, expression, values=None):
+        if values is None:
+            values = self._decoded_columns()
+        compiled = _STRING_EXPRESSION_COMPILER.compile(expression)
+        if compiled is None:
+            return self.as_pandas_dataframe().eval(
+                str(expression), engine='python'
+            ).values
+        evaluate, _ = compiled
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return evaluate(values, self._table.num_rows)
+
+    def _encode_element(self, element, positions=None):
+        """
+        Element as stored in the table or ``None`` if one of its
+        values was never encoded, hence it can not be in the set.
+        """
+        if positions is None:
+            positions = range(len(element))
+        encoded = []
+        for e, p in zip(element, positions):
+            if p in self._encoded_columns:
+                try:
+                    e = OBJECT_DICTIONARY.lookup(e)
+                except TypeError:
+                    return None
+                if e is None:
+                    return None
+            encoded.append(e)
+        return tuple(encoded)
+
+    def _column_equals(self, position, value):
+        length = self._table.num_rows
+        if callable(value):
+            return np.fromiter(
+                (bool(value(v)) for v in self._decoded_list(position)),
+                dtype=bool, count=length
+            )
+        encoded = self._encode_element((value,), (position,))
+        if encoded is None:
+            return np.zeros(length, dtype=bool)
+        column = self._table.column(position)
+        if position in self._encoded_columns:
+            column = _comparable_column(column)
+        try:
+            mask = pc.equal(column, encoded[0])
+        except _ARROW_ERRORS:
+            return np.zeros(length, dtype=bool)
+        return mask.to_numpy(zero_copy_only=False).astype(bool)
+
+    def _aligned_tables(self, other, pairs=None):
+        other_table = other._table
+        if pairs is None:
+            pairs = [(i, i) for i in range(self.arity)]
+        return _align_tables(
+            self._table, self._encoded_columns,
+            other_table, other._encoded_columns,
+            pairs
+        )
+
+    def _drop_duplicates_if_needed(self):
+        if self._might_have_duplicates:
+            self._table = _unique_rows(self._table, self._encoded_columns)
+            self._might_have_duplicates = False
+
+    def _rows(self):
+        """
+        Lazily built hash set of the rows of the set, as stored, used to
+        test membership, or ``None`` if the table was not yet looked up
+        ``_HASH_INDEX_MIN_LOOKUPS`` times since it last changed.
+        """
+        table, lookups, rows = self._row_index
+        if table is not self._table:
+            table, lookups, rows = self._table, 0, None
+        lookups += 1
+        if rows is None and lookups >= _HASH_INDEX_MIN_LOOKUPS:
+            rows = set(zip(*(
+                column.to_pylist() for column in
+                _comparable_table(table, self._encoded_columns).columns
+            )))
+        self._row_index = (table, lookups, rows)
+        return rows
+
+    def _scan_for_row(self, element):
+        if self._table.num_columns == 0:
+            return self._table.num_rows > 0
+        mask = None
+        table = _comparable_table(self._table, self._encoded_columns)
+        for column, value in zip(table.columns, element):
+            try:
+                equal = pc.equal(column, value)
+            except _ARROW_ERRORS:
+                return False
+            mask = equal if mask is None else pc.and_(mask, equal)
+        return pc.any(mask).as_py() is True
+
+    @classmethod
+    def create_view_from(cls, other):
+        if not isinstance(other, cls):
+            raise ValueError(
+                "View can only be created from an object of the same class"
+            )
+        output = cls()
+        output._table = other._table
+        output._encoded_columns = other._encoded_columns
+        output._might_have_duplicates = other._might_have_duplicates
+        return output
+
+    @classmethod
+    def dee(cls):
+        output = cls()
+        output._table = _nullary_table(1)
+        return output
+
+    @classmethod
+    def dum(cls):
+        return cls()
+
+    def is_empty(self):
+        return self._table.num_rows == 0
+
+    def is_dum(self):
+        return (
+            self.arity == 0 and
+            self.is_empty()
+        )
+
+    def is_dee(self):
+        return (
+            self.arity == 0 and
+            not self.is_empty()
+        )
+
+    def __contains__(self, element):
+        element = self._normalise_element(element)
+        if (
+            self.is_empty() or self.is_dee() or
+            len(element) != self.arity
+        ):
+            return False
+        element = self._encode_element(element)
+        if element is None:
+            return False
+        rows = self._rows()
+        if rows is None:
+            return self._scan_for_row(element)
+        try:
+            return element in rows
+        except TypeError:
+            return False
+
+    @staticmethod
+    def _normalise_element(element):
+        if isinstance(element, tuple):
+            pass
+        elif hasattr(element, "__iter__"):
+            element = tuple(element)
+        else:
+            element = (element, )
+        return element
+
+    def __iter__(self):
+        if self.is_empty():
+            return iter([])
+        if self.is_dee():
+            return iter([tuple()])
+        self._drop_duplicates_if_needed()
+        return self.itervalues()
+
+    def fetch_one(self):
+        if self.is_dee():
+            return tuple()
+        return next(self._iter_rows(self._table.slice(0, 1)))
+
+    def _iter_rows(self, table):
+        return zip(*(
+            self._decoded_list(i, table) for i in range(self.arity)
+        ))
+
+    def __len__(self):
+        self._drop_duplicates_if_needed()
+        return self._table.num_rows
+
+    @property
+    def arity(self):
+        return self._table.num_columns
+
+    @property
+    def columns(self):
+        return pd.RangeIndex(self.arity)
+
+    def as_numpy_array(self):
+        if self.arity == 0:
+            res = np.empty((self._table.num_rows, 0))
+        else:
+            res = np.column_stack([
+                self._decoded_array(i) for i in range(self.arity)
+            ])
+        res.setflags(write=False)
+        return res
+
+    def as_pandas_dataframe(self):
+        if self.arity == 0:
+            return pd.DataFrame(index=pd.RangeIndex(self._table.num_rows))
+        return pd.DataFrame(OrderedDict(
+            (c, self._decoded_array(i))
+            for i, c in enumerate(self.columns)
+        ))
+
+    def _empty_set_same_structure(self):
+        return type(self)()
+
+    def projection(self, *columns):
+        if self.is_empty():
+            return self._empty_set_same_structure()
+        positions = self._positions(columns)
+        return self._new(
+            _make_table(
+                [self._table.column(p) for p in positions],
+                self._table.num_rows
+            ),
+            frozenset(
+                i for i, p in enumerate(positions)
+                if p in self._encoded_columns
+            )
+        )
+
+    def selection(self, select_criteria):
+        if self.is_empty():
+            return self._empty_set_same_structure()
+
+        if isinstance(select_criteria, RelationalAlgebraColumnFunction):
+            mask = select_criteria.evaluate(
+                self._decoded_columns(), self._table.num_rows
+            )
+        elif callable(select_criteria):
+            mask = self.as_pandas_dataframe().apply(
+                select_criteria, axis=1
+            ).values
+        elif isinstance(select_criteria, RelationalAlgebraStringExpression):
+            mask = self._evaluate_string_expression(select_criteria)
+        else:
+            mask = np.ones(self._table.num_rows, dtype=bool)
+            for column, value in select_criteria.items():
+                mask &= self._column_equals(self._position(column), value)
+        return self._filter(np.asarray(mask).astype(bool))
+
+    def _filter(self, mask):
+        return self._new(
+            self._table.filter(pa.array(mask, pa.bool_())),
+            self._encoded_columns,
+            self._might_have_duplicates
+        )
+
+    def selection_columns(self, select_criteria):
+        if self.is_empty():
+            return self._empty_set_same_structure()
+        mask = np.ones(self._table.num_rows, dtype=bool)
+        for col1, col2 in select_criteria.items():
+            mask &= self._columns_equal(
+                self._position(col1), self._position(col2)
+            )
+        return self._filter(mask)
+
+    def _columns_equal(self, position1, position2):
+        column1 = self._table.column(position1)
+        column2 = self._table.column(position2)
+        if (
+            (position1 in self._encoded_columns) ==
+            (position2 in self._encoded_columns)
+        ):
+            if position1 in self._encoded_columns:
+                column1 = _comparable_column(column1)
+                column2 = _comparable_column(column2)
+            try:
+                return pc.equal(column1, column2).to_numpy(
+                    zero_copy_only=False
+                ).astype(bool)
+            except _ARROW_ERRORS:
+                pass
+        return (
+            self._decoded_array(position1) ==
+            self._decoded_array(position2)
+        ).astype(bool)
+
+    def equijoin(self, other, join_indices, return_mappings=False):
+        res = self._dee_dum_product(other)
+        if res is not None:
+            return res
+        if self.is_empty() or other.is_empty():
+            return self._empty_set_same_structure()
+        left, left_encoded, right, right_encoded = self._aligned_tables(
+            other, join_indices
+        )
+        left_on, right_on = zip(*join_indices)
+        table = _join(
+            left, right, left_on, right_on, 'inner',
+            range(other.arity), left_encoded, right_encoded
+        )
+        return self._new(
+            table,
+            left_encoded | _shifted(right_encoded, self.arity),
+            self._might_have_duplicates | other._might_have_duplicates
+        )
+
+    def cross_product(self, other):
+        res = self._dee_dum_product(other)
+        if res is not None:
+            return res
+        if self.is_empty() or other.is_empty():
+            return self._empty_set_same_structure()
+        return self._new(
+            _cross_product_tables(self._table, other._table),
+            (
+                self._encoded_columns |
+                _shifted(other._encoded_columns, self.arity)
+            ),
+            self._might_have_duplicates | other._might_have_duplicates
+        )
+
+    def copy(self):
+        return self._new(
+            self._table, self._encoded_columns,
+            self._might_have_duplicates
+        )
+
+    def __repr__(self):
+        if self.is_empty():
+            return "{}"
+        return repr(self.as_pandas_dataframe())
+
+    def _column_pairs(self):
+        return list(enumerate(self.columns))
+
+    def _union(self, other):
+        left, encoded, right, _ = self._aligned_tables(other)
+        return self._new(pa.concat_tables([left, right]), encoded)
+
+    def _difference(self, other):
+        return self._filter_rows(other, self._column_pairs(), False)
+
+    def _filter_rows(self, other, columns, keep_matching):
+        """
+        Rows of the set with, or without, a row of ``other`` holding the
+        same values, for each pair of a position and a column of ``other``
+        in ``columns``.
+        """
+        pairs = [(p, other._position(c)) for p, c in columns]
+        left, left_encoded, right, right_encoded = self._aligned_tables(
+            other, pairs
+        )
+        rows = _matching_rows(
+            left, right,
+            [p for p, _ in pairs], [q for _, q in pairs],
+            keep_matching, left_encoded, right_encoded
+        )
+        return self._new(
+            self._table.take(rows), self._encoded_columns,
+            self._might_have_duplicates
+        )
+
+    def __or__(self, other):
+        if self is other:
+            return self.copy()
+        elif isinstance(other, RelationalAlgebraFrozenSet):
+            res = self._dee_dum_sum(other)
+            if res is not None:
+                return res
+            return self._union(other)
+        else:
+            return super().__or__(other)
+
+    def __and__(self, other):
+        if self is other:
+            return self.copy()
+        if isinstance(other, RelationalAlgebraFrozenSet):
+            res = self._dee_dum_product(other)
+            if res is not None:
+                return res
+            return self._filter_rows(other, self._column_pairs(), True)
+        else:
+            return super().__and__(other)
+
+    def __sub__(self, other):
+        if (
+            isinstance(other, RelationalAlgebraFrozenSet) and
+            self.arity == other.arity
+        ):
+            if self.is_empty() or other.is_empty():
+                return self.copy()
+            if self.arity == 0:
+                return self.dum()
+            return self._difference(other)
+        else:
+            return super().__sub__(other)
+
+    def _same_rows(self, other, pairs):
+        left, left_encoded, right, right_encoded = self._aligned_tables(
+            other, pairs
+        )
+        right_encoded = frozenset(
+            n for n, (_, q) in enumerate(pairs) if q in right_encoded
+        )
+        left = _unique_rows(left, left_encoded)
+        right = _unique_rows(
+            right.select([q for _, q in pairs]), right_encoded
+        )
+        if left.num_rows != right.num_rows:
+            return False
+        matched = _matching_rows(
+            left, right, [p for p, _ in pairs], range(len(pairs)), True,
+            left_encoded, right_encoded
+        )
+        return len(matched) == left.num_rows
+
+    def __eq__(self, other):
+        if isinstance(other, RelationalAlgebraFrozenSet):
+            if self.is_empty() and other.is_empty():
+                res = True
+            elif self.arity != other.arity:
+                res = False
+            elif self.arity == 0:
+                res = self.is_dee() and other.is_dee()
+            else:
+                res = self._same_rows(other, self._column_pairs())
+            return res
+        else:
+            return super().__eq__(other)
+
+    def _groups(self, columns):
+        positions = self._positions(columns)
+        keys = zip(*(self._decoded_list(p) for p in positions))
+        if len(positions) == 1:
+            keys = (key[0] for key in keys)
+        groups = OrderedDict()
+        for row, key in enumerate(keys):
+            groups.setdefault(key, []).append(row)
+        try:
+            group_keys = sorted(groups)
+        except TypeError:
+            group_keys = list(groups)
+        for key in group_keys:
+            yield key, self._table.take(groups[key])
+
+    def groupby(self, columns):
+        if not self.is_empty():
+            if not isinstance(columns, Iterable) or isinstance(columns, str):
+                columns = [columns]
+            self._drop_duplicates_if_needed()
+            for g_id, table in self._groups(columns):
+                yield g_id, self._new(table, self._encoded_columns, False)
+
+    def itervalues(self):
+        if self.is_empty():
+            return iter([])
+        return self._iter_rows(self._table)
+
+    def __hash__(self):
+        return hash((tuple(self.columns), frozenset(self)))
+
+
+class _DecodedColumns(dict):
+    """
+    Mapping from the columns of a set to the NumPy arrays of their
+    values, decoded the first time they are accessed.
+    """
+    def __init__(self, relation):
+        super().__init__()
+        self.relation = relation
+
+    def __missing__(self, column):
+        values = self.relation._decoded_array(
+            self.relation._position(column)
+        )
+        self[column] = values
+        return values
+
+
+# Arrow hash aggregations evaluating the aggregation functions with
+# a kernel in ``AGGREGATE_KERNELS``, or named as in pandas, along with
+# the functions applied to the column before and to the result after.
+def _complement(values):
+    return pc.subtract(1, values)
+
+
+_ARROW_AGGREGATIONS = {
+    'sum': ('sum', None, None),
+    'max': ('max', None, None),
+    'min': ('min', None, None),
+    'mean': ('mean', None, None),
+    'prod': ('product', None, None),
+    'size': ('count', None, None),
+    'count': ('count', None, None),
+    'first': ('first', None, None),
+    'noisy_or': ('product', _complement, _complement),
+}
+_NON_NUMERIC_AGGREGATIONS = {'size', 'count', 'first'}
+
+
+class NamedRelationalAlgebraFrozenSet(
+    RelationalAlgebraFrozenSet,
+    abc.NamedRelationalAlgebraFrozenSet
+):
+    def __init__(self, columns, iterable=None):
+        if isinstance(columns, NamedRelationalAlgebraFrozenSet):
+            iterable = columns
+            columns = columns.columns
+        # ensure there is no duplicated column
+        self._check_for_duplicated_columns(columns)
+        self._columns = tuple(columns)
+        self._column_positions = None
+        self._encoded_columns = frozenset()
+        self._might_have_duplicates = True
+        self._row_index = (None, 0, None)
+        if iterable is None:
+            iterable = []
+
+        if isinstance(iterable, RelationalAlgebraFrozenSet):
+            if (
+                not iterable.is_dum() and
+                self.arity != iterable.arity
+            ):
+                raise ValueError("Relations must have the same arity")
+            if iterable.is_empty():
+                self._table = _make_table([pa.nulls(0)] * self.arity)
+            else:
+                self._table = iterable._table
+                self._encoded_columns = iterable._encoded_columns
+                self._might_have_duplicates = (
+                    iterable._might_have_duplicates
+                )
+        else:
+            self._table, self._encoded_columns = _table_from_iterable(
+                iterable, self.arity
+            )
+            if self._table.num_columns != self.arity:
+                raise ValueError("Relations must have the same arity")
+
+    @staticmethod
+    def _check_for_duplicated_columns(columns):
+        if len(set(columns)) != len(columns):
+            columns = list(columns)
+            dup_cols = set(c for c in columns if columns.count(c) > 1)
+            raise ValueError(
+                "Duplicated column names are not allowed. "
+                f"Found the following duplicated columns: {dup_cols}"
+            )
+
+    @classmethod
+    def create_view_from(cls, other):
+        if not isinstance(other, cls):
+            raise ValueError(
+                "View can only be created from an object of the same class"
+            )
+        output = cls(columns=tuple())
+        output._table = other._table
+        output._encoded_columns = other._encoded_columns
+        output._columns = other._columns
+        output._might_have_duplicates = other._might_have_duplicates
+        return output
+
+    def _empty_set_same_structure(self):
+        return type(self)(self.columns)
+
+    @classmethod
+    def dee(cls):
+        output = cls(())
+        output._table = _nullary_table(1)
+        return output
+
+    @classmethod
+    def dum(cls):
+        return cls(())
+
+    def _light_init_same_structure(
+        self, table,
+        might_have_duplicates=True,
+        columns=None,
+        encoded_columns=None
+    ):
+        if columns is None:
+            columns = self.columns
+        if encoded_columns is None:
+            encoded_columns = self._encoded_columns
+        output = type(self)(columns)
+        output._table = table
+        output._encoded_columns = encoded_columns
+        output._might_have_duplicates = might_have_duplicates
+        return output
+
+    def _new(self, table, encoded_columns, might_have_duplicates=True):
+        return self._light_init_same_structure(
+            table, might_have_duplicates, encoded_columns=encoded_columns
+        )
+
+    def _position(self, column):
+        if self._column_positions is None:
+            self._column_positions = {
+                c: i for i, c in enumerate(self._columns)
+            }
+        return self._column_positions[column]
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def arity(self):
+        return len(self._columns)
+
+    def as_pandas_dataframe(self):
+        container = super().as_pandas_dataframe()
+        if self.arity > 0:
+            container.columns = list(self.columns)
+        return container
+
+    def __contains__(self, element):
+        if isinstance(element, dict) and len(element) == self.arity:
+            element = tuple(element[c] for c in self.columns)
+        return super().__contains__(element)
+
+    def projection(self, *columns):
+        if self.is_empty():
+            return type(self)(columns)
+        if self.arity == 0:
+            return self
+        positions = self._positions(columns)
+        return self._light_init_same_structure(
+            self._table.select(positions).rename_columns(
+                _positional_names(len(positions))
+            ),
+            columns=columns,
+            encoded_columns=frozenset(
+                i for i, p in enumerate(positions)
+                if p in self._encoded_columns
+            )
+        )
+
+    def projection_to_unnamed(self, *columns):
+        return self.to_unnamed().projection(*self._positions(columns))
+
+    def equijoin(self, other, join_indices, return_mappings=False):
+        raise NotImplementedError()
+
+    def naturaljoin(self, other):
+        res = self._dee_dum_product(other)
+        if res is not None:
+            return res
+        on = [c for c in self.columns if c in other.columns]
+
+        if len(on) == 0:
+            return self.cross_product(other)
+
+        new_columns = self.columns + tuple(
+            c for c in other.columns if c not in self.columns
+        )
+        if self.is_empty() or other.is_empty():
+            return type(self)(new_columns)
+
+        left_on = self._positions(on)
+        right_on = other._positions(on)
+        right_columns = [
+            i for i, c in enumerate(other.columns) if c not in self.columns
+        ]
+        left, left_encoded, right, right_encoded = self._aligned_tables(
+            other, list(zip(left_on, right_on))
+        )
+        table = _join(
+            left, right, left_on, right_on, 'inner', right_columns,
+            left_encoded, right_encoded
+        )
+        return self._light_init_same_structure(
+            table,
+            might_have_duplicates=(
+                self._might_have_duplicates |
+                other._might_have_duplicates
+            ),
+            columns=new_columns,
+            encoded_columns=left_encoded | frozenset(
+                self.arity + i for i, j in enumerate(right_columns)
+                if j in right_encoded
+            )
+        )
+
+    def semijoin(self, other):
+        return self._filter_by_match(other, True)
+
+    def antijoin(self, other):
+        return self._filter_by_match(other, False)
+
+    def _filter_by_match(self, other, keep_matching):
+        on = [c for c in self.columns if c in other.columns]
+        if len(on) == 0:
+            if other.is_empty() == keep_matching:
+                return type(self)(self.columns)
+            return self.copy()
+        if self.is_empty():
+            return self.copy()
+        if other.is_empty():
+            if keep_matching:
+                return type(self)(self.columns)
+            return self.copy()
+        return self._filter_rows(
+            other, [(self._position(c), c) for c in on], keep_matching
+        )
+
+    def cross_product(self, other):
+        res = self._dee_dum_product(other)
+        if res is not None:
+            return res.copy()
+        if any(c in self.columns for c in other.columns):
+            raise ValueError(
+                "Cross product with common columns "
+                "is not valid"
+            )
+
+        new_columns = self.columns + other.columns
+        if self.is_empty() or other.is_empty():
+            return type(self)(new_columns)
+        return self._light_init_same_structure(
+            _cross_product_tables(self._table, other._table),
+            might_have_duplicates=(
+                self._might_have_duplicates |
+                other._might_have_duplicates
+            ),
+            columns=new_columns,
+            encoded_columns=(
+                self._encoded_columns |
+                _shifted(other._encoded_columns, self.arity)
+            )
+        )
+
+    def rename_column(self, src, dst):
+        if src not in self._columns:
+            raise ValueError(f"{src} not in columns")
+        if src == dst:
+            return self
+        if dst in self._columns:
+            raise ValueError(f"{dst} cannot be in the columns")
+        return self.rename_columns({src: dst})
+
+    def rename_columns(self, renames):
+        # prevent duplicated destination columns
+        self._check_for_duplicated_columns(renames.values())
+        if not set(renames).issubset(self.columns):
+            # get the missing source columns
+            # for a more convenient error message
+            not_found_cols = set(c for c in renames if c not in self._columns)
+            raise ValueError(
+                f"Cannot rename non-existing columns: {not_found_cols}"
+            )
+        new_columns = tuple(
+            renames.get(col, col) for col in self._columns
+        )
+        return self._light_init_same_structure(
+            self._table,
+            might_have_duplicates=self._might_have_duplicates,
+            columns=new_columns
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, NamedRelationalAlgebraFrozenSet):
+            return super().__eq__(other)
+        if set(self.columns) != set(other.columns):
+            res = False
+        elif self.is_empty() and other.is_empty():
+            res = True
+        elif self.arity == 0:
+            res = not self.is_empty() and not other.is_empty()
+        else:
+            res = self._same_rows(
+                other,
+                [(i, other._position(c)) for i, c in self._column_pairs()]
+            )
+        return res
+
+    def groupby(self, columns):
+        if self.is_empty():
+            return
+        if isinstance(columns, str) or not isinstance(columns, Iterable):
+            columns = [columns]
+        self._drop_duplicates_if_needed()
+        for g_id, table in self._groups(columns):
+            yield g_id, self._light_init_same_structure(
+                table, might_have_duplicates=False
+            )
+
+    def aggregate(self, group_columns, aggregate_function):
+        group_columns = list(group_columns)
+        if len(set(group_columns)) < len(group_columns):
+            raise ValueError("Cannot group on repeated columns")
+        aggregations = self._classify_aggregations(
+            group_columns, aggregate_function
+        )
+        columns = group_columns + [dst for dst, _, _ in aggregations]
+        if self.is_empty():
+            return type(self)(columns)
+        arrow_aggregations = [
+            self._arrow_aggregation(src, fun)
+            for _, src, fun in aggregations
+        ]
+        if any(agg is None for agg in arrow_aggregations):
+            return self._pandas_aggregate(group_columns, aggregate_function)
+
+        self._drop_duplicates_if_needed()
+        table = self._table
+        arrays = [table.column(self._position(c)) for c in group_columns]
+        keys = _positional_names(len(group_columns), 'k')
+        if len(group_columns) == 0:
+            arrays.append(pa.array(np.zeros(table.num_rows, dtype=np.int64)))
+            keys.append('k')
+        names = list(keys)
+        # groups of encoded columns are formed by the equality classes
+        # of their codes, keeping the smallest code found in each group
+        encoded_keys = [
+            i for i, c in enumerate(group_columns)
+            if self._position(c) in self._encoded_columns
+        ]
+        key_codes = []
+        if OBJECT_DICTIONARY.has_variants:
+            for i in encoded_keys:
+                arrays.append(arrays[i])
+                names.append(f'c{i}')
+                key_codes.append((f'c{i}', 'min'))
+                arrays[i] = _comparable_column(arrays[i])
+        use_threads = True
+        for i, (src, (name, pre, _)) in enumerate(
+            zip((src for _, src, _ in aggregations), arrow_aggregations)
+        ):
+            values = table.column(self._position(src))
+            if pre is not None:
+                values = pre(values)
+            arrays.append(values)
+            names.append(f'a{i}')
+            use_threads &= name != 'first'
+        result = (
+            pa.Table.from_arrays(arrays, names=names)
+            .group_by(keys, use_threads=use_threads)
+            .aggregate([
+                (f'a{i}', name)
+                for i, (name, _, _) in enumerate(arrow_aggregations)
+            ] + key_codes)
+        )
+        new_arrays = [
+            result.column(f'k{i}') for i in range(len(group_columns))
+        ]
+        for name, _ in key_codes:
+            new_arrays[int(name[1:])] = result.column(f'{name}_min')
+        encoded_columns = set(encoded_keys)
+        for i, (src, (name, _, post)) in enumerate(
+            zip((src for _, src, _ in aggregations), arrow_aggregations)
+        ):
+            values = result.column(f'a{i}_{name}')
+            if post is not None:
+                values = post(values)
+            if (
+                name == 'first' and
+                self._position(src) in self._encoded_columns
+            ):
+                encoded_columns.add(len(new_arrays))
+            new_arrays.append(values)
+        return self._light_init_same_structure(
+            _make_table(new_arrays),
+            might_have_duplicates=False,
+            columns=columns,
+            encoded_columns=frozenset(encoded_columns)
+        )
+
+    def _arrow_aggregation(self, src, fun):
+        """
+        Arrow hash aggregation evaluating ``fun`` on the column ``src``,
+        or ``None`` if there is none.
+        """
+        if src not in self.columns:
+            return None
+        if isinstance(fun, str):
+            name = str(fun)
+        else:
+            try:
+                kernel = AGGREGATE_KERNELS.get(fun)
+            except TypeError:
+                return None
+            if kernel is None:
+                return None
+            name = kernel.name
+        if name not in _ARROW_AGGREGATIONS:
+            return None
+        position = self._position(src)
+        type_ = self._table.column(position).type
+        if name not in _NON_NUMERIC_AGGREGATIONS and (
+            position in self._encoded_columns or not (
+                pa.types.is_integer(type_) or pa.types.is_floating(type_)
+            )
+        ):
+            return None
+        return _ARROW_AGGREGATIONS[name]
+
+    def _pandas_aggregate(self, group_columns, aggregate_function):
+        result = pandas_backend.NamedRelationalAlgebraFrozenSet(
+            self.columns, self.as_pandas_dataframe()
+        ).aggregate(group_columns, aggregate_function)
+        result = NamedRelationalAlgebraFrozenSet(
+            result.columns, result.as_pandas_dataframe()
+        )
+        return self._light_init_same_structure(
+            result._table,
+            might_have_duplicates=result._might_have_duplicates,
+            columns=result.columns,
+            encoded_columns=result._encoded_columns
+        )
+
+    def _classify_aggregations(self, group_columns, aggregate_function):
+        if isinstance(aggregate_function, dict):
+            arg_iterable = (
+                (k, k if k in self.columns else None, v)
+                for k, v in aggregate_function.items()
+            )
+        elif isinstance(aggregate_function, (tuple, list)):
+            arg_iterable = aggregate_function
+        else:
+            raise ValueError(
+                "Unsupported aggregate_function: {} of type {}".format(
+                    aggregate_function, type(aggregate_function)
+                )
+            )
+
+        aggregations = []
+        for dst, src, fun in arg_iterable:
+            if dst in group_columns:
+                raise ValueError(
+                    f"Destination column {dst} can't be part of the grouping"
+                )
+            if not (
+                src in self.columns or src is None or
+                all(s in self.columns for s in src)
+            ):
+                raise ValueError(f"Source column {src} not in columns")
+            aggregations.append((dst, src, fun))
+        return aggregations
+
+    def extended_projection(self, eval_expressions):
+        proj_columns = list(eval_expressions.keys())
+        if self.is_empty():
+            return type(self)(columns=proj_columns, iterable=[])
+        length = self._table.num_rows
+        values = self._decoded_columns()
+        decoded_container = None
+        # columns copied untouched keep their Arrow arrays instead of
+        # being converted and encoded again
+        kept_columns = OrderedDict()
+        new_columns = OrderedDict()
+        for dst_column, operation in eval_expressions.items():
+            if (
+                isinstance(operation, RelationalAlgebraStringExpression) and
+                str(operation) == str(dst_column)
+            ):
+                operation = RelationalAlgebraColumnStr(dst_column)
+            if isinstance(operation, RelationalAlgebraStringExpression):
+                new_columns[dst_column] = self._evaluate_string_expression(
+                    operation, values
+                )
+            elif isinstance(operation, RelationalAlgebraColumn):
+                kept_columns[dst_column] = self._position(operation)
+            elif isinstance(operation, RelationalAlgebraColumnFunction):
+                new_columns[dst_column] = operation.evaluate(values, length)
+            elif callable(operation):
+                if decoded_container is None:
+                    decoded_container = self.as_pandas_dataframe()
+                new_columns[dst_column] = decoded_container.apply(
+                    operation, axis=1
+                ).values
+            else:
+                new_columns[dst_column] = operation
+
+        arrays = []
+        encoded_columns = set()
+        for i, dst_column in enumerate(proj_columns):
+            if dst_column in kept_columns:
+                position = kept_columns[dst_column]
+                column = self._table.column(position)
+                is_encoded = position in self._encoded_columns
+            else:
+                value = new_columns[dst_column]
+                if not isinstance(value, _ARRAY_TYPES):
+                    value = _broadcast_value(value, length)
+                column, is_encoded = _arrow_column(value)
+            arrays.append(column)
+            if is_encoded:
+                encoded_columns.add(i)
+        return self._light_init_same_structure(
+            _make_table(arrays, length),
+            might_have_duplicates=self._might_have_duplicates,
+            columns=proj_columns,
+            encoded_columns=frozenset(encoded_columns)
+        )
+
+    def __iter__(self):
+        if self.is_dee():
+            return iter([tuple()])
+        if self.is_empty():
+            return iter([])
+        self._drop_duplicates_if_needed()
+        row_type = _row_type(self.columns)
+        return (row_type(*row) for row in self._iter_rows(self._table))
+
+    def fetch_one(self):
+        if self.is_dee():
+            return tuple()
+        row = next(self._iter_rows(self._table.slice(0, 1)))
+        return _row_type(self.columns)(*row)
+
+    def to_unnamed(self):
+        output = RelationalAlgebraFrozenSet()
+        output._table = self._table
+        output._encoded_columns = self._encoded_columns
+        output._might_have_duplicates = self._might_have_duplicates
+        return output
+
+    def _check_same_columns(self, other, message):
+        if (
+            (self.arity > 0 and other.arity > 0) and
+            set(self.columns) != set(other.columns)
+        ):
+            raise ValueError(message)
+
+    def __sub__(self, other):
+        self._check_same_columns(
+            other, "Difference defined only for sets with the same columns"
+        )
+        if self.is_empty() or other.is_empty():
+            return self.copy()
+        if self.is_dee():
+            if other.is_dee():
+                return self.dum()
+            return self.dee()
+        return self._difference(other)
+
+    def __or__(self, other):
+        res = self._dee_dum_sum(other)
+        if res is not None:
+            return res
+        elif set(self.columns) != set(other.columns):
+            raise ValueError(
+                "Union defined only for sets with the same columns"
+            )
+        other_table = other._table.select(
+            other._positions(self.columns)
+        ).rename_columns(_positional_names(self.arity))
+        left, encoded, right, _ = _align_tables(
+            self._table, self._encoded_columns,
+            other_table, frozenset(
+                i for i, c in enumerate(self.columns)
+                if other._position(c) in other._encoded_columns
+            ),
+            [(i, i) for i in range(self.arity)]
+        )
+        return self._light_init_same_structure(
+            pa.concat_tables([left, right]),
+            might_have_duplicates=True,
+            encoded_columns=encoded
+        )
+
+    def __and__(self, other):
+        res = self._dee_dum_product(other)
+        if res is not None:
+            return res
+        if set(self.columns) != set(other.columns):
+            raise ValueError(
+                "Union defined only for sets with the same columns"
+            )
+        if self.is_empty():
+            return self.copy()
+        return self._filter_rows(other, self._column_pairs(), True)
+
+    def __lt__(self, other):
+        raise NotImplementedError()
+
+    def __le__(self, other):
+        raise NotImplementedError()
+
+    def __gt__(self, other):
+        raise NotImplementedError()
+
+    def __ge__(self, other):
+        raise NotImplementedError()
+
+
+class RelationalAlgebraSet(
+    RelationalAlgebraFrozenSet,
+    abc.RelationalAlgebraSet
+):
+    def _set_state(self, other):
+        self._table = other._table
+        self._encoded_columns = other._encoded_columns
+        self._might_have_duplicates = other._might_have_duplicates
+
+    def add(self, value):
+        value = self._normalise_element(value)
+        if self.is_empty():
+            self._table, self._encoded_columns = _table_from_rows([value])
+        else:
+            row = self._new_row(value)
+            self._table = pa.concat_tables([self._table, row])
+        self._might_have_duplicates = True
+
+    def _new_row(self, element):
+        """
+        Table with the element as its single row, converting the columns
+        of the set which can not hold one of its values.
+        """
+        arrays = []
+        for i, e in enumerate(element):
+            if i not in self._encoded_columns:
+                array, is_encoded = _arrow_column(_object_array([e]))
+                type_ = self._table.column(i).type
+                if not is_encoded and array.type != type_:
+                    common_type = _common_type(array.type, type_)
+                    if common_type is not None:
+                        self._table = _cast_column(
+                            self._table, i, common_type
+                        )
+                        array = array.cast(common_type)
+                        is_encoded = False
+                    else:
+                        is_encoded = True
+                if not is_encoded:
+                    arrays.append(array)
+                    continue
+                self._table = _encode_column(self._table, i)
+                self._encoded_columns = self._encoded_columns | {i}
+            arrays.append(pa.array([OBJECT_DICTIONARY.code(e)], pa.int64()))
+        return _make_table(arrays, 1)
+
+    def discard(self, value):
+        if self.is_empty():
+            return
+        value = self._normalise_element(value)
+        if len(value) != self.arity:
+            return
+        mask = np.ones(self._table.num_rows, dtype=bool)
+        for i, e in enumerate(value):
+            mask &= self._column_equals(i, e)
+        if mask.any():
+            self._table = self._table.filter(pa.array(~mask))
+
+    def __ior__(self, other):
+        if isinstance(other, RelationalAlgebraFrozenSet):
+            if other.is_empty() or other.arity == 0:
+                return self
+            if self.is_empty():
+                self._set_state(other)
+                return self
+            if other.arity != self.arity:
+                raise ValueError(
+                    "Operation only valid for sets with the same arity"
+                )
+            self._set_state(self._union(other))
+            return self
+        else:
+            return super().__ior__(other)
+
+    def __isub__(self, other):
+        if self.is_empty():
+            return self
+        if isinstance(other, RelationalAlgebraFrozenSet):
+            if other.is_empty() or other.arity == 0:
+                if self.arity == 0 and not other.is_empty():
+                    self._table = self._table.slice(0, 0)
+            elif other.arity != self.arity:
+                raise ValueError(
+                    "Operation only valid for sets with the same arity"
+                )
+            else:
+                self._set_state(self._difference(other))
+            return self
+        else:
+            return super().__isub__(other)
@@ -1,11 +1,20 @@
+import ast
 from collections import OrderedDict
+from contextlib import contextmanager
+from operator import floordiv, mod
+from threading import Lock, get_ident
 from typing import Iterable
-from uuid import uuid1
 
+import numpy as np
 import pandas as pd
 
 from . import abstract as abc
 
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
 
 class RelationalAlgebraStringExpression(str):
     def __repr__(self):
@@ -24,17 +33,1074 @@ class RelationalAlgebraColumnStr(str, RelationalAlgebraColumn):
     pass
 
 
+class RelationalAlgebraColumnFunction:
+    """
+    Function of columns of a relational algebra set evaluated on whole
+    columns at once. ``function`` receives the number of rows and one
+    array of values for each column in ``columns``, and returns the
+    array of its results. Sets are evaluated in chunks of ``chunk_size``
+    rows, bounding the size of the intermediate arrays.
+    """
+    chunk_size = 2 ** 16
+
+    def __init__(self, function, columns):
+        self.function = function
+        self.columns = tuple(columns)
+
+    def evaluate(self, columns, length):
+        """
+        Results on the ``length`` rows of the mapping ``columns`` from
+        column names to arrays of values.
+        """
+        results = []
+        for start in range(0, length, self.chunk_size):
+            stop = min(start + self.chunk_size, length)
+            results.append(np.asarray(self.function(
+                stop - start,
+                *(columns[column][start:stop] for column in self.columns)
+            )))
+        if len(results) == 0:
+            return np.empty(0, dtype=object)
+        return np.concatenate(results)
+
+
+def _series_operator(operator):
+    """
+    Binary operator applied as on pandas Series when one of the operands
+    is an array, such that e.g. integer division by zero gives ``inf`` or
+    ``NaN``, as ``DataFrame.eval`` does, instead of the ``0`` of NumPy.
+    """
+    def evaluate(left, right):
+        if isinstance(left, np.ndarray):
+            return operator(pd.Series(left, copy=False), right).values
+        if isinstance(right, np.ndarray):
+            return operator(left, pd.Series(right, copy=False)).values
+        return operator(left, right)
+    return evaluate
+
+
+# Bound on the magnitude of integer results computed on NumPy integers,
+# below which the float estimate of a result guarantees it did not overflow
+_EXACT_INTEGER_BOUND = 2.0 ** 62
+
+
+def _is_integer(value):
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'biu'
+    return isinstance(value, (int, np.integer))
+
+
+def exact_integer_ufunc(ufunc):
+    """
+    Wrap a NumPy ufunc which can overflow on integer arrays, such as
+    ``np.multiply``, such that integer results which might not fit in
+    64 bits are computed on Python integers, as the Python operator does.
+    """
+    def evaluate(*values):
+        if not (
+            any(
+                isinstance(v, np.ndarray) and v.dtype.kind in 'iu'
+                for v in values
+            ) and
+            all(_is_integer(v) for v in values)
+        ):
+            return ufunc(*values)
+        with np.errstate(all='ignore'):
+            estimate = ufunc(*(
+                np.asarray(v, dtype=np.float64) for v in values
+            ))
+        if np.all(np.abs(estimate) < _EXACT_INTEGER_BOUND):
+            return ufunc(*values)
+        return pd.Series(
+            ufunc(*(
+                v.astype(object) if isinstance(v, np.ndarray) else v
+                for v in values
+            )),
+            dtype=object
+        ).infer_objects().values
+    return evaluate
+
+
+class _StringExpressionCompiler(ast.NodeVisitor):
+    """
+    Compiles the arithmetic, comparison and boolean operations of a
+    `RelationalAlgebraStringExpression` into a function on the arrays of
+    values of the columns it names, evaluated with NumPy ufuncs. Compiled
+    expressions are evaluated by numexpr, when it is installed, if they
+    have at least ``numexpr_threshold`` rows of floating point or boolean
+    values and only operations numexpr evaluates as NumPy does. Integer
+    arithmetic giving results which do not fit in 64 bits is computed on
+    Python integers.
+
+    ``compile`` returns ``None`` for the expressions it does not support,
+    which must be evaluated by ``DataFrame.eval``.
+    """
+    numexpr_threshold = 2 ** 14
+
+    binary_operators = {
+        ast.Add: exact_integer_ufunc(np.add),
+        ast.Sub: exact_integer_ufunc(np.subtract),
+        ast.Mult: exact_integer_ufunc(np.multiply),
+        ast.Div: np.true_divide,
+        ast.FloorDiv: _series_operator(floordiv),
+        ast.Mod: _series_operator(mod),
+        ast.Pow: np.power,
+        ast.BitAnd: np.bitwise_and,
+        ast.BitOr: np.bitwise_or,
+    }
+    unary_operators = {
+        ast.USub: exact_integer_ufunc(np.negative),
+        ast.UAdd: np.positive,
+        ast.Invert: np.invert,
+        ast.Not: np.logical_not,
+    }
+    comparison_operators = {
+        ast.Eq: np.equal,
+        ast.NotEq: np.not_equal,
+        ast.Lt: np.less,
+        ast.LtE: np.less_equal,
+        ast.Gt: np.greater,
+        ast.GtE: np.greater_equal,
+    }
+    numexpr_nodes = (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Name,
+        ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div,
+        ast.Pow, ast.BitAnd, ast.BitOr, ast.USub, ast.Invert, ast.Eq,
+        ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    )
+
+    def __init__(self):
+        self._cache = dict()
+
+    def compile(self, expression):
+        """
+        Pair of the function evaluating ``expression``, receiving a
+        mapping from column names to arrays of values and the number of
+        rows, and the columns it reads; or ``None``.
+        """
+        expression = str(expression)
+        if expression not in self._cache:
+            self._cache[expression] = self._compile(expression)
+        return self._cache[expression]
+
+    def _compile(self, expression):
+        try:
+            tree = ast.parse(expression.strip(), mode='eval')
+            evaluate = self.visit(tree.body)
+        except (SyntaxError, NotImplementedError):
+            return None
+        columns = tuple(OrderedDict.fromkeys(
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+        ))
+        if numexpr is not None and all(
+            isinstance(node, self.numexpr_nodes) for node in ast.walk(tree)
+        ):
+            evaluate = self._with_numexpr(evaluate, expression, columns)
+        return evaluate, columns
+
+    def _with_numexpr(self, evaluate, expression, columns):
+        threshold = self.numexpr_threshold
+
+        def evaluate_numexpr(values, length):
+            if length >= threshold and len(columns) > 0:
+                local_dict = {c: values[c] for c in columns}
+                if all(
+                    v.dtype.kind in 'bf' for v in local_dict.values()
+                ):
+                    return numexpr.evaluate(expression, local_dict=local_dict)
+            return evaluate(values, length)
+        return evaluate_numexpr
+
+    def generic_visit(self, node):
+        raise NotImplementedError(
+            f"{type(node).__name__} is not supported in string expressions"
+        )
+
+    def visit_BinOp(self, node):
+        operator = self._operator(self.binary_operators, node.op)
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        return lambda values, length: operator(
+            left(values, length), right(values, length)
+        )
+
+    def visit_UnaryOp(self, node):
+        operator = self._operator(self.unary_operators, node.op)
+        operand = self.visit(node.operand)
+        return lambda values, length: operator(operand(values, length))
+
+    def visit_BoolOp(self, node):
+        if isinstance(node.op, ast.And):
+            operator = np.logical_and
+        else:
+            operator = np.logical_or
+        operands = [self.visit(value) for value in node.values]
+
+        def evaluate(values, length):
+            result = operands[0](values, length)
+            for operand in operands[1:]:
+                result = operator(result, operand(values, length))
+            return result
+        return evaluate
+
+    def visit_Compare(self, node):
+        comparisons = []
+        left = self.visit(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = self.visit(comparator)
+            comparisons.append(
+                (self._operator(self.comparison_operators, op), left, right)
+            )
+            left = right
+
+        def evaluate(values, length):
+            result = None
+            for operator, left, right in comparisons:
+                comparison = operator(
+                    left(values, length), right(values, length)
+                )
+                if result is None:
+                    result = comparison
+                else:
+                    result = np.logical_and(result, comparison)
+            return result
+        return evaluate
+
+    def visit_Name(self, node):
+        name = node.id
+        return lambda values, length: values[name]
+
+    def visit_Constant(self, node):
+        value = node.value
+        return lambda values, length: value
+
+    @staticmethod
+    def _operator(operators, op):
+        operator = operators.get(type(op))
+        if operator is None:
+            raise NotImplementedError(
+                f"{type(op).__name__} is not supported in string expressions"
+            )
+        return operator
+
+
+_STRING_EXPRESSION_COMPILER = _StringExpressionCompiler()
+
+
+class _DecodedColumns(dict):
+    """
+    Mapping from the columns of a container to their arrays of values,
+    decoded the first time they are accessed.
+    """
+    def __init__(self, container, encoded_columns):
+        super().__init__()
+        self.container = container
+        self.encoded_columns = encoded_columns
+
+    def __missing__(self, column):
+        values = self.container[column].values
+        if column in self.encoded_columns:
+            values = VALUE_DICTIONARY.decode(values)
+        self[column] = values
+        return values
+
+
+_ARRAY_TYPES = (np.ndarray, pd.Series, pd.api.extensions.ExtensionArray)
+
+
+def _broadcast_value(value, length):
+    if np.isscalar(value):
+        return np.full(length, value)
+    column = np.empty(length, dtype=object)
+    column.fill(value)
+    return column
+
+
+def noisy_or(values):
+    """Probability that at least one of independent events happens."""
+    return 1 - np.prod(1 - np.asarray(values))
+
+
+def log_sum_exp(values):
+    """Logarithm of the sum of the exponentials of the values."""
+    values = np.asarray(values)
+    shift = values.max()
+    if not np.isfinite(shift):
+        shift = 0
+    return shift + np.log(np.exp(values - shift).sum())
+
+
+def _groupby_kernel(reduction):
+    def kernel(values, keys):
+        return getattr(values.groupby(keys), reduction)()
+    return kernel
+
+
+def _noisy_or_kernel(values, keys):
+    return 1 - (1 - values).groupby(keys).prod()
+
+
+def _log_sum_exp_kernel(values, keys):
+    shift = values.groupby(keys).transform('max')
+    shift = shift.where(np.isfinite(shift), 0)
+    return (
+        np.log(np.exp(values - shift).groupby(keys).sum()) +
+        shift.groupby(keys).first()
+    )
+
+
+class _AggregateKernel:
+    def __init__(self, kernel, name, numeric_only=True):
+        self.kernel = kernel
+        self.name = name
+        self.numeric_only = numeric_only
+
+    def applies_to(self, values):
+        return not self.numeric_only or values.dtype.kind in 'biuf'
+
+
+# Vectorised evaluations of the aggregation functions on groups of rows.
+# A kernel receives the values of the aggregated column and the keys of
+# the groups, and returns the aggregated values indexed by group. Kernels
+# only apply to numeric columns, except the one of ``len``.
+_SUM_KERNEL = _AggregateKernel(_groupby_kernel('sum'), 'sum')
+_MAX_KERNEL = _AggregateKernel(_groupby_kernel('max'), 'max')
+_MIN_KERNEL = _AggregateKernel(_groupby_kernel('min'), 'min')
+_MEAN_KERNEL = _AggregateKernel(_groupby_kernel('mean'), 'mean')
+_PRODUCT_KERNEL = _AggregateKernel(_groupby_kernel('prod'), 'prod')
+_COUNT_KERNEL = _AggregateKernel(
+    _groupby_kernel('size'), 'size', numeric_only=False
+)
+
+AGGREGATE_KERNELS = {
+    sum: _SUM_KERNEL,
+    np.sum: _SUM_KERNEL,
+    max: _MAX_KERNEL,
+    np.max: _MAX_KERNEL,
+    min: _MIN_KERNEL,
+    np.min: _MIN_KERNEL,
+    np.mean: _MEAN_KERNEL,
+    np.prod: _PRODUCT_KERNEL,
+    len: _COUNT_KERNEL,
+    noisy_or: _AggregateKernel(_noisy_or_kernel, 'noisy_or'),
+    log_sum_exp: _AggregateKernel(_log_sum_exp_kernel, 'log_sum_exp'),
+}
+
+
+def register_aggregate_kernel(function, equivalent):
+    """
+    Evaluates the aggregation ``function`` with the kernel of the
+    registered function ``equivalent``, which must give the same result
+    on every group of values the kernel applies to.
+    """
+    AGGREGATE_KERNELS[function] = AGGREGATE_KERNELS[equivalent]
+
+
+def _aggregate_kernel(function, values):
+    try:
+        kernel = AGGREGATE_KERNELS.get(function)
+    except TypeError:
+        return None
+    if kernel is None or not kernel.applies_to(values):
+        return None
+    return kernel.kernel
+
+
+class ValueDictionary:
+    """
+    Process-wide dictionary assigning an integer code to every value
+    stored in an object column. Columns encoded against the same
+    dictionary can be joined, compared and deduplicated on their codes.
+
+    Only values of the types in ``encodable_types`` are encoded. Those
+    must not compare equal to values of a different type, otherwise
+    decoding could return an equal value of a different type.
+
+    Values are never removed, as codes can be held by any set alive in
+    the process, hence the dictionary only grows. Once it holds
+    ``max_size`` values, new values are not encoded anymore and the
+    columns holding them are stored as plain object columns. A
+    ``max_size`` of ``None`` leaves the dictionary unbounded.
+    """
+    encodable_types = (str, bytes)
+
+    def __init__(self, capacity=1024, max_size=2 ** 20):
+        self._codes = dict()
+        self._values = np.empty(capacity, dtype=object)
+        self._size = 0
+        self._lock = Lock()
+        self.max_size = max_size
+
+    def __len__(self):
+        return self._size
+
+    def encode(self, values):
+        """
+        Codes for the values in the array, or ``None`` if they
+        can not be encoded because they are missing, not of
+        an encodable type or there is no room for the new ones.
+        """
+        try:
+            labels, uniques = pd.factorize(values, sort=False)
+        except TypeError:
+            return None
+        if (labels < 0).any():
+            return None
+        codes = self._codes_for_uniques(uniques)
+        if codes is None:
+            return None
+        return codes[labels]
+
+    def _codes_for_uniques(self, uniques):
+        codes = np.empty(len(uniques), dtype=np.int64)
+        missing = []
+        get_code = self._codes.get
+        encodable_types = self.encodable_types
+        for i, value in enumerate(uniques):
+            if type(value) not in encodable_types:
+                return None
+            code = get_code(value)
+            if code is None:
+                missing.append(i)
+            else:
+                codes[i] = code
+        if len(missing) > 0:
+            with self._lock:
+                if not self._has_room(len(missing)):
+                    return None
+                for i in missing:
+                    codes[i] = self._add(uniques[i])
+        return codes
+
+    def _has_room(self, n_values):
+        return self.max_size is None or self._size + n_values <= self.max_size
+
+    @staticmethod
+    def _key(value):
+        return value
+
+    def _add(self, value):
+        key = self._key(value)
+        code = self._codes.get(key)
+        if code is None:
+            if not self._has_room(1):
+                return None
+            code = self._size
+            if code == len(self._values):
+                values = np.empty(2 * len(self._values), dtype=object)
+                values[:code] = self._values
+                self._values = values
+            self._values[code] = value
+            self._codes[key] = code
+            self._size += 1
+        return code
+
+    def code(self, value):
+        """
+        Code for a single value, adding it to the dictionary if new,
+        or ``None`` if it is not of an encodable type or the dictionary
+        is full.
+        """
+        if type(value) not in self.encodable_types:
+            return None
+        code = self._codes.get(self._key(value))
+        if code is None:
+            with self._lock:
+                code = self._add(value)
+        return code
+
+    def lookup(self, value):
+        """
+        Code for a single value or ``None`` if the value was never
+        encoded. Raises ``TypeError`` if the value is unhashable.
+        """
+        return self._codes.get(self._key(value))
+
+    def decode(self, codes):
+        return self._values.take(codes)
+
+
+VALUE_DICTIONARY = ValueDictionary()
+_NO_ROWS = np.empty(0, dtype=np.intp)
+# Number of lookups on the same columns of an unchanged container after
+# which a hash index is built, as scanning the columns is cheaper for
+# a few lookups and containers change often, e.g. between ``add`` calls.
+_HASH_INDEX_MIN_LOOKUPS = 16
+
+
+def _replace_columns(container, new_columns):
+    return pd.DataFrame(
+        OrderedDict(
+            (c, new_columns[c] if c in new_columns else container[c].values)
+            for c in container.columns
+        ),
+        index=container.index, columns=container.columns
+    )
+
+
+def _encode_container(container):
+    """Replace the encodable object columns of container by their codes."""
+    if container is None or len(container) == 0:
+        return container, frozenset()
+    codes = OrderedDict()
+    for col in container.columns[(container.dtypes == object).values]:
+        col_codes = VALUE_DICTIONARY.encode(container[col].values)
+        if col_codes is not None:
+            codes[col] = col_codes
+    if len(codes) == 0:
+        return container, frozenset()
+    return _replace_columns(container, codes), frozenset(codes)
+
+
+def _decode_container(container, encoded_columns):
+    if container is None or len(encoded_columns) == 0:
+        return container
+    return _replace_columns(container, {
+        c: VALUE_DICTIONARY.decode(container[c].values)
+        for c in container.columns if c in encoded_columns
+    })
+
+
+def _positional_encoded_columns(container, encoded_columns, offset=0):
+    return frozenset(
+        i + offset for i, c in enumerate(container.columns)
+        if c in encoded_columns
+    )
+
+
+class _ContainerEncoding:
+    def __init__(self, container, encoded_columns):
+        self.container = container
+        self.encoded_columns = set(encoded_columns)
+        self.decoded_columns = set()
+        self.new_columns = dict()
+
+    def encode(self, column):
+        if (
+            column in self.decoded_columns or
+            self.container[column].dtype != object
+        ):
+            return False
+        codes = VALUE_DICTIONARY.encode(self.container[column].values)
+        if codes is None:
+            return False
+        self.new_columns[column] = codes
+        self.encoded_columns.add(column)
+        return True
+
+    def decode(self, column):
+        if column in self.new_columns:
+            del self.new_columns[column]
+        else:
+            self.new_columns[column] = VALUE_DICTIONARY.decode(
+                self.container[column].values
+            )
+        self.encoded_columns.discard(column)
+        self.decoded_columns.add(column)
+
+    def result(self):
+        container = self.container
+        if len(self.new_columns) > 0:
+            container = _replace_columns(container, self.new_columns)
+        return container, frozenset(self.encoded_columns)
+
+
+def _align_encodings(left, left_encoded, right, right_encoded, pairs):
+    """
+    Make the encoding of each pair of (left, right) columns agree,
+    encoding the plain object column of the pair where possible and
+    decoding the encoded one otherwise.
+    """
+    left = _ContainerEncoding(left, left_encoded)
+    right = _ContainerEncoding(right, right_encoded)
+    pending = True
+    while pending:
+        pending = False
+        for left_col, right_col in pairs:
+            left_is_encoded = left_col in left.encoded_columns
+            if left_is_encoded == (right_col in right.encoded_columns):
+                continue
+            pending = True
+            if left_is_encoded:
+                if not right.encode(right_col):
+                    left.decode(left_col)
+            elif not left.encode(left_col):
+                right.decode(right_col)
+    return left.result() + right.result()
+
+
+def _merge_compatible_containers(left, right):
+    """
+    Cast to object the columns with the same name whose dtypes differ,
+    as pandas refuses to merge e.g. object and numeric columns.
+    """
+    mismatched = [
+        c for c in left.columns
+        if c in right.columns and left[c].dtype != right[c].dtype
+    ]
+    if len(mismatched) > 0:
+        left = left.astype({c: object for c in mismatched})
+        right = right.astype({c: object for c in mismatched})
+    return left, right
+
+
+def _cross_product_containers(left, right):
+    left_rows = np.repeat(np.arange(len(left)), len(right))
+    right_rows = np.tile(np.arange(len(right)), len(left))
+    left = left.iloc[left_rows]
+    left.index = pd.RangeIndex(len(left_rows))
+    right = right.iloc[right_rows]
+    right.index = left.index
+    return pd.concat([left, right], axis=1)
+
+
+def _row_keys(arrays, sizes):
+    """
+    Integer keys of the rows of 2D arrays of codes with the same columns,
+    equal for equal rows across arrays. ``sizes`` bounds the codes of
+    each column, which are combined as digits of a mixed radix number
+    as long as it fits 62 bits, and refactorized otherwise.
+    """
+    keys = [np.zeros(len(a), dtype=np.int64) for a in arrays]
+    bound = 1
+    for column, size in enumerate(sizes):
+        if bound * size >= 2 ** 62:
+            labels, uniques = pd.factorize(np.concatenate(keys))
+            keys = np.split(labels, np.cumsum([len(k) for k in keys])[:-1])
+            bound = len(uniques)
+        keys = [
+            key * size + array[:, column]
+            for key, array in zip(keys, arrays)
+        ]
+        bound *= size
+    return keys
+
+
+def _rows_with_match(left, right, columns):
+    """
+    Boolean mask of the rows of the ``left`` container whose values on
+    ``columns`` appear in some row of the ``right`` container, obtained
+    by hashing the integer keys of the rows of both on those columns.
+    """
+    codes = ([], [])
+    sizes = []
+    for column in columns:
+        values = [left[column].values, right[column].values]
+        labels, uniques = pd.factorize(np.concatenate(values))
+        codes[0].append(labels[:len(left)])
+        codes[1].append(labels[len(left):])
+        sizes.append(len(uniques))
+    left_keys, right_keys = _row_keys(
+        [np.column_stack(c) for c in codes], sizes
+    )
+    return pd.Index(left_keys).isin(right_keys)
+
+
+def _generic_join_codes(relations, order, sizes):
+    """
+    Generic join [1]_ of relations given as pairs of column tuples and 2D
+    arrays of codes, those of column ``c`` lower than ``sizes[c]``,
+    binding the columns in ``order`` one at a time. Every binding is
+    extended through the relation with fewest candidate values for it,
+    which are then intersected with those of the other relations
+    containing the column, hence intermediate results never exceed the
+    worst-case size of the output.
+
+    .. [1] H. Q. Ngo, C. Ré, A. Rudra, Skew strikes back: new developments
+       in the theory of join algorithms. SIGMOD Rec. 42, 5–16 (2014).
+    """
+    bindings = np.empty((1, 0), dtype=np.int64)
+    bound = []
+    for column in order:
+        prefixes = []
+        for relation_columns, codes in relations:
+            if column not in relation_columns:
+                continue
+            position = relation_columns.index(column)
+            prefix_sizes = [sizes[c] for c in relation_columns[:position + 1]]
+            prefix = codes[:, :position + 1]
+            prefix_keys, = _row_keys([prefix], prefix_sizes)
+            prefix = prefix[~pd.Series(prefix_keys).duplicated().values]
+            key_positions = [
+                bound.index(c) for c in relation_columns[:position]
+            ]
+            binding_keys, prefix_keys = _row_keys(
+                [bindings[:, key_positions], prefix[:, :-1]],
+                prefix_sizes[:-1]
+            )
+            sort = np.argsort(prefix_keys, kind='stable')
+            prefix = prefix[sort]
+            prefix_keys = prefix_keys[sort]
+            low = np.searchsorted(prefix_keys, binding_keys, side='left')
+            high = np.searchsorted(prefix_keys, binding_keys, side='right')
+            prefixes.append((prefix, prefix_sizes, key_positions, low, high))
+
+        chosen = np.argmin(
+            np.column_stack([high - low for *_, low, high in prefixes]),
+            axis=1
+        )
+        new_bindings = []
+        for i, (prefix, _, _, low, high) in enumerate(prefixes):
+            rows = np.flatnonzero(chosen == i)
+            counts = high[rows] - low[rows]
+            offsets = np.cumsum(counts) - counts
+            positions = (
+                np.repeat(low[rows] - offsets, counts) +
+                np.arange(counts.sum())
+            )
+            candidates = np.column_stack((
+                bindings[np.repeat(rows, counts)], prefix[positions, -1]
+            ))
+            for j, (other, other_sizes, key_positions, _, _) in enumerate(
+                prefixes
+            ):
+                if i == j or len(candidates) == 0:
+                    continue
+                candidate_keys, other_keys = _row_keys(
+                    [candidates[:, key_positions + [len(bound)]], other],
+                    other_sizes
+                )
+                candidates = candidates[
+                    pd.Index(other_keys).get_indexer(candidate_keys) >= 0
+                ]
+            new_bindings.append(candidates)
+        bindings = np.concatenate(new_bindings)
+        bound.append(column)
+        if len(bindings) == 0:
+            break
+    return bindings
+
+
+def _keep_column_types(new_container, reference, skip=None):
+    if skip is None:
+        skip = {}
+    for col in new_container.columns:
+        if col in skip:
+            continue
+        if (
+            col in reference.columns and
+            new_container[col].dtype != reference[col].dtype
+        ):
+            new_container[col] = new_container[col].astype(
+                reference[col].dtype
+            )
+
+
+_deferred_evaluation = dict()
+_deferred_evaluation_lock = Lock()
+
+
+@contextmanager
+def deferred_evaluation():
+    """
+    Context in which projections, renames, natural joins, cross products
+    and unions of :py:class:`NamedRelationalAlgebraFrozenSet` instances
+    are recorded in a plan instead of being computed.
+
+    Consecutive projections and renames are fused, and projections are
+    pushed through joins and unions, before the plan is run. This
+    happens once, when the contents of the resulting set are first
+    needed, and duplicates are dropped only then.
+    """
+    thread_id = get_ident()
+    with _deferred_evaluation_lock:
+        n = _deferred_evaluation.get(thread_id, 0)
+        _deferred_evaluation[thread_id] = n + 1
+    try:
+        yield
+    finally:
+        with _deferred_evaluation_lock:
+            _deferred_evaluation[thread_id] -= 1
+            if _deferred_evaluation[thread_id] == 0:
+                del _deferred_evaluation[thread_id]
+
+
+def _is_deferred_evaluation():
+    return get_ident() in _deferred_evaluation
+
+
+class _Plan:
+    """Node of a deferred evaluation plan, its result is computed once."""
+    def __init__(self, columns, might_have_duplicates):
+        self.columns = tuple(columns)
+        self.might_have_duplicates = might_have_duplicates
+        self._result = None
+
+    def result(self):
+        """Container and encoded columns resulting from the plan."""
+        if self._result is None:
+            self._result = self.execute()
+        return self._result
+
+    def execute(self):
+        raise NotImplementedError()
+
+
+class _ScanPlan(_Plan):
+    def __init__(self, relation):
+        super().__init__(
+            relation.columns, relation._might_have_duplicates
+        )
+        self.relation = relation
+
+    def execute(self):
+        return self.relation._container, self.relation._encoded_columns
+
+
+class _MapPlan(_Plan):
+    """Projection of the child columns followed by their renaming."""
+    def __init__(self, child, mapping):
+        super().__init__(
+            mapping,
+            child.might_have_duplicates or
+            len(mapping) < len(child.columns)
+        )
+        self.child = child
+        self.mapping = mapping
+
+    def execute(self):
+        container, encoded_columns = self.child.result()
+        new_container = container[list(self.mapping.values())]
+        new_container.columns = self.columns
+        return new_container, frozenset(
+            dst for dst, src in self.mapping.items()
+            if src in encoded_columns
+        )
+
+
+class _JoinPlan(_Plan):
+    """Natural join, or cross product if there are no common columns."""
+    def __init__(self, left, right):
+        self.on = tuple(c for c in left.columns if c in right.columns)
+        super().__init__(
+            left.columns + tuple(
+                c for c in right.columns if c not in self.on
+            ),
+            left.might_have_duplicates or right.might_have_duplicates
+        )
+        self.left = left
+        self.right = right
+
+    def execute(self):
+        left, left_encoded = self.left.result()
+        right, right_encoded = self.right.result()
+        if len(self.on) == 0:
+            return (
+                _cross_product_containers(left, right),
+                left_encoded | right_encoded
+            )
+        left, left_encoded, right, right_encoded = _align_encodings(
+            left, left_encoded, right, right_encoded,
+            [(c, c) for c in self.on]
+        )
+        return (
+            left.merge(right, on=list(self.on)),
+            left_encoded | right_encoded
+        )
+
+
+class _UnionPlan(_Plan):
+    def __init__(self, left, right):
+        super().__init__(left.columns, True)
+        self.left = left
+        self.right = right
+
+    def execute(self):
+        left, left_encoded = self.left.result()
+        right, right_encoded = self.right.result()
+        left, left_encoded, right, right_encoded = _align_encodings(
+            left, left_encoded, right, right_encoded,
+            [(c, c) for c in self.columns]
+        )
+        right = right[list(left.columns)]
+        if len(right) == 0:
+            return left, left_encoded
+        if len(left) == 0:
+            return right, left_encoded
+        new_container = pd.concat([left, right], ignore_index=True)
+        _keep_column_types(new_container, left)
+        return new_container, left_encoded
+
+
+def _plan_of(relation):
+    if relation._plan is not None:
+        return relation._plan
+    return _ScanPlan(relation)
+
+
+def _map_plan(child, mapping):
+    """
+    Plan projecting and renaming the columns of the child as specified
+    by the ordered ``{destination: source}`` mapping, fused with the
+    child plan when possible.
+    """
+    if tuple(mapping.items()) == tuple((c, c) for c in child.columns):
+        return child
+    if child._result is not None:
+        return _MapPlan(child, mapping)
+    if isinstance(child, _MapPlan):
+        return _map_plan(child.child, OrderedDict(
+            (dst, child.mapping[src]) for dst, src in mapping.items()
+        ))
+    if isinstance(child, _UnionPlan):
+        return _UnionPlan(
+            _map_plan(child.left, mapping), _map_plan(child.right, mapping)
+        )
+    if isinstance(child, _JoinPlan) and len(mapping) < len(child.columns):
+        needed = set(mapping.values()) | set(child.on)
+        child = _JoinPlan(*(
+            _map_plan(side, OrderedDict(
+                (c, c) for c in side.columns if c in needed
+            ))
+            for side in (child.left, child.right)
+        ))
+    return _MapPlan(child, mapping)
+
+
 class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
+    """
+    Relational algebra set backed by a pandas DataFrame. Object columns
+    are stored as integer codes of the process-wide ``VALUE_DICTIONARY``
+    and only decoded when values are exposed to the caller.
+    """
     def __init__(self, iterable=None):
         self._container = None
+        self._encoded_columns = frozenset()
         self._might_have_duplicates = True
+        self._invalidate_hash_indexes()
         if iterable is not None:
             if isinstance(iterable, RelationalAlgebraFrozenSet):
                 self._container = iterable._container
+                self._encoded_columns = iterable._encoded_columns
             elif isinstance(iterable, pd.DataFrame):
-                self._container = iterable.copy()
+                self._set_decoded_container(iterable.copy())
             else:
-                self._container = pd.DataFrame(iterable)
+                self._set_decoded_container(pd.DataFrame(iterable))
+
+    def _set_decoded_container(self, container):
+        self._container, self._encoded_columns = _encode_container(container)
+
+    def _decoded_container(self, container=None):
+        if container is None:
+            container = self._container
+        return _decode_container(container, self._encoded_columns)
+
+    def _evaluate_string_expression(self, expression, values=None):
+        """
+        Array of the values of the string expression on the rows of
+        the set, evaluating only the columns it reads.
+        """
+        if values is None:
+            values = _DecodedColumns(self._container, self._encoded_columns)
+        compiled = _STRING_EXPRESSION_COMPILER.compile(expression)
+        if compiled is None:
+            return self._decoded_container().eval(
+                str(expression), engine='python'
+            )
+        evaluate, _ = compiled
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return evaluate(values, len(self._container))
+
+    def _decoded_column(self, column):
+        values = self._container[column]
+        if column in self._encoded_columns:
+            values = pd.Series(
+                VALUE_DICTIONARY.decode(values.values),
+                index=values.index, name=column
+            )
+        return values
+
+    def _column_equals(self, column, value):
+        if column in self._encoded_columns:
+            try:
+                code = VALUE_DICTIONARY.lookup(value)
+            except TypeError:
+                return self._decoded_column(column) == value
+            if code is None:
+                return pd.Series(False, index=self._container.index)
+            value = code
+        return self._container[column] == value
+
+    def _encode_element(self, element, columns=None):
+        """
+        Element as stored in the container or ``None`` if one of its
+        values was never encoded, hence it can not be in the set.
+        """
+        if len(self._encoded_columns) == 0:
+            return element
+        if columns is None:
+            columns = self._container.columns
+        encoded = []
+        for e, c in zip(element, columns):
+            if c in self._encoded_columns:
+                try:
+                    e = VALUE_DICTIONARY.lookup(e)
+                except TypeError:
+                    return None
+                if e is None:
+                    return None
+            encoded.append(e)
+        return tuple(encoded)
+
+    def _aligned_containers(self, other, pairs=None):
+        if pairs is None:
+            pairs = [
+                (c, c) for c in self._container.columns
+                if c in other._container.columns
+            ]
+        return _align_encodings(
+            self._container, self._encoded_columns,
+            other._container, other._encoded_columns,
+            pairs
+        )
+
+    def _invalidate_hash_indexes(self):
+        self._hash_indexes = dict()
+        self._hash_index_lookups = dict()
+        self._hash_indexed_container = None
+        self._hash_indexed_length = 0
+
+    def _hash_index(self, columns):
+        """
+        Lazily built index mapping the values of ``columns`` to the
+        positions of the rows holding them, or ``None`` if the columns
+        can not be hashed or were not yet looked up
+        ``_HASH_INDEX_MIN_LOOKUPS`` times on the current container.
+        Single columns are keyed by value, several columns by tuples
+        of values.
+        """
+        if (
+            self._hash_indexed_container is not self._container or
+            self._hash_indexed_length != len(self._container)
+        ):
+            self._hash_indexes = dict()
+            self._hash_index_lookups = dict()
+            self._hash_indexed_container = self._container
+            self._hash_indexed_length = len(self._container)
+        columns = tuple(columns)
+        if columns not in self._hash_indexes:
+            lookups = self._hash_index_lookups.get(columns, 0) + 1
+            self._hash_index_lookups[columns] = lookups
+            if lookups < _HASH_INDEX_MIN_LOOKUPS:
+                return None
+            by = columns[0] if len(columns) == 1 else list(columns)
+            try:
+                index = self._container.groupby(by=by, sort=False).indices
+            except TypeError:
+                index = None
+            self._hash_indexes[columns] = index
+        return self._hash_indexes[columns]
+
+    def _hash_index_lookup(self, columns, values):
+        index = self._hash_index(columns)
+        if index is None:
+            return None
+        if len(values) == 1:
+            values = values[0]
+        try:
+            return index.get(values, _NO_ROWS)
+        except TypeError:
+            return None
 
     def _drop_duplicates_if_needed(self):
         if self._might_have_duplicates:
@@ -49,6 +1115,7 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
             )
         output = cls()
         output._container = other._container
+        output._encoded_columns = other._encoded_columns
         return output
 
     @classmethod
@@ -87,8 +1154,14 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
         ):
             res = False
         else:
+            element = self._encode_element(element)
+            if element is None:
+                return False
+            rows = self._hash_index_lookup(self._container.columns, element)
+            if rows is not None:
+                return len(rows) > 0
             col = True
-            for e, c in zip(element, self._container.iteritems()):
+            for e, c in zip(element, self._container.items()):
                 col = col & (c[1] == e)
             res = col.any()
         return res
@@ -117,7 +1190,8 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
     def fetch_one(self):
         if self.is_dee():
             return tuple()
-        return next(self._container.itertuples(name=None, index=False))
+        container = self._decoded_container(self._container.iloc[:1])
+        return next(container.itertuples(name=None, index=False))
 
     def __len__(self):
         if self._container is None:
@@ -143,12 +1217,12 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
         return self._container.columns
 
     def as_numpy_array(self):
-        res = self._container.values.view()
+        res = self._decoded_container().values.view()
         res.setflags(write=False)
         return res
 
     def as_pandas_dataframe(self):
-        return self._container
+        return self._decoded_container()
 
     def _empty_set_same_structure(self):
         return type(self)()
@@ -160,50 +1234,86 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
         new_container.columns = pd.RangeIndex(len(columns))
         output = self._empty_set_same_structure()
         output._container = new_container
+        output._encoded_columns = frozenset(
+            i for i, c in enumerate(columns) if c in self._encoded_columns
+        )
         return output
 
     def selection(self, select_criteria):
         if self.is_empty():
             return self._empty_set_same_structure()
 
-        if callable(select_criteria):
-            ix = self._container.apply(select_criteria, axis=1)
+        new_container = None
+        if isinstance(select_criteria, RelationalAlgebraColumnFunction):
+            ix = select_criteria.evaluate(
+                _DecodedColumns(self._container, self._encoded_columns),
+                len(self._container)
+            )
+        elif callable(select_criteria):
+            ix = self._decoded_container().apply(select_criteria, axis=1)
         elif isinstance(select_criteria, RelationalAlgebraStringExpression):
-            ix = self._container.eval(select_criteria)
+            ix = self._evaluate_string_expression(select_criteria)
         else:
-            ix = self._selection_dict(select_criteria)
-        ix = ix.astype(bool)
-        new_container = self._container[ix]
+            new_container = self._selection_hash_index(select_criteria)
+            if new_container is None:
+                ix = self._selection_dict(select_criteria)
+        if new_container is None:
+            ix = ix.astype(bool)
+            new_container = self._container[ix]
 
         output = self._empty_set_same_structure()
         output._container = new_container
+        output._encoded_columns = self._encoded_columns
         return output
 
+    def _selection_hash_index(self, select_criteria):
+        if any(callable(value) for value in select_criteria.values()):
+            return None
+        columns = tuple(select_criteria)
+        element = self._encode_element(
+            tuple(select_criteria.values()), columns
+        )
+        if element is None:
+            return self._container.iloc[:0]
+        rows = self._hash_index_lookup(columns, element)
+        if rows is None:
+            return None
+        return self._container.iloc[rows]
+
     def _selection_dict(self, select_criteria):
         it = iter(select_criteria.items())
         col, value = next(it)
-        ix = self._container[col] == value
+        ix = self._column_equals(col, value)
         for col, value in it:
             if callable(value):
-                selector = self._container[col].apply(value)
+                selector = self._decoded_column(col).apply(value)
             else:
-                selector = self._container[col] == value
+                selector = self._column_equals(col, value)
             ix &= selector
         return ix
 
+    def _columns_equal(self, col1, col2):
+        if (
+            (col1 in self._encoded_columns) ==
+            (col2 in self._encoded_columns)
+        ):
+            return self._container[col1] == self._container[col2]
+        return self._decoded_column(col1) == self._decoded_column(col2)
+
     def selection_columns(self, select_criteria):
         if self.is_empty():
             return self._empty_set_same_structure()
         it = iter(select_criteria.items())
         col1, col2 = next(it)
-        ix = self._container[col1] == self._container[col2]
+        ix = self._columns_equal(col1, col2)
         for col1, col2 in it:
-            ix &= self._container[col1] == self._container[col2]
+            ix &= self._columns_equal(col1, col2)
 
         new_container = self._container[ix]
 
         output = self._empty_set_same_structure()
         output._container = new_container
+        output._encoded_columns = self._encoded_columns
         return output
 
     def equijoin(self, other, join_indices, return_mappings=False):
@@ -212,19 +1322,27 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
             return res
         if self.is_empty() or other.is_empty():
             return self._empty_set_same_structure()
+        left_on, right_on = zip(*join_indices)
+        scont, sencoded, ocont, oencoded = self._aligned_containers(
+            other, join_indices
+        )
+        encoded_columns = (
+            _positional_encoded_columns(scont, sencoded) |
+            _positional_encoded_columns(ocont, oencoded, self.arity)
+        )
         other_columns = range(
             self.arity, other._container.shape[1] + self.arity
         )
-        ocont = other._container.copy(deep=False)
+        ocont = ocont.copy(deep=False)
         ocont.columns = other_columns
-        left_on, right_on = zip(*join_indices)
         left_on = list(left_on)
         right_on = list(l + self.arity for l in right_on)
-        new_container = self._container.merge(
+        new_container = scont.merge(
             ocont, left_on=left_on, right_on=right_on, sort=False
         )
         output = self._empty_set_same_structure()
         output._container = new_container
+        output._encoded_columns = encoded_columns
         output._might_have_duplicates = (
             self._might_have_duplicates |
             other._might_have_duplicates
@@ -237,16 +1355,20 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
             return res
         if self.is_empty() or other.is_empty():
             return self._empty_set_same_structure()
-        left = self._container.copy(deep=False)
-        right = other._container.copy(deep=False)
-        tmpcol = str(uuid1())
-        left[tmpcol] = 1
-        right[tmpcol] = 1
-        new_container = pd.merge(left, right, on=tmpcol)
-        del new_container[tmpcol]
+        new_container = _cross_product_containers(
+            self._container, other._container
+        )
         new_container.columns = range(new_container.shape[1])
         output = self._empty_set_same_structure()
         output._container = new_container
+        output._encoded_columns = (
+            _positional_encoded_columns(
+                self._container, self._encoded_columns
+            ) |
+            _positional_encoded_columns(
+                other._container, other._encoded_columns, self.arity
+            )
+        )
         output._might_have_duplicates = (
             self._might_have_duplicates |
             other._might_have_duplicates
@@ -257,12 +1379,15 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
         output = self._empty_set_same_structure()
         if len(self) > 0:
             output._container = self._container.copy()
+            output._encoded_columns = self._encoded_columns
         return output
 
     def __repr__(self):
         if self.is_empty():
             return "{}"
-        return repr(self._container.reset_index().drop("index", axis=1))
+        return repr(
+            self._decoded_container().reset_index().drop("index", axis=1)
+        )
 
     def __or__(self, other):
         if self is other:
@@ -271,14 +1396,15 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
             res = self._dee_dum_sum(other)
             if res is not None:
                 return res
-            ocont = other._container
+            scont, encoded, ocont, _ = self._aligned_containers(other)
             new_container = pd.merge(
-                left=self._container,
+                left=scont,
                 right=ocont,
                 how="outer",
             )
             output = self._empty_set_same_structure()
             output._container = new_container
+            output._encoded_columns = encoded
             return output
         else:
             return super().__or__(other)
@@ -290,13 +1416,15 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
             res = self._dee_dum_product(other)
             if res is not None:
                 return res
+            scont, encoded, ocont, _ = self._aligned_containers(other)
             new_container = pd.merge(
-                left=self._container,
-                right=other._container,
+                left=scont,
+                right=ocont,
                 how="inner",
             )
             output = self._empty_set_same_structure()
             output._container = new_container
+            output._encoded_columns = encoded
             output._might_have_duplicates = (
                 self._might_have_duplicates |
                 other._might_have_duplicates
@@ -305,6 +1433,27 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
         else:
             return super().__and__(other)
 
+    def __sub__(self, other):
+        if (
+            isinstance(other, RelationalAlgebraFrozenSet) and
+            self.arity == other.arity
+        ):
+            if self.is_empty() or other.is_empty():
+                return self.copy()
+            if self.arity == 0:
+                return self.dum()
+            scont, encoded, ocont, _ = self._aligned_containers(other)
+            new_container = scont[
+                ~_rows_with_match(scont, ocont, list(scont.columns))
+            ]
+            output = self._empty_set_same_structure()
+            output._container = new_container
+            output._encoded_columns = encoded
+            output._might_have_duplicates = self._might_have_duplicates
+            return output
+        else:
+            return super().__sub__(other)
+
     def __eq__(self, other):
         if isinstance(other, type(self)):
             scont = self._container
@@ -316,6 +1465,7 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
             elif self.arity == 0 and self.arity == 0:
                 res = self.is_dee() and other.is_dee()
             elif scont is not None and ocont is not None:
+                scont, _, ocont, _ = self._aligned_containers(other)
                 intersection_dups = scont.merge(
                     ocont, how='outer', indicator=True
                 ).iloc[:, -1]
@@ -326,20 +1476,31 @@ class RelationalAlgebraFrozenSet(abc.RelationalAlgebraFrozenSet):
         else:
             return super().__eq__(other)
 
+    def _groupby_keys(self, columns):
+        return [
+            self._decoded_column(c) if c in self._encoded_columns else c
+            for c in columns
+        ]
+
     def groupby(self, columns):
         if not self.is_empty():
             if not isinstance(columns, Iterable):
                 columns = [columns]
-            for g_id, group in self._container.groupby(by=list(columns)):
+            groups = self._container.groupby(by=self._groupby_keys(columns))
+            for g_id, group in groups:
                 group_set = self._empty_set_same_structure()
                 group_set._container = group
+                group_set._encoded_columns = self._encoded_columns
                 yield g_id, group_set
 
     def itervalues(self):
         if self.is_empty():
             return iter([])
         else:
-            return iter(self._container.itertuples(name=None, index=False))
+            return iter(
+                self._decoded_container()
+                .itertuples(name=None, index=False)
+            )
 
     def __hash__(self):
         self._drop_duplicates_if_needed()
@@ -361,10 +1522,13 @@ class NamedRelationalAlgebraFrozenSet(
         # ensure there is no duplicated column
         self._check_for_duplicated_columns(columns)
         self._columns = tuple(columns)
+        self._plan = None
         self._might_have_duplicates = True
+        self._invalidate_hash_indexes()
         if iterable is None:
             iterable = []
 
+        self._encoded_columns = frozenset()
         if isinstance(iterable, NamedRelationalAlgebraFrozenSet):
             self._initialize_from_named_ra_set(iterable)
             self._might_have_duplicates = iterable._might_have_duplicates
@@ -372,12 +1536,13 @@ class NamedRelationalAlgebraFrozenSet(
             self._initialize_from_unnamed_ra_set(iterable)
             self._might_have_duplicates = iterable._might_have_duplicates
         elif isinstance(iterable, pd.DataFrame):
-            self._container = iterable.copy()
-            self._container.columns = self._columns
+            container = iterable.copy()
+            container.columns = self._columns
+            self._set_decoded_container(container)
         else:
-            self._container = pd.DataFrame(
+            self._set_decoded_container(pd.DataFrame(
                 iterable, columns=self._columns
-            )
+            ))
 
     def _initialize_from_named_ra_set(self, other):
         if (
@@ -389,6 +1554,7 @@ class NamedRelationalAlgebraFrozenSet(
         if not other.is_empty():
             self._container = other._container[list(other.columns
                                                     )].copy(deep=False)
+            self._encoded_columns = other._encoded_columns
         else:
             self._container = pd.DataFrame(columns=self._columns)
 
@@ -398,8 +1564,12 @@ class NamedRelationalAlgebraFrozenSet(
         else:
             if self.arity != other.arity:
                 raise ValueError("Relations must have the same arity")
+            renames = dict(zip(other._container.columns, self._columns))
             self._container = other._container.copy(deep=False)
             self._container.columns = self._columns
+            self._encoded_columns = frozenset(
+                renames[c] for c in other._encoded_columns
+            )
 
     @staticmethod
     def _check_for_duplicated_columns(columns):
@@ -419,6 +1589,7 @@ class NamedRelationalAlgebraFrozenSet(
             )
         output = cls(columns=tuple())
         output._container = other._container
+        output._encoded_columns = other._encoded_columns
         output._columns = other._columns
         output._might_have_duplicates = other._might_have_duplicates
         return output
@@ -439,15 +1610,74 @@ class NamedRelationalAlgebraFrozenSet(
     def _light_init_same_structure(
         self, container,
         might_have_duplicates=True,
-        columns=None
+        columns=None,
+        encoded_columns=None
     ):
         if columns is None:
             columns = self.columns
+        if encoded_columns is None:
+            encoded_columns = self._encoded_columns
         output = type(self)(columns)
         output._container = container
+        output._encoded_columns = frozenset(
+            c for c in encoded_columns if c in columns
+        )
         output._might_have_duplicates = might_have_duplicates
         return output
 
+    @property
+    def _container(self):
+        if self._plan is not None:
+            self._materialize()
+        return self._materialized_container
+
+    @_container.setter
+    def _container(self, container):
+        self._plan = None
+        self._materialized_container = container
+
+    @property
+    def _encoded_columns(self):
+        if self._plan is not None:
+            self._materialize()
+        return self._materialized_encoded_columns
+
+    @_encoded_columns.setter
+    def _encoded_columns(self, encoded_columns):
+        self._materialized_encoded_columns = encoded_columns
+
+    def _materialize(self):
+        container, encoded_columns = self._plan.result()
+        self._container = container
+        self._encoded_columns = encoded_columns
+
+    def is_deferred(self):
+        return self._plan is not None
+
+    def _can_defer(self, other=None):
+        return (
+            _is_deferred_evaluation() and self.arity > 0 and
+            (
+                other is None or (
+                    isinstance(other, NamedRelationalAlgebraFrozenSet) and
+                    other.arity > 0
+                )
+            )
+        )
+
+    def _deferred(self, plan):
+        output = type(self)(plan.columns)
+        output._plan = plan
+        output._might_have_duplicates = plan.might_have_duplicates
+        return output
+
+    def _deferred_map(self, mapping):
+        mapping = tuple(mapping)
+        self._check_for_duplicated_columns(tuple(dst for dst, _ in mapping))
+        return self._deferred(
+            _map_plan(_plan_of(self), OrderedDict(mapping))
+        )
+
     @property
     def columns(self):
         return self._columns
@@ -462,6 +1692,11 @@ class NamedRelationalAlgebraFrozenSet(
         return super().__contains__(element)
 
     def projection(self, *columns):
+        if (
+            self._can_defer() and len(columns) > 0 and
+            all(c in self._columns for c in columns)
+        ):
+            return self._deferred_map((c, c) for c in columns)
         if self.is_empty():
             return type(self)(columns)
         if self.arity == 0:
@@ -483,6 +1718,8 @@ class NamedRelationalAlgebraFrozenSet(
         raise NotImplementedError()
 
     def naturaljoin(self, other):
+        if self._can_defer(other):
+            return self._deferred(_JoinPlan(_plan_of(self), _plan_of(other)))
         res = self._dee_dum_product(other)
         if res is not None:
             return res
@@ -495,17 +1732,123 @@ class NamedRelationalAlgebraFrozenSet(
             c for c in other.columns if c not in self.columns
         )
 
-        new_container = self._container.merge(other._container)
+        scont, sencoded, ocont, oencoded = self._aligned_containers(
+            other, [(c, c) for c in on]
+        )
+        new_container = scont.merge(ocont)
         return self._light_init_same_structure(
             new_container,
             might_have_duplicates=(
                 self._might_have_duplicates |
                 other._might_have_duplicates
             ),
-            columns=new_columns
+            columns=new_columns,
+            encoded_columns=sencoded | oencoded
+        )
+
+    def multiwayjoin(self, *others):
+        relations = (self,) + others
+        columns = tuple()
+        for relation in relations:
+            columns += tuple(c for c in relation.columns if c not in columns)
+        if any(relation.is_empty() for relation in relations):
+            return type(self)(columns)
+        relations = [relation for relation in relations if relation.arity > 0]
+        if len(relations) == 0:
+            return self
+        elif len(relations) == 1:
+            return relations[0]
+
+        order = sorted(
+            columns,
+            key=lambda c: (
+                -sum(c in relation.columns for relation in relations),
+                columns.index(c)
+            )
+        )
+        uniques = dict()
+        encoded_columns = set()
+        relation_codes = [dict() for _ in relations]
+        for column in order:
+            holders = [
+                (i, relation) for i, relation in enumerate(relations)
+                if column in relation.columns
+            ]
+            if all(column in r._encoded_columns for _, r in holders):
+                encoded_columns.add(column)
+                values = [r._container[column].values for _, r in holders]
+            else:
+                values = [
+                    r._decoded_column(column).values for _, r in holders
+                ]
+            labels, uniques[column] = pd.factorize(np.concatenate(values))
+            labels = np.split(labels, np.cumsum([len(v) for v in values]))
+            for (i, _), codes in zip(holders, labels):
+                relation_codes[i][column] = codes
+
+        relations_as_codes = []
+        for codes in relation_codes:
+            relation_columns = tuple(c for c in order if c in codes)
+            relations_as_codes.append((
+                relation_columns,
+                np.column_stack([codes[c] for c in relation_columns])
+            ))
+        bindings = _generic_join_codes(
+            relations_as_codes, order,
+            {c: len(values) for c, values in uniques.items()}
+        )
+        if len(bindings) == 0:
+            return type(self)(columns)
+        new_container = pd.DataFrame(OrderedDict(
+            (c, uniques[c].take(bindings[:, order.index(c)]))
+            for c in columns
+        ))
+        return self._light_init_same_structure(
+            new_container,
+            might_have_duplicates=False,
+            columns=columns,
+            encoded_columns=encoded_columns
+        )
+
+    def semijoin(self, other):
+        return self._filter_by_match(other, True)
+
+    def antijoin(self, other):
+        return self._filter_by_match(other, False)
+
+    def _filter_by_match(self, other, keep_matching):
+        on = [c for c in self.columns if c in other.columns]
+        if len(on) == 0:
+            if other.is_empty() == keep_matching:
+                return type(self)(self.columns)
+            return self.copy()
+        if self.is_empty():
+            return self.copy()
+        if other.is_empty():
+            if keep_matching:
+                return type(self)(self.columns)
+            return self.copy()
+
+        scont, sencoded, ocont, _ = self._aligned_containers(
+            other, [(c, c) for c in on]
+        )
+        mask = _rows_with_match(scont, ocont, on)
+        if not keep_matching:
+            mask = ~mask
+        return self._light_init_same_structure(
+            scont[mask],
+            might_have_duplicates=self._might_have_duplicates,
+            encoded_columns=sencoded
         )
 
     def cross_product(self, other):
+        if self._can_defer(other):
+            if any(c in self._columns for c in other.columns):
+                raise ValueError(
+                    "Cross product with common columns "
+                    "is not valid"
+                )
+            return self._deferred(_JoinPlan(_plan_of(self), _plan_of(other)))
         res = self._dee_dum_product(other)
         if res is not None:
             return res.copy()
@@ -519,13 +1862,9 @@ class NamedRelationalAlgebraFrozenSet(
         if self.is_empty() or other.is_empty():
             res = type(self)(new_columns)
         else:
-            left = self._container.copy(deep=False)
-            right = other._container.copy(deep=False)
-            tmpcol = str(uuid1())
-            left[tmpcol] = 1
-            right[tmpcol] = 1
-            new_container = pd.merge(left, right, on=tmpcol)
-            del new_container[tmpcol]
+            new_container = _cross_product_containers(
+                self._container, other._container
+            )
             new_container.columns = (
                 tuple(self._container.columns) +
                 tuple(other._container.columns)
@@ -536,7 +1875,10 @@ class NamedRelationalAlgebraFrozenSet(
                     self._might_have_duplicates |
                     other._might_have_duplicates
                 ),
-                columns=new_columns
+                columns=new_columns,
+                encoded_columns=(
+                    self._encoded_columns | other._encoded_columns
+                )
             )
         return res
 
@@ -547,6 +1889,10 @@ class NamedRelationalAlgebraFrozenSet(
             return self
         if dst in self._columns:
             raise ValueError(f"{dst} cannot be in the columns")
+        if self._can_defer():
+            return self._deferred_map(
+                (dst if c == src else c, c) for c in self._columns
+            )
         src_idx = self._columns.index(src)
         new_columns = self._columns[:src_idx] + (dst,
                                                  ) + self._columns[src_idx +
@@ -555,7 +1901,13 @@ class NamedRelationalAlgebraFrozenSet(
         return self._light_init_same_structure(
             new_container,
             might_have_duplicates=self._might_have_duplicates,
-            columns=new_columns
+            columns=new_columns,
+            encoded_columns=self._renamed_encoded_columns({src: dst})
+        )
+
+    def _renamed_encoded_columns(self, renames):
+        return frozenset(
+            renames.get(c, c) for c in self._encoded_columns
         )
 
     def rename_columns(self, renames):
@@ -568,6 +1920,10 @@ class NamedRelationalAlgebraFrozenSet(
             raise ValueError(
                 f"Cannot rename non-existing columns: {not_found_cols}"
             )
+        if self._can_defer():
+            return self._deferred_map(
+                (renames.get(c, c), c) for c in self._columns
+            )
         new_columns = tuple(
             renames.get(col, col) for col in self._columns
         )
@@ -575,7 +1931,8 @@ class NamedRelationalAlgebraFrozenSet(
         return self._light_init_same_structure(
             new_container,
             might_have_duplicates=self._might_have_duplicates,
-            columns=new_columns
+            columns=new_columns,
+            encoded_columns=self._renamed_encoded_columns(renames)
         )
 
     def __eq__(self, other):
@@ -588,6 +1945,7 @@ class NamedRelationalAlgebraFrozenSet(
         elif len(scont.columns) == 0 and len(ocont.columns) == 0:
             res = len(scont) > 0 and len(ocont) > 0
         else:
+            scont, _, ocont, _ = self._aligned_containers(other)
             intersection_dups = scont.merge(
                 ocont, how='outer', indicator=True
             ).iloc[:, -1]
@@ -597,7 +1955,8 @@ class NamedRelationalAlgebraFrozenSet(
     def groupby(self, columns):
         if self.is_empty():
             return
-        for g_id, group in self._container.groupby(by=list(columns)):
+        groups = self._container.groupby(by=self._groupby_keys(columns))
+        for g_id, group in groups:
             group_set = self._light_init_same_structure(
                 group,
                 might_have_duplicates=self._might_have_duplicates,
@@ -610,18 +1969,36 @@ class NamedRelationalAlgebraFrozenSet(
         if len(set(group_columns)) < len(group_columns):
             raise ValueError("Cannot group on repeated columns")
         self._drop_duplicates_if_needed()
+        container = self._decoded_container()
         if len(group_columns) > 0:
-            groups = self._container.groupby(group_columns)
+            groups = container.groupby(group_columns)
         else:
-            groups = self._container.groupby(lambda x: 0)
+            groups = container.groupby(lambda x: 0)
 
         aggs, aggs_multi_column = self._classify_aggregations(
             group_columns, aggregate_function
         )
+        aggs_kernel = OrderedDict()
+        for dst, agg in aggs.items():
+            kernel = _aggregate_kernel(agg.aggfunc, container[agg.column])
+            if kernel is not None:
+                aggs_kernel[dst] = (agg.column, kernel)
+        if len(group_columns) > 0:
+            keys = [container[c] for c in group_columns]
+        else:
+            keys = np.zeros(len(container), dtype=int)
 
         new_containers = []
-        if len(aggs) > 0:
-            new_containers.append(groups.agg(**aggs))
+        aggs_groupby = OrderedDict(
+            (dst, agg) for dst, agg in aggs.items() if dst not in aggs_kernel
+        )
+        if len(aggs_groupby) > 0:
+            new_containers.append(groups.agg(**aggs_groupby))
+
+        for dst, (src, kernel) in aggs_kernel.items():
+            new_containers.append(
+                kernel(container[src], keys).rename(dst).to_frame()
+            )
 
         for dst, fun in aggs_multi_column.items():
             new_col = (
@@ -633,38 +2010,36 @@ class NamedRelationalAlgebraFrozenSet(
             new_containers.append(new_col)
 
         new_container = pd.concat(new_containers, axis=1)
+        if len(aggs_kernel) > 0:
+            new_container = new_container[
+                list(aggs) + list(aggs_multi_column)
+            ]
 
         if len(group_columns) > 0:
             new_container = new_container.reset_index()
 
         self._keep_column_types(
             new_container, set(aggs) |
-            set(aggs_multi_column)
+            set(aggs_multi_column),
+            reference=container
         )
+        new_container, encoded_columns = _encode_container(new_container)
 
         output = self._light_init_same_structure(
             new_container,
             might_have_duplicates=self._might_have_duplicates,
-            columns=list(new_container.columns)
+            columns=list(new_container.columns),
+            encoded_columns=encoded_columns
         )
         return output
 
-    def _keep_column_types(self, new_container, skip=None):
+    def _keep_column_types(self, new_container, skip=None, reference=None):
         if self.is_empty():
             return
 
-        if skip is None:
-            skip = {}
-        for col in new_container.columns:
-            if col in skip:
-                continue
-            if (
-                col in self._container.columns and
-                new_container[col].dtype != self._container[col].dtype
-            ):
-                new_container[col] = new_container[col].astype(
-                    self._container[col].dtype
-                )
+        if reference is None:
+            reference = self._container
+        _keep_column_types(new_container, reference, skip)
 
     def _classify_aggregations(self, group_columns, aggregate_function):
         aggs = OrderedDict()
@@ -703,27 +2078,57 @@ class NamedRelationalAlgebraFrozenSet(
             return NamedRelationalAlgebraFrozenSet(
                 columns=proj_columns, iterable=[],
             )
-        new_container = self._container.copy()
+        container = self._container
+        length = len(container)
+        values = _DecodedColumns(container, self._encoded_columns)
+        decoded_container = None
+        # columns copied untouched keep their codes instead of being
+        # encoded again
+        kept_codes = OrderedDict()
+        new_columns = OrderedDict()
         for dst_column, operation in eval_expressions.items():
+            if (
+                isinstance(operation, RelationalAlgebraStringExpression) and
+                str(operation) == str(dst_column)
+            ):
+                operation = RelationalAlgebraColumnStr(dst_column)
             if isinstance(operation, RelationalAlgebraStringExpression):
-                if str(operation) != str(dst_column):
-                    new_container = new_container.eval(
-                        "{}={}".format(str(dst_column), str(operation)),
-                        engine='python'
-                    )
+                new_columns[dst_column] = self._evaluate_string_expression(
+                    operation, values
+                )
             elif isinstance(operation, RelationalAlgebraColumn):
-                new_container[dst_column] = new_container[operation]
+                if operation in self._encoded_columns:
+                    kept_codes[dst_column] = operation
+                    new_columns[dst_column] = container[operation].values
+                else:
+                    new_columns[dst_column] = values[operation]
+            elif isinstance(operation, RelationalAlgebraColumnFunction):
+                new_columns[dst_column] = operation.evaluate(values, length)
             elif callable(operation):
-                new_container[dst_column] = new_container.apply(
+                if decoded_container is None:
+                    decoded_container = self._decoded_container()
+                new_columns[dst_column] = decoded_container.apply(
                     operation, axis=1
                 )
             else:
-                new_container[dst_column] = operation
-        new_container = new_container[proj_columns]
+                new_columns[dst_column] = operation
+        new_container = pd.DataFrame(
+            OrderedDict(
+                (
+                    c,
+                    v if isinstance(v, _ARRAY_TYPES)
+                    else _broadcast_value(v, length)
+                )
+                for c, v in new_columns.items()
+            ),
+            index=container.index, columns=proj_columns
+        )
+        new_container, encoded_columns = _encode_container(new_container)
         output = self._light_init_same_structure(
             new_container,
             might_have_duplicates=self._might_have_duplicates,
-            columns=proj_columns
+            columns=proj_columns,
+            encoded_columns=encoded_columns | frozenset(kept_codes)
         )
         return output
 
@@ -731,13 +2136,17 @@ class NamedRelationalAlgebraFrozenSet(
         self._drop_duplicates_if_needed()
         if self.is_dee():
             return iter([tuple()])
-        container = self._container[list(self.columns)]
+        container = self._decoded_container(
+            self._container[list(self.columns)]
+        )
         return container.itertuples(index=False, name="tuple")
 
     def fetch_one(self):
         if self.is_dee():
             return tuple()
-        container = self._container[list(self.columns)]
+        container = self._decoded_container(
+            self._container[list(self.columns)].iloc[:1]
+        )
         return next(container.itertuples(index=False, name="tuple"))
 
     def to_unnamed(self):
@@ -745,6 +2154,10 @@ class NamedRelationalAlgebraFrozenSet(
         container.columns = range(len(container.columns))
         output = RelationalAlgebraFrozenSet()
         output._container = container
+        output._encoded_columns = frozenset(
+            i for i, c in enumerate(self.columns)
+            if c in self._encoded_columns
+        )
         return output
 
     def __sub__(self, other):
@@ -765,8 +2178,10 @@ class NamedRelationalAlgebraFrozenSet(
             if other.is_dee():
                 return self.dum()
             return self.dee()
-        new_container = self._container.merge(
-            other._container,
+        other._drop_duplicates_if_needed()
+        scont, encoded, ocont, _ = self._aligned_containers(other)
+        new_container = scont.merge(
+            ocont,
             indicator=True,
             how='left'
         )
@@ -774,14 +2189,23 @@ class NamedRelationalAlgebraFrozenSet(
             new_container.iloc[:, -1] == 'left_only'
         ].iloc[:, :-1]
 
-        self._keep_column_types(new_container)
+        self._keep_column_types(new_container, reference=scont)
         output = self._light_init_same_structure(
             new_container,
             might_have_duplicates=self._might_have_duplicates,
+            encoded_columns=encoded
         )
         return output
 
     def __or__(self, other):
+        if self._can_defer(other):
+            if set(self.columns) != set(other.columns):
+                raise ValueError(
+                    "Union defined only for sets with the same columns"
+                )
+            return self._deferred(
+                _UnionPlan(_plan_of(self), _plan_of(other))
+            )
         res = self._dee_dum_sum(other)
         if res is not None:
             return res
@@ -789,16 +2213,18 @@ class NamedRelationalAlgebraFrozenSet(
             raise ValueError(
                 "Union defined only for sets with the same columns"
             )
+        scont, encoded, ocont, _ = self._aligned_containers(other)
         new_container = pd.merge(
-            left=self._container,
-            right=other._container,
+            left=scont,
+            right=ocont,
             how="outer",
         )
 
-        self._keep_column_types(new_container)
+        self._keep_column_types(new_container, reference=scont)
         output = self._light_init_same_structure(
             new_container,
             might_have_duplicates=True,
+            encoded_columns=encoded
         )
         return output
 
@@ -812,15 +2238,17 @@ class NamedRelationalAlgebraFrozenSet(
             )
         if self.is_empty():
             return self.copy()
+        scont, encoded, ocont, _ = self._aligned_containers(other)
         new_container = pd.merge(
-            left=self._container,
-            right=other._container,
+            left=scont,
+            right=ocont,
             how="inner",
         )
-        self._keep_column_types(new_container)
+        self._keep_column_types(new_container, reference=scont)
         output = self._light_init_same_structure(
             new_container,
             might_have_duplicates=self._might_have_duplicates,
+            encoded_columns=encoded
         )
         return output
 
@@ -843,21 +2271,50 @@ class RelationalAlgebraSet(
 ):
     def add(self, value):
         value = self._normalise_element(value)
-        e_hash = hash(value)
         if self.is_empty():
-            self._container = pd.DataFrame([value], index=[e_hash])
+            self._set_decoded_container(pd.DataFrame([value]))
+        elif RelationalAlgebraFrozenSet.__contains__(self, value):
+            return
         else:
-            self._container.loc[e_hash] = value
+            row = pd.DataFrame(
+                [self._encode_new_element(value)],
+                columns=self._container.columns
+            )
+            self._container = pd.concat(
+                [self._container, row], ignore_index=True
+            )
+        self._invalidate_hash_indexes()
+
+    def _encode_new_element(self, element):
+        if len(self._encoded_columns) == 0:
+            return element
+        encoded = []
+        for e, c in zip(element, self._container.columns):
+            if c in self._encoded_columns:
+                code = VALUE_DICTIONARY.code(e)
+                if code is None:
+                    self._container = _decode_container(
+                        self._container, {c}
+                    )
+                    self._encoded_columns = self._encoded_columns - {c}
+                else:
+                    e = code
+            encoded.append(e)
+        return encoded
 
     def discard(self, value):
         if not self.is_empty():
             try:
                 value = self._normalise_element(value)
+                value = self._encode_element(value)
+                if value is None:
+                    return
                 col = True
                 for e, c in zip(value, self._container.iteritems()):
                     col = col & (c[1] == e)
                 ix = self._container.index[col]
                 self._container.drop(index=ix, inplace=True)
+                self._invalidate_hash_indexes()
             except KeyError:
                 pass
 
@@ -867,19 +2324,21 @@ class RelationalAlgebraSet(
                 return self
             if self.is_empty():
                 self._container = other._container.copy()
+                self._encoded_columns = other._encoded_columns
                 self._might_have_duplicates = other._might_have_duplicates
+                self._invalidate_hash_indexes()
                 return self
             if other.arity != self.arity:
                 raise ValueError(
                     "Operation only valid for sets with the same arity"
                 )
-            new_container = pd.merge(
-                left=self._container,
-                right=other._container,
-                how="outer",
+            scont, encoded, ocont, _ = self._aligned_containers(other)
+            self._container = self._drop_duplicates(
+                pd.concat([scont, ocont], ignore_index=True)
             )
-            self._might_have_duplicates = True
-            self._container = new_container
+            self._encoded_columns = encoded
+            self._might_have_duplicates = False
+            self._invalidate_hash_indexes()
             return self
         else:
             return super().__ior__(other)
@@ -896,15 +2355,20 @@ class RelationalAlgebraSet(
                     "Operation only valid for sets with the same arity"
                 )
             else:
+                other._drop_duplicates_if_needed()
+                scont, encoded, ocont, _ = self._aligned_containers(other)
+                scont, ocont = _merge_compatible_containers(scont, ocont)
                 new_container = pd.merge(
-                    left=self._container,
-                    right=other._container,
+                    left=scont,
+                    right=ocont,
                     how="left",  indicator=True
                 )
                 new_container = new_container[
                     new_container.iloc[:, -1] == 'left_only'
                 ].iloc[:, :-1]
                 self._container = new_container
+                self._encoded_columns = encoded
+            self._invalidate_hash_indexes()
             return self
         else:
             return super().__isub__(other)
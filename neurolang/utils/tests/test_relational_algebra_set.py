@@ -1,9 +1,22 @@
+import numpy as np
 import pytest
 
 from ..relational_algebra_set import RelationalAlgebraStringExpression, pandas
 
+try:
+    from ..relational_algebra_set import arrow
+except ImportError:
+    arrow = None
 
-@pytest.fixture(ids=['pandas'], params=[(pandas,)])
+ra_modules = [('pandas', pandas)]
+if arrow is not None:
+    ra_modules.append(('arrow', arrow))
+
+
+@pytest.fixture(
+    ids=[name for name, _ in ra_modules],
+    params=[(module,) for _, module in ra_modules]
+)
 def ra_module(request):
     return request.param[0]
 
@@ -190,6 +203,21 @@ def test_relational_algebra_ra_equijoin_mixed_types(ra_module):
     assert res == ras_c
 
 
+def test_relational_algebra_set_mixed_types_update(ra_module):
+    ras = ra_module.RelationalAlgebraSet([('b', 'a')])
+    ras.add(('a', 3.0))
+    assert set(ras) == {('b', 'a'), ('a', 3.0)}
+    assert ('a', 3.0) in ras
+
+    ras = ra_module.RelationalAlgebraSet([(1, 'a')])
+    ras |= ra_module.RelationalAlgebraSet([('a', 3.0), (1, 'a')])
+    assert len(ras) == 2
+    assert set(ras) == {(1, 'a'), ('a', 3.0)}
+
+    ras -= ra_module.RelationalAlgebraSet([('a', 3.0)])
+    assert set(ras) == {(1, 'a')}
+
+
 def test_groupby(ra_module):
     a = [(i, i * j) for i in (1, 2) for j in (2, 3, 4)]
 
@@ -249,6 +277,28 @@ def test_relational_algebra_ra_intersection(ra_module):
     assert first & set() == empty
 
 
+def test_relational_algebra_ra_difference(ra_module):
+    first = ra_module.RelationalAlgebraFrozenSet(
+        [(7, 8), (9, 2), ('a', 2)]
+    )
+    second = ra_module.RelationalAlgebraSet(
+        [(9, 2.0), (42, 0), ('a', 2)]
+    )
+    assert set(first - second) == {(7, 8)}
+    assert set(second - first) == {(42, 0)}
+    assert isinstance(second - first, ra_module.RelationalAlgebraSet)
+    empty = ra_module.RelationalAlgebraFrozenSet([])
+    assert first - empty == first
+    assert empty - first == empty
+    assert (first - first).is_empty()
+    assert set(first - {(7, 8)}) == {(9, 2), ('a', 2)}
+
+    dee = ra_module.RelationalAlgebraFrozenSet.dee()
+    dum = ra_module.RelationalAlgebraFrozenSet.dum()
+    assert (dee - dee).is_dum()
+    assert (dee - dum).is_dee()
+
+
 def test_relational_algebra_ra_union_update(ra_module):
     first = ra_module.RelationalAlgebraSet(
         [(7, 8), (9, 2)]
@@ -553,6 +603,70 @@ def test_named_relational_algebra_ra_naturaljoin(ra_module):
     assert res == ras_d
 
 
+def test_named_relational_algebra_ra_multiwayjoin(ra_module):
+    edges = [(i, (i + 1) % 6) for i in range(6)] + [(0, 2), (2, 4), (4, 0)]
+    labels = ["a", "b", "c", "d", "e", "f"]
+    ras_xy = ra_module.NamedRelationalAlgebraFrozenSet(("x", "y"), edges)
+    ras_yz = ra_module.NamedRelationalAlgebraFrozenSet(("y", "z"), edges)
+    ras_zx = ra_module.NamedRelationalAlgebraFrozenSet(("z", "x"), edges)
+    ras_xl = ra_module.NamedRelationalAlgebraFrozenSet(
+        ("x", "l"), [(i, labels[i]) for i in range(6)] + [(0, "g")]
+    )
+    ras_l = ra_module.NamedRelationalAlgebraFrozenSet(
+        ("l",), [(label,) for label in labels]
+    )
+    empty = ra_module.NamedRelationalAlgebraFrozenSet(("z", "x"), [])
+    dee = ra_module.NamedRelationalAlgebraFrozenSet.dee()
+
+    res = ras_xy.multiwayjoin(ras_yz, ras_zx)
+    assert res.columns == ("x", "y", "z")
+    assert res == ras_xy.naturaljoin(ras_yz).naturaljoin(ras_zx)
+    assert set(res) == {(0, 2, 4), (2, 4, 0), (4, 0, 2)}
+
+    res = ras_xy.multiwayjoin(ras_yz, ras_zx, ras_xl, ras_l, dee)
+    assert res.columns == ("x", "y", "z", "l")
+    assert set(res) == {(0, 2, 4, "a"), (2, 4, 0, "c"), (4, 0, 2, "e")}
+
+    res = ras_xy.multiwayjoin(ras_yz, empty)
+    assert res.is_empty()
+    assert res.columns == ("x", "y", "z")
+    assert ras_xy.multiwayjoin(dee) == ras_xy
+
+
+def test_named_relational_algebra_ra_semijoin_antijoin(ra_module):
+    a = [(i, i * 2) for i in range(5)]
+    b = [(i * 2, i * 3) for i in range(3)] + [(2, 0)]
+
+    ras_a = ra_module.NamedRelationalAlgebraFrozenSet(("z", "y"), a)
+    ras_b = ra_module.NamedRelationalAlgebraFrozenSet(("y", "x"), b)
+    ras_u = ra_module.NamedRelationalAlgebraFrozenSet(("u",), [(1,)])
+    ras_s = ra_module.NamedRelationalAlgebraFrozenSet(
+        ("z", "y"), [(0, 0), (1, 2), (2, 4)]
+    )
+    empty = ra_module.NamedRelationalAlgebraFrozenSet(("y", "x"), [])
+    dee = ra_module.NamedRelationalAlgebraFrozenSet.dee()
+    dum = ra_module.NamedRelationalAlgebraFrozenSet.dum()
+
+    res = ras_a.semijoin(ras_b)
+    assert res.columns == ras_a.columns
+    assert res == ras_s
+    assert res == ras_a.naturaljoin(ras_b).projection("z", "y")
+    res = ras_a.antijoin(ras_b)
+    assert res.columns == ras_a.columns
+    assert res == ras_a - ras_s
+
+    assert ras_a.semijoin(ras_a) == ras_a
+    assert ras_a.antijoin(ras_a).is_empty()
+    assert ras_a.semijoin(empty).is_empty()
+    assert ras_a.antijoin(empty) == ras_a
+    assert ras_a.semijoin(ras_u) == ras_a
+    assert ras_a.antijoin(ras_u).is_empty()
+    assert ras_a.semijoin(dee) == ras_a
+    assert ras_a.antijoin(dum) == ras_a
+    assert dee.semijoin(ras_a) == dee
+    assert dee.antijoin(ras_a) == dum
+
+
 def test_named_relational_algebra_ra_cross_product(ra_module):
     a = [(i, i * 2) for i in range(5)]
     b = [(i * 2, i * 3) for i in range(5)]
@@ -884,6 +998,51 @@ def test_extended_projection_ra_string_expression_empty_relation(ra_module):
     assert relation.extended_projection(eval_expressions) == expected
 
 
+def test_extended_projection_ra_string_expression_operations(ra_module):
+    relation = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y", "s"], iterable=[(1, 2, "a"), (6, 4, "b")],
+    )
+    res = relation.extended_projection({
+        "z": RelationalAlgebraStringExpression("-(x * 2 + y ** 2) // 3"),
+        "w": RelationalAlgebraStringExpression("(x / y > 1) | (s == 'a')"),
+        "v": RelationalAlgebraStringExpression("1 < y <= 2 and not x > 1"),
+        "s": RelationalAlgebraStringExpression("s"),
+    })
+    assert set(res) == {(-2, True, True, "a"), (-10, True, False, "b")}
+
+    res = relation.extended_projection({
+        "x": RelationalAlgebraStringExpression("y"),
+        "y": RelationalAlgebraStringExpression("x"),
+    })
+    assert set(res) == {(2, 1), (4, 6)}
+
+    res = relation.selection(RelationalAlgebraStringExpression("x % 4 == 2"))
+    assert set(res) == {(6, 4, "b")}
+
+
+def test_extended_projection_ra_string_expression_zero_divisor(ra_module):
+    relation = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y"], iterable=[(7, 0), (-7, 0), (0, 0), (5, 2)],
+    )
+    res = relation.extended_projection({
+        "x": RelationalAlgebraStringExpression("x"),
+        "d": RelationalAlgebraStringExpression("x // y"),
+        "m": RelationalAlgebraStringExpression("x % y"),
+    }).as_pandas_dataframe().sort_values("x")
+    np.testing.assert_array_equal(res["d"], [-np.inf, np.nan, 2, np.inf])
+    np.testing.assert_array_equal(res["m"], [np.nan, np.nan, 1, np.nan])
+
+
+def test_extended_projection_ra_string_expression_large_integers(ra_module):
+    relation = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x"], iterable=[(2 ** 40,), (3,)],
+    )
+    res = relation.extended_projection({
+        "y": RelationalAlgebraStringExpression("x * x - 1"),
+    })
+    assert set(res) == {(2 ** 80 - 1,), (8,)}
+
+
 def test_aggregate_repeated_group_column(ra_module):
     relation = ra_module.NamedRelationalAlgebraFrozenSet(
         columns=["x", "y"], iterable=[("a", 4), ("b", 5)],
@@ -898,3 +1057,294 @@ def test_unsupported_aggregation_function(ra_module):
     )
     with pytest.raises(ValueError, match="Unsupported aggregate_function"):
         relation.aggregate(["x"], None)
+
+
+def test_aggregate_kernels(ra_module):
+    relation = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y", "p"],
+        iterable=[("a", 1, .5), ("a", 2, .5), ("b", 3, .25), ("b", 4, 0.)],
+    )
+    for function in (
+        sum, max, min, len, np.mean, np.prod,
+        ra_module.noisy_or, ra_module.log_sum_exp
+    ):
+        res = relation.aggregate(["x"], [("q", "p", function)])
+        expected = {
+            (x, function([p for x_, _, p in relation if x_ == x]))
+            for x in "ab"
+        }
+        assert res.columns == ("x", "q")
+        assert set(res.projection("x")) == {(x,) for x, _ in expected}
+        for x, q in expected:
+            assert np.isclose(
+                res.selection({"x": x}).projection("q").fetch_one()[0], q
+            )
+
+    res = relation.aggregate([], [("q", "p", ra_module.noisy_or)])
+    assert np.isclose(res.fetch_one()[0], 1 - .5 * .5 * .75)
+
+    res = relation.aggregate(["x"], [
+        ("c", "y", len),
+        ("s", ("y", "p"), lambda t: (t.y * t.p).sum()),
+        ("m", "x", max),
+    ])
+    assert res.columns == ("x", "c", "m", "s")
+    assert set(res) == {("a", 2, "a", 1.5), ("b", 2, "b", .75)}
+
+
+def test_encoded_columns_operations(ra_module):
+    r1 = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y"], iterable=[("a", 1), ("b", 2), ("a", 1)],
+    )
+    r2 = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "z"], iterable=[("a", "c"), (None, "d")],
+    )
+    r3 = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y"], iterable=[("b", 2), ((1, 2), 3)],
+    )
+
+    assert len(r1) == 2
+    assert ("a", 1) in r1
+    assert ("c", 1) not in r1
+    assert {"x": "b", "y": 2} in r1
+    assert set(r1.naturaljoin(r2)) == {("a", 1, "c")}
+    assert set(r1 | r3) == {("a", 1), ("b", 2), ((1, 2), 3)}
+    assert set(r1 & r3) == {("b", 2)}
+    assert set(r1 - r3) == {("a", 1)}
+    assert set(r1.selection({"x": "a"})) == {("a", 1)}
+    assert r1.selection({"x": "c"}).is_empty()
+    assert set(r1.selection(lambda t: t.x == "b")) == {("b", 2)}
+    assert set(r1.rename_column("x", "w").projection("w")) == {("a",), ("b",)}
+    assert [g for g, _ in r1.groupby(["x"])] == ["a", "b"]
+
+    res = r1.extended_projection({
+        "w": ra_module.RelationalAlgebraColumnStr("x"),
+        "v": lambda t: t.x + "v",
+    })
+    assert set(res) == {("a", "av"), ("b", "bv")}
+    assert set(res.naturaljoin(r1.rename_column("x", "w"))) == {
+        ("a", "av", 1), ("b", "bv", 2)
+    }
+
+    ras = ra_module.RelationalAlgebraSet([("a", 1)])
+    ras.add(("b", 2))
+    ras.add((3, 3))
+    ras.discard(("a", 1))
+    assert set(ras) == {("b", 2), (3, 3)}
+
+
+def test_pandas_dictionary_encoding():
+    r1 = pandas.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y"], iterable=[("a", 1), ("b", (2, 3))],
+    )
+    assert r1._encoded_columns == {"x"}
+    assert r1._container["x"].dtype == "int64"
+    df = r1.as_pandas_dataframe()
+    assert list(df["x"]) == ["a", "b"]
+    assert r1.fetch_one() in {("a", 1), ("b", (2, 3))}
+
+    codes = pandas.VALUE_DICTIONARY.encode(np.array(["a", "b"], dtype=object))
+    assert list(pandas.VALUE_DICTIONARY.decode(codes)) == ["a", "b"]
+    assert pandas.VALUE_DICTIONARY.encode(
+        np.array([1, "a"], dtype=object)
+    ) is None
+    assert pandas.VALUE_DICTIONARY.lookup("not encoded value") is None
+
+    unnamed = r1.to_unnamed()
+    assert unnamed._encoded_columns == {0}
+    assert set(unnamed.projection(0)) == {("a",), ("b",)}
+
+
+def test_pandas_dictionary_bound(monkeypatch):
+    dictionary = pandas.ValueDictionary(capacity=2, max_size=3)
+    codes = dictionary.encode(np.array(["a", "b"], dtype=object))
+    assert dictionary.encode(np.array(["c", "d"], dtype=object)) is None
+    assert len(dictionary) == 2
+    assert dictionary.code("c") == 2
+    assert dictionary.code("d") is None
+    assert len(dictionary) == 3
+    new_codes = dictionary.encode(np.array(["b", "c", "a"], dtype=object))
+    assert list(new_codes) == [codes[1], 2, codes[0]]
+
+    r1 = pandas.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y"], iterable=[("a", 1), ("b", 2)],
+    )
+    monkeypatch.setattr(
+        pandas.VALUE_DICTIONARY, "max_size", len(pandas.VALUE_DICTIONARY)
+    )
+    r2 = pandas.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "z"],
+        iterable=[("a", 3), ("not encoded value of a full dictionary", 4)],
+    )
+    assert r2._encoded_columns == set()
+    assert set(r1.naturaljoin(r2)) == {("a", 1, 3)}
+
+    r3 = pandas.RelationalAlgebraSet([("a", 1)])
+    r3.add(("another value of a full dictionary", 2))
+    assert r3._encoded_columns == set()
+    assert set(r3) == {("a", 1), ("another value of a full dictionary", 2)}
+
+
+@pytest.mark.skipif(arrow is None, reason="pyarrow is not installed")
+def test_arrow_object_dictionary_encoding():
+    r1 = arrow.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y", "z"],
+        iterable=[("a", 1, True), ("b", (2, 3), False)],
+    )
+    assert r1._encoded_columns == {0, 1}
+    assert str(r1._table.column(2).type) == "bool"
+    assert set(r1) == {("a", 1, True), ("b", (2, 3), False)}
+
+    codes = arrow.OBJECT_DICTIONARY.encode(np.array([1, True], dtype=object))
+    assert codes[0] != codes[1]
+    decoded = arrow.OBJECT_DICTIONARY.decode(codes)
+    assert type(decoded[0]) is int and type(decoded[1]) is bool
+
+    r2 = arrow.NamedRelationalAlgebraFrozenSet(
+        columns=["y", "w"], iterable=[(1, 0), (4, 1)],
+    )
+    assert r2._encoded_columns == set()
+    assert set(r1.naturaljoin(r2)) == {("a", 1, True, 0)}
+
+    ras = arrow.RelationalAlgebraSet([(1, "a")])
+    ras.add(("b", 2))
+    assert ras._encoded_columns == {0, 1}
+    assert set(ras) == {(1, "a"), ("b", 2)}
+
+
+class _EqualToValue:
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        if isinstance(other, _EqualToValue):
+            other = other.value
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+
+@pytest.mark.skipif(arrow is None, reason="pyarrow is not installed")
+def test_arrow_object_dictionary_nested_types():
+    arrow.RelationalAlgebraSet([
+        ((_EqualToValue(1), _EqualToValue(2)), "k"),
+        (frozenset({_EqualToValue(1)}), "k"),
+        ((1, "a"), "k"),
+    ])
+    values = [(1, 2), frozenset({1}), (True, "a")]
+    ras = arrow.RelationalAlgebraSet([(value, "k") for value in values])
+    stored = [value for value, _ in ras]
+    for value in values:
+        matches = [s for s in stored if s == value]
+        assert len(matches) == 1
+        assert type(matches[0]) is type(value)
+        assert all(
+            type(s) is type(v) for s, v in zip(matches[0], value)
+        )
+
+    wrapped = arrow.RelationalAlgebraSet([
+        ((_EqualToValue(1), _EqualToValue(2)), "k")
+    ])
+    plain = arrow.RelationalAlgebraSet([((1, 2), "k")])
+    assert wrapped == plain
+    assert ((1, 2), "k") in wrapped
+    assert len(wrapped | plain) == 1
+    assert (wrapped - plain).is_empty()
+    assert len(wrapped.equijoin(plain, [(0, 0)])) == 1
+    assert len(wrapped.selection({0: (1, 2)})) == 1
+
+
+def test_pandas_hash_index_built_on_repeated_lookups():
+    ras = pandas.RelationalAlgebraSet(
+        [(i, str(i)) for i in range(20000)]
+    )
+    for i in range(300):
+        ras.add((-i, str(-i)))
+        assert (-i, str(-i)) in ras
+    assert len(ras._hash_indexes) == 0
+
+    for i in range(pandas._HASH_INDEX_MIN_LOOKUPS + 1):
+        assert (i, str(i)) in ras
+        assert (i, "not there") not in ras
+    assert len(ras._hash_indexes) == 1
+    ras.add((20000, "20000"))
+    assert (20000, "20000") in ras
+    assert len(ras._hash_indexes) == 0
+
+
+def test_hash_index_membership_and_selection(ra_module):
+    ras = ra_module.RelationalAlgebraSet(
+        [(i % 3, str(i), i) for i in range(10)]
+    )
+    assert (1, "4", 4) in ras
+    assert (1, "4", 5) not in ras
+    assert (1, "not there", 4) not in ras
+    assert set(ras.selection({0: 2})) == {
+        (2, "2", 2), (2, "5", 5), (2, "8", 8)
+    }
+    assert set(ras.selection({0: 2, 1: "5"})) == {(2, "5", 5)}
+    assert ras.selection({0: 3}).is_empty()
+    assert ras.selection({1: "not there"}).is_empty()
+
+    ras.add((3, "10", 10))
+    assert (3, "10", 10) in ras
+    assert set(ras.selection({0: 3})) == {(3, "10", 10)}
+    ras.discard((1, "4", 4))
+    assert (1, "4", 4) not in ras
+    assert set(ras.selection({0: 1})) == {(1, "1", 1), (1, "7", 7)}
+    ras |= ra_module.RelationalAlgebraSet([(1, "4", 4)])
+    assert (1, "4", 4) in ras
+    ras -= ra_module.RelationalAlgebraSet([(1, "1", 1)])
+    assert set(ras.selection({0: 1})) == {(1, "4", 4), (1, "7", 7)}
+
+    named = ra_module.NamedRelationalAlgebraFrozenSet(
+        columns=("x", "y"), iterable=[(1, (2, 3)), (2, (4,))]
+    )
+    assert (1, (2, 3)) in named
+    assert set(named.selection({"y": (4,)})) == {(2, (4,))}
+
+
+def test_deferred_evaluation():
+    r1 = pandas.NamedRelationalAlgebraFrozenSet(
+        columns=["x", "y"], iterable=[(i, str(i % 3)) for i in range(6)],
+    )
+    r2 = pandas.NamedRelationalAlgebraFrozenSet(
+        columns=["y", "z"], iterable=[("0", "a"), ("1", "b"), ("1", "c")],
+    )
+    r3 = pandas.NamedRelationalAlgebraFrozenSet(
+        columns=["w"], iterable=[(True,), (False,)],
+    )
+
+    def pipeline():
+        res = (
+            r1.naturaljoin(r2)
+            .rename_column("x", "v")
+            .projection("z", "y")
+            .rename_columns({"z": "t"})
+        )
+        res = res | res.rename_column("t", "s").rename_column("s", "t")
+        return res.cross_product(r3).projection("t", "w")
+
+    expected = pipeline()
+    assert not expected.is_deferred()
+    with pandas.deferred_evaluation():
+        res = pipeline()
+        assert res.is_deferred()
+        plan = res._plan
+        assert isinstance(plan, pandas._MapPlan)
+        assert isinstance(plan.child, pandas._JoinPlan)
+    assert res.columns == ("t", "w")
+    assert res == expected
+    assert not res.is_deferred()
+    assert len(res) == 6
+    assert set(res) == set(expected)
+
+    with pandas.deferred_evaluation():
+        with pytest.raises(ValueError):
+            r1.cross_product(r2)
+        with pytest.raises(ValueError):
+            r1 | r2
+        with pytest.raises(ValueError):
+            r1.rename_columns({"x": "y"})
+        assert r1.projection().is_dee()